@@ -0,0 +1,45 @@
+"""Reading and writing BiogridCC_Graph.csv plain and compressed.
+
+Run from the project root: python benchmarks/compression.py
+"""
+
+import os
+import tempfile
+import time
+from mdepstar import Network
+from mdepstar.compression import zstandard
+
+NETWORK = "networks/BiogridCC_Graph.csv"
+
+
+def main():
+    G = Network()
+    G.read_file(NETWORK, ";", True)
+    expected = sorted(G.edges())
+
+    extensions = ["", ".gz", ".bz2", ".xz"] + ([".zst"] if zstandard is not None else [])
+    if zstandard is None:
+        print("zstandard is not installed, skipping .zst")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for ext in extensions:
+            path = os.path.join(directory, "BiogridCC_Graph.csv" + ext)
+
+            t = time.perf_counter()
+            G.save_to_file(path)
+            write = time.perf_counter() - t
+
+            t = time.perf_counter()
+            H = Network()
+            H.read_file(path, ";", True)
+            read = time.perf_counter() - t
+
+            assert sorted(H.edges()) == expected
+            assert all(H.weight(a, b) == G.weight(a, b) for a, b in expected)
+
+            print(f"{ext or 'plain':6} {os.path.getsize(path) / 2**20:7.2f} MiB, "
+                  f"write {write:.3f}s, read {read:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
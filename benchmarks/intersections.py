@@ -0,0 +1,83 @@
+"""Neighbour intersection strategies over the degree pairs of the BioGRID edges.
+
+Run from the project root: python benchmarks/intersections.py [repeats]
+
+The slots i -> j of BiogridCC_Graph.csv are split by the degrees of i and j,
+using the thresholds of the adaptive choice (kernels.HUB_DEGREE and
+kernels.GALLOP_RATIO):
+
+    skewed      one row is more than GALLOP_RATIO times longer
+    hub         i has at least HUB_DEGREE neighbours, rows of similar length
+    small       everything else
+
+and every class is timed with each strategy of kernels.INTERSECTIONS (best of
+repeats). The Python backend only has the adaptive dict intersection, so the
+table needs Numba.
+"""
+
+import sys
+import time
+from array import array
+from mdepstar import Network, kernels
+
+NETWORK = "networks/BiogridCC_Graph.csv"
+
+
+def degree_classes(csr) -> dict[str, tuple[array, array]]:
+    res = {c: (array("i"), array("q")) for c in ("small", "hub", "skewed", "all")}
+    for i in range(csr.num_nodes):
+        d_i = csr.degree(i)
+        for p in csr.row(i):
+            d_j = csr.degree(csr.indices[p])
+            if d_j > kernels.GALLOP_RATIO * d_i or d_i > kernels.GALLOP_RATIO * d_j:
+                c = "skewed"
+            elif d_i >= kernels.HUB_DEGREE:
+                c = "hub"
+            else:
+                c = "small"
+            for key in (c, "all"):
+                res[key][0].append(i)
+                res[key][1].append(p)
+    return res
+
+
+def best_of(repeats: int, f) -> float:
+    res = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        f()
+        res = min(res, time.perf_counter() - t)
+    return res
+
+
+def main():
+    if kernels.numba is None:
+        sys.exit("needs numba (pip install .[fast])")
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    G = Network()
+    G.read_file(NETWORK, ";", True)
+    csr = G.csr()
+    print(f"{csr.num_nodes} nodes, {csr.num_slots} slots, HUB_DEGREE {kernels.HUB_DEGREE}, "
+          f"GALLOP_RATIO {kernels.GALLOP_RATIO}")
+
+    for name, (owners, slots) in degree_classes(csr).items():
+        expected = kernels.common_sums(csr, True, owners, slots, "merge")  # JIT warm-up
+        timings = []
+        for strategy in kernels.INTERSECTIONS:
+            assert kernels.common_sums(csr, True, owners, slots, strategy) == expected
+            t = best_of(repeats, lambda: kernels.common_sums(csr, True, owners, slots, strategy))
+            timings.append(f"{strategy} {t * 1000:8.2f}ms")
+        print(f"{name:6} {len(slots):7} slots: " + ", ".join(timings))
+
+    values = array("d", [0.0]) * csr.num_slots
+    t = best_of(repeats, lambda: kernels.dependencies(csr, True, values))
+    print(f"kernels.dependencies {t * 1000:.2f}ms")
+
+    t = time.perf_counter()
+    G.clustering_coeficient()
+    print(f"Network.clustering_coeficient {time.perf_counter() - t:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Time the compiled and pure-Python kernels on the bundled networks.
+
+Run from the project root: PYTHONPATH=. python benchmarks/kernels.py
+
+tests/test_kernels.py checks that both backends agree with the dict path.
+"""
+
+import time
+from array import array
+from mdepstar import Network, mDepStar, kernels
+
+NETWORKS = ["KroganCoreCC", "CollinsCC", "BiogridCC"]
+
+
+def run(csr, weighted, tau, backend):
+    t = time.perf_counter()
+    values = kernels.dependencies(csr, weighted, array("d", [0.0]) * csr.num_slots, backend=backend)
+    rev = kernels.reverse_slots(csr, backend=backend)
+    flags = kernels.mdep_flags(values, rev, tau, backend=backend)
+    star = kernels.star_flags(values, rev, flags, tau, backend=backend)
+    return values, rev, flags, star, time.perf_counter() - t
+
+
+def main():
+    if kernels.numba is None:
+        print("numba is not installed, only the pure-Python kernels are available")
+        return
+
+    for name in NETWORKS:
+        G = Network()
+        G.read_file(f"networks/{name}_Graph.csv", ";", True)
+
+        tau = mDepStar(G, storage="float64").dependency_threshold
+
+        csr = G.csr()
+        run(csr, True, tau, "numba")  # JIT warm-up
+        py = run(csr, True, tau, "python")
+        nb = run(csr, True, tau, "numba")
+
+        print(f"{name}: {csr.num_slots} slots, python {py[4]:.3f}s, numba {nb[4]:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
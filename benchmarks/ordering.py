@@ -0,0 +1,71 @@
+"""Effect of the CSR node order on the dependency and star phases.
+
+Run from the project root: python benchmarks/ordering.py [repeats]
+
+For every bundled network and node order it reports the time to compute the
+order, the mean and maximum id distance between neighbours (the locality
+the order buys), and the best of repeats timings of the dependency kernel and
+of star construction on float64 storage, checking that the complexes do not
+depend on the order.
+"""
+
+import sys
+import time
+from array import array
+from mdepstar import Network, mDepStar, kernels
+from mdepstar.ordering import ORDERS
+
+NETWORKS = ["KroganCoreCC", "CollinsCC", "BiogridCC"]
+
+
+def locality(csr) -> tuple[float, int]:
+    gaps = [abs(i - csr.indices[p]) for i in range(csr.num_nodes) for p in csr.row(i)]
+    return sum(gaps) / len(gaps), max(gaps)
+
+
+def best_of(repeats: int, f) -> float:
+    res = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        f()
+        res = min(res, time.perf_counter() - t)
+    return res
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backends = ["python"] if kernels.numba is None else ["python", "numba"]
+
+    for name in NETWORKS:
+        for backend in backends:
+            kernels.BACKEND = backend
+            expected = None
+            for order in (None,) + ORDERS:
+                G = Network()
+                G.read_file(f"networks/{name}_Graph.csv", ";", True)
+                G.reorder(order)
+
+                t = time.perf_counter()
+                csr = G.csr()
+                build = time.perf_counter() - t
+                gap, bandwidth = locality(csr)
+
+                values = array("d", [0.0]) * csr.num_slots
+                kernels.dependencies(csr, True, values)  # JIT warm-up
+                dep = best_of(repeats, lambda: kernels.dependencies(csr, True, values))
+
+                model = mDepStar(G, storage="float64")
+                model.dependency_threshold = 0.2
+                complexes = model.get_complexes()
+                star = best_of(repeats, model.get_complexes)
+
+                if expected is None:
+                    expected = set(complexes)
+                assert set(complexes) == expected
+
+                print(f"{name} {backend:6} {order or 'file':9}: csr {build:.3f}s, gap {gap:8.1f}, "
+                      f"bandwidth {bandwidth:5}, dependencies {dep:.4f}s, stars {star:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
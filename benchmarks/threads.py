@@ -0,0 +1,73 @@
+"""Thread scaling of the dependency and star phases on the bundled networks.
+
+Run from the project root: python benchmarks/threads.py [max threads]
+
+Both phases are timed with the thread pool forced on, so on an interpreter with
+the GIL the pure-Python rows show the contention mDepStar avoids by running
+serially there. Run it with a free-threaded build (python3.13t) as well to see
+the Python kernels scale.
+"""
+
+import os
+import sys
+import time
+from array import array
+from mdepstar import Network, mDepStar, kernels, parallel
+from mdepstar.checkpoint import compute_dependencies
+
+NETWORKS = ["KroganCoreCC", "CollinsCC", "BiogridCC"]
+
+
+def thread_counts(limit: int) -> list[int]:
+    res = [1]
+    while res[-1] * 2 <= limit:
+        res.append(res[-1] * 2)
+    return res
+
+
+def dependency_phase(csr, threads: int) -> tuple[array, float]:
+    t = time.perf_counter()
+    values = compute_dependencies(csr, True, array("d", [0.0]) * csr.num_slots, threads=threads)
+    return values, time.perf_counter() - t
+
+
+def star_phase(model: mDepStar, threads: int) -> tuple[set, float]:
+    t = time.perf_counter()
+    res = model._threaded_complexes(threads)
+    return res, time.perf_counter() - t
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    backends = ["python"] if kernels.numba is None else ["python", "numba"]
+    print(f"{sys.version.split()[0]}, GIL {'enabled' if parallel.gil_enabled() else 'disabled'}, "
+          f"{os.cpu_count()} cores")
+
+    for name in NETWORKS:
+        G = Network()
+        G.read_file(f"networks/{name}_Graph.csv", ";", True)
+        csr = G.csr()
+
+        for backend in backends:
+            kernels.BACKEND = backend
+            compact = mDepStar(G, storage="float64")
+            compact.dependency_threshold  # estimated once, outside the timings
+            dependency_phase(csr, 1)  # JIT warm-up
+
+            expected_values = expected = None
+            base_dep = base_star = 0.0
+            for threads in thread_counts(limit):
+                values, dep = dependency_phase(csr, threads)
+                complexes, star = star_phase(compact, threads)
+
+                if expected is None:
+                    expected_values, expected = values, complexes
+                    base_dep, base_star = dep, star
+                assert values == expected_values and complexes == expected
+
+                print(f"{name} {backend:6} {threads:3} threads: dependencies {dep:.3f}s "
+                      f"(x{base_dep / dep:.2f}), stars {star:.3f}s (x{base_star / star:.2f})")
+
+
+if __name__ == "__main__":
+    main()
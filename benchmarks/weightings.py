@@ -0,0 +1,51 @@
+"""One pass over several weightings against a dependencies call per weighting.
+
+Run from the project root: python benchmarks/weightings.py [repeats]
+
+BiogridCC_Graph.csv is weighted once with its own weights and then with
+unit weights up to 1, 2, 4 and 8 weightings. Each count is timed as one
+kernels.multi_dependencies call and as separate kernels.dependencies calls
+(best of repeats). The two agree exactly.
+"""
+
+import sys
+import time
+from array import array
+from mdepstar import Network, kernels
+
+NETWORK = "networks/BiogridCC_Graph.csv"
+
+
+def best_of(repeats: int, f) -> float:
+    res = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        f()
+        res = min(res, time.perf_counter() - t)
+    return res
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    G = Network()
+    G.read_file(NETWORK, ";", True)
+    csr = G.csr()
+    ones = array("d", [1.0]) * csr.num_slots
+
+    print(f"{'weightings':>10} {'one pass':>9} {'separate':>9}")
+    for count in (1, 2, 4, 8):
+        weights = [csr.weights] + [ones] * (count - 1)
+        out = [array("d", [0.0]) * csr.num_slots for _ in weights]
+        kernels.multi_dependencies(csr, weights, out)
+
+        def separate():
+            for w in weights:
+                kernels.dependencies(csr.with_weights(w), True, array("d", [0.0]) * csr.num_slots)
+
+        one = best_of(repeats, lambda: kernels.multi_dependencies(csr, weights, out))
+        print(f"{count:>10} {one:>8.2f}s {best_of(repeats, separate):>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from array import array
+from bisect import bisect_left
+
+
+class CSRGraph(object):
+    """Integer compressed sparse row view of a Network.
+
+    Node ``i`` is ``nodes[i]``; its neighbours are
+    ``indices[indptr[i]:indptr[i + 1]]`` sorted ascending, with the edge
+    weights aligned in ``weights``. Every undirected edge occupies two slots,
+    one per direction, so per-slot arrays hold directed values.
+    """
+
+    def __init__(self, nodes: list[str], indptr: array, indices: array, weights: array) -> None:
+        self.nodes: list[str] = nodes
+        self.index: dict[str, int] = {n: i for i, n in enumerate(nodes)}
+        self.indptr: array = indptr
+        self.indices: array = indices
+        self.weights: array = weights
+
+    def __str__(self) -> str:
+        return f"{self.num_nodes} nodes - {self.num_slots} slots - {hex(id(self))}"
+
+    @staticmethod
+    def from_network(network) -> "CSRGraph":
+        nodes = [n for n, neigh in network._neighbors.items() if len(neigh) > 0]
+        index = {n: i for i, n in enumerate(nodes)}
+
+        indptr = array("q", [0])
+        indices = array("i")
+        weights = array("d")
+
+        for node in nodes:
+            row = network._network[node]
+            # a self-loop is listed twice in _neighbors[node] but is one slot
+            for j in sorted({index[n] for n in network._neighbors[node]}):
+                indices.append(j)
+                weights.append(row[nodes[j]])
+            indptr.append(len(indices))
+
+        return CSRGraph(nodes, indptr, indices, weights)
+
+    def permute(self, order: array) -> "CSRGraph":
+        """The same graph with node order[k] renumbered k, rows sorted again."""
+        new_id = array("i", [0]) * len(order)
+        for k, i in enumerate(order):
+            new_id[i] = k
+
+        indptr = array("q", [0])
+        indices = array("i")
+        weights = array("d")
+
+        for i in order:
+            row = sorted((new_id[self.indices[p]], self.weights[p]) for p in self.row(i))
+            indices.extend(j for j, _ in row)
+            weights.extend(w for _, w in row)
+            indptr.append(len(indices))
+
+        return CSRGraph([self.nodes[i] for i in order], indptr, indices, weights)
+
+    def with_weights(self, weights: array) -> "CSRGraph":
+        """The same graph sharing nodes, indptr and indices, with other slot weights."""
+        if len(weights) != self.num_slots:
+            raise ValueError(f"Expected {self.num_slots} weights, got {len(weights)}")
+        return CSRGraph(self.nodes, self.indptr, self.indices, weights)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_slots(self) -> int:
+        return len(self.indices)
+
+    def row(self, i: int) -> range:
+        return range(self.indptr[i], self.indptr[i + 1])
+
+    def degree(self, i: int) -> int:
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def slot(self, i: int, j: int) -> int:
+        """Position of the directed edge i -> j in the per-slot arrays.
+
+        Raises:
+            KeyError: i and j are not adjacent
+        """
+        lo = self.indptr[i]
+        hi = self.indptr[i + 1]
+        p = bisect_left(self.indices, j, lo, hi)
+        if p == hi or self.indices[p] != j:
+            raise KeyError((self.nodes[i], self.nodes[j]))
+        return p
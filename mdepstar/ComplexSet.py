@@ -0,0 +1,122 @@
+from array import array
+from collections.abc import Iterable, Iterator, Set
+from .Network import Network
+
+
+class ComplexSet(Set):
+    """Deduplicated complexes stored as a ragged array of interned node ids.
+
+    Complex ``k`` is ``members[offsets[k]:offsets[k + 1]]`` (sorted ids into
+    ``nodes``), and duplicates are detected through a hash index keyed by
+    those bytes. With a ``network`` the ids are its CSR ids
+    (``network.csr().index``), like in mdepstar_analysis.ReferenceSet. Nodes
+    outside the network get ids after ``network.csr().num_nodes``.
+
+    A ComplexSet is an immutable collections.abc.Set of frozensets: it
+    iterates, compares and combines like the ``set[frozenset[str]]`` it
+    replaces. Per complex it keeps one bytes key in the hash index instead
+    of a frozenset of node strings, and frozensets are only built on
+    iteration.
+    """
+
+    def __init__(self, complexes: Iterable[Iterable[str]] = (), network: Network | None = None) -> None:
+        if network is not None:
+            csr = network.csr()
+            self.nodes: list[str] = list(csr.nodes)
+            self.index: dict[str, int] = dict(csr.index)
+        else:
+            self.nodes = []
+            self.index = {}
+        self._network = network
+
+        self.offsets: array = array("q", [0])
+        self.members: array = array("i")
+        self._lookup: dict[bytes, int] = {}
+        self._hash: int | None = None
+
+        for c in complexes:
+            self._add_ids(sorted(set(self._intern(n) for n in c)))
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Iterable[str]]) -> "ComplexSet":
+        return cls(it)
+
+    def _intern(self, node: str) -> int:
+        i = self.index.get(node)
+        if i is None:
+            i = len(self.nodes)
+            self.index[node] = i
+            self.nodes.append(node)
+        return i
+
+    def _add_ids(self, ids: Iterable[int]) -> int:
+        """Append a complex given as sorted ids, returns its position (of the earlier copy for a duplicate)."""
+        key = array("i", ids).tobytes()
+        k = self._lookup.get(key)
+        if k is None:
+            k = len(self)
+            self._lookup[key] = k
+            self.members.frombytes(key)
+            self.offsets.append(len(self.members))
+        return k
+
+    def _key(self, complex_nodes: Iterable[str]) -> bytes | None:
+        ids = []
+        for n in set(complex_nodes):
+            i = self.index.get(n)
+            if i is None:
+                return None
+            ids.append(i)
+        return array("i", sorted(ids)).tobytes()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __contains__(self, complex_nodes) -> bool:
+        if isinstance(complex_nodes, str) or not isinstance(complex_nodes, Iterable):
+            return False
+        key = self._key(complex_nodes)
+        return key is not None and key in self._lookup
+
+    def __iter__(self) -> Iterator[frozenset[str]]:
+        for k in range(len(self)):
+            yield self[k]
+
+    def __getitem__(self, k: int) -> frozenset[str]:
+        nodes = self.nodes
+        return frozenset(nodes[i] for i in self.ids(k))
+
+    def __hash__(self) -> int:
+        # equal to the hash of the frozenset of frozensets with the same complexes
+        if self._hash is None:
+            self._hash = hash(frozenset(self))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"ComplexSet({len(self)} complexes)"
+
+    def ids(self, k: int) -> array:
+        """Sorted node ids of complex k."""
+        return self.members[self.offsets[k]:self.offsets[k + 1]]
+
+    def size(self, k: int) -> int:
+        return self.offsets[k + 1] - self.offsets[k]
+
+    def sizes(self) -> array:
+        return array("q", (self.offsets[k + 1] - self.offsets[k] for k in range(len(self))))
+
+    def filter_size(self, min_size: int = 3, max_size: int | None = None) -> "ComplexSet":
+        """Complexes with min_size..max_size members, sharing this set's node ids."""
+        res = self._empty_like()
+        for k in range(len(self)):
+            s = self.size(k)
+            if s >= min_size and (max_size is None or s <= max_size):
+                res._add_ids(self.ids(k))
+        return res
+
+    def _empty_like(self) -> "ComplexSet":
+        res = ComplexSet()
+        res.nodes = self.nodes
+        res.index = self.index
+        res._network = self._network
+        return res
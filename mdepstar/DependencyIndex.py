@@ -0,0 +1,134 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from . import kernels
+from .CSRGraph import CSRGraph
+
+DIRECTIONS = ("out", "in")
+
+
+class DependencyIndex(object):
+    """Edge dependencies sorted once for ranked queries.
+
+    Per node, the slots of its row are kept in decreasing d(X -> Y) (the
+    partners X depends on most) and in decreasing d(Y -> X) (the partners
+    most dependent on X). Every undirected edge is also ranked by its mutual
+    dependency min(d(a -> b), d(b -> a)), in one sorted array, so top-k,
+    range and percentile queries are answered by slicing or bisection
+    instead of a scan of the dependency matrix.
+
+    The mutual dependency decides mDep membership: both directions reach tau
+    exactly when their minimum does (with the tolerance of
+    mDepStar._is_greater_or_equal), so the mDep network for any threshold is
+    a suffix of the ranking.
+
+    Dependencies keep the typecode of the blocks, so the index of a float32
+    storage holds float32 values.
+
+    Args:
+        csr (CSRGraph): network the dependencies belong to
+        blocks (Iterable[tuple[int, int, array, array]]): (lo, hi, forward, reverse)
+            covering all rows in order, see mDepStar._dependency_blocks
+    """
+
+    def __init__(self, csr: CSRGraph, blocks: Iterable[tuple[int, int, array, array]]) -> None:
+        self.csr = csr
+        self.forward = array("d")
+        self.reverse = array("d")
+        for k, (_, _, forward, reverse) in enumerate(blocks):
+            if k == 0:
+                self.forward = array(forward.typecode)
+                self.reverse = array(reverse.typecode)
+            self.forward.extend(forward)
+            self.reverse.extend(reverse)
+
+        forward, reverse = self.forward, self.reverse
+
+        # row segments (same indptr as the CSR) of slots by decreasing dependency
+        self.by_forward = array("q")
+        self.by_reverse = array("q")
+        for i in range(csr.num_nodes):
+            row = csr.row(i)
+            self.by_forward.extend(sorted(row, key=lambda p: (-forward[p], p)))
+            self.by_reverse.extend(sorted(row, key=lambda p: (-reverse[p], p)))
+
+        # undirected edges by increasing mutual dependency, ties in slot order;
+        # every edge from its lower node, a self-loop once from its only slot
+        mutual = array(forward.typecode)
+        slots = array("q")
+        owners = array("i")
+        for i in range(csr.num_nodes):
+            for p in csr.row(i):
+                if csr.indices[p] >= i:
+                    mutual.append(min(forward[p], reverse[p]))
+                    slots.append(p)
+                    owners.append(i)
+        order = sorted(range(len(slots)), key=mutual.__getitem__)
+        self.mutual = array(mutual.typecode, (mutual[k] for k in order))
+        self.slots = array("q", (slots[k] for k in order))
+        self.owners = array("i", (owners[k] for k in order))
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _edge(self, k: int) -> tuple[str, str, float, float]:
+        p = self.slots[k]
+        nodes = self.csr.nodes
+        return nodes[self.owners[k]], nodes[self.csr.indices[p]], self.forward[p], self.reverse[p]
+
+    def partners(self, node: str, k: int | None = None, direction: str = "out") -> list[tuple[str, float]]:
+        """Neighbors of node ranked by dependency.
+
+        Args:
+            node (str): protein
+            k (int | None): number of partners, all by default
+            direction (str): "out" ranks by d(node -> partner), the partners node
+                depends on; "in" by d(partner -> node), the partners depending on node
+
+        Returns:
+            list[tuple[str, float]]: (partner, dependency), highest first
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction}")
+        csr = self.csr
+        i = csr.index[node]
+        lo, hi = csr.indptr[i], csr.indptr[i + 1]
+        if k is not None:
+            hi = min(hi, lo + k)
+        order, values = (self.by_forward, self.forward) if direction == "out" else (self.by_reverse, self.reverse)
+        return [(csr.nodes[csr.indices[p]], values[p]) for p in order[lo:hi]]
+
+    def top_edges(self, k: int) -> list[tuple[str, str, float, float]]:
+        """The k edges (a, b, d(a -> b), d(b -> a)) with the highest mutual dependency, highest first."""
+        n = len(self)
+        return [self._edge(x) for x in range(n - 1, max(n - k, 0) - 1, -1)]
+
+    def edges_between(self, lo: float, hi: float) -> list[tuple[str, str, float, float]]:
+        """Edges with lo <= min(d(a -> b), d(b -> a)) <= hi, in increasing mutual dependency."""
+        return [self._edge(x) for x in range(bisect_left(self.mutual, lo), bisect_right(self.mutual, hi))]
+
+    def percentile(self, q: float) -> float:
+        """Mutual dependency at quantile q (0..1), interpolated linearly between ranks."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if len(self) == 0:
+            return 0.0
+        x = q * (len(self) - 1)
+        lo = int(x)
+        hi = min(lo + 1, len(self) - 1)
+        return self.mutual[lo] + (self.mutual[hi] - self.mutual[lo]) * (x - lo)
+
+    def rank(self, tau: float) -> int:
+        """Position of the first edge whose mutual dependency reaches tau (with tolerance)."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if kernels.greater_or_equal(self.mutual[mid], tau):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def mdep_edges(self, tau: float) -> list[tuple[str, str, float, float]]:
+        """Edges of the mDep network at threshold tau, in increasing mutual dependency."""
+        return [self._edge(x) for x in range(self.rank(tau), len(self))]
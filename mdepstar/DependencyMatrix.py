@@ -0,0 +1,125 @@
+from array import array
+from collections.abc import Callable, Iterator, Mapping
+from .CSRGraph import CSRGraph
+
+STORAGE_TYPECODES = {"float32": "f", "float64": "d"}
+
+
+class _DependencyRow(Mapping):
+    """Dependencies d(node -> neighbor) of one node, read from the CSR slots."""
+
+    def __init__(self, matrix: "CompactDependencyMatrix", i: int) -> None:
+        self._matrix = matrix
+        self._i = i
+
+    def __getitem__(self, neighbor: str) -> float:
+        csr = self._matrix.csr
+        return self._matrix.values[csr.slot(self._i, csr.index[neighbor])]
+
+    def __iter__(self) -> Iterator[str]:
+        csr = self._matrix.csr
+        for p in csr.row(self._i):
+            yield csr.nodes[csr.indices[p]]
+
+    def __len__(self) -> int:
+        return self._matrix.csr.degree(self._i)
+
+
+class CompactDependencyMatrix(Mapping):
+    """Directed dependencies stored in one typed array aligned with the CSR edge order.
+
+    ``matrix[A][B]`` behaves like the nested dict used by mDepStar, but the
+    value lives at ``values[csr.slot(A, B)]``, so an entry costs 4 (float32)
+    or 8 (float64) bytes instead of a boxed float in a dict.
+
+    float32 precision: a stored dependency carries a relative rounding error
+    of at most 2**-24 (~6e-8). ``mDepStar._is_greater_or_equal`` accepts
+    ``x >= tau * (1 - 1e-6)``, so float32 storage can only change a decision
+    for dependencies whose relative distance to that boundary is below 6e-8,
+    i.e. it moves the effective threshold by less than 1/16 of the tolerance.
+    Use float64 when results must be bit-for-bit identical to the dict storage.
+    """
+
+    def __init__(self, csr: CSRGraph, storage: str = "float32", values: array | None = None) -> None:
+        if storage not in STORAGE_TYPECODES:
+            raise ValueError(f"Unknown dependency storage {storage}")
+
+        self.csr: CSRGraph = csr
+        self.storage: str = storage
+        if values is None:
+            values = array(STORAGE_TYPECODES[storage], [0.0]) * csr.num_slots
+        self.values: array = values
+
+    def __getitem__(self, node: str) -> _DependencyRow:
+        return _DependencyRow(self, self.csr.index[node])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.csr.nodes)
+
+    def __len__(self) -> int:
+        return self.csr.num_nodes
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.itemsize * len(self.values)
+
+    def get_dependency(self, A: str, B: str) -> float:
+        csr = self.csr
+        return self.values[csr.slot(csr.index[A], csr.index[B])]
+
+    def set_dependency(self, A: str, B: str, value: float) -> None:
+        csr = self.csr
+        self.values[csr.slot(csr.index[A], csr.index[B])] = value
+
+
+class _LazyDependencyRow(Mapping):
+    """Dependencies d(node -> neighbor), computed on first access."""
+
+    def __init__(self, matrix: "LazyDependencyMatrix", node: str) -> None:
+        self._matrix = matrix
+        self._node = node
+
+    def __getitem__(self, neighbor: str) -> float:
+        row = self._matrix.rows.setdefault(self._node, {})
+        d = row.get(neighbor)
+        if d is None:
+            if not self._matrix.network.edge_exists(self._node, neighbor):
+                raise KeyError(neighbor)
+            d = self._matrix.dependency(self._node, neighbor)
+            row[neighbor] = d
+        return d
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matrix.network.neighbors(self._node))
+
+    def __len__(self) -> int:
+        return self._matrix.network.degree(self._node)
+
+
+class LazyDependencyMatrix(Mapping):
+    """Edge dependencies computed on demand and memoized in nested dicts.
+
+    Used by mDepStar(lazy=True): a query about a few seeds only evaluates the
+    edges around them instead of the whole network.
+    """
+
+    def __init__(self, network, dependency: Callable[[str, str], float]) -> None:
+        self.network = network
+        self.dependency = dependency
+        self.rows: dict[str, dict[str, float]] = {}
+
+    def __getitem__(self, node: str) -> _LazyDependencyRow:
+        if node not in self.network.nodes():
+            raise KeyError(node)
+        return _LazyDependencyRow(self, node)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.network.nodes())
+
+    def __len__(self) -> int:
+        return len(self.network.nodes())
+
+    @property
+    def computed(self) -> int:
+        """Number of directed dependencies evaluated so far."""
+        return sum(len(row) for row in self.rows.values())
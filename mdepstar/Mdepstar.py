@@ -1,20 +1,91 @@
 import math
-from collections import defaultdict
+from array import array
+from collections import OrderedDict, defaultdict, namedtuple
 from .Network import Network
+from .CSRGraph import CSRGraph
+from .ComplexSet import ComplexSet
+from .compression import open_text
+from . import kernels, parallel
+from .checkpoint import Checkpoint, compute_dependencies, row_blocks
+from .outofcore import SpilledDependencies
+from .sketch import DependencySketch
+from .table import write_dependency_table
+from .DependencyIndex import DependencyIndex
+from .DependencyMatrix import CompactDependencyMatrix, LazyDependencyMatrix, STORAGE_TYPECODES
+
+# classes counted by get_node_deps and node_dependency_profiles, in their order
+PROFILE_COLUMNS = ("mutual", "no_dep", "node_on_neighbor", "neighbor_on_node")
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
 
 class mDepStar:
     def __init__(
-        self, graph: Network, dependency: float | list[tuple[str, str]] | None = None
+        self,
+        graph: Network,
+        dependency: float | list[tuple[str, str]] | None = None,
+        storage: str = "dict",
+        cache_size: int = 2**16,
+        lazy: bool = False,
+        checkpoint: Checkpoint | None = None,
+        progress: bool = False,
+        max_memory: int | None = None,
+        spill_directory: str | None = None,
+        threads: int | None = None,
     ) -> None:
+        """
+        Args:
+            graph (Network): PPI network
+            dependency (float | list[tuple[str, str]] | None): threshold, or edges to estimate it from
+            storage (str): "dict" keeps dependencies in nested dicts, "float32"/"float64" in a
+                compact array aligned with the CSR edge order (see CompactDependencyMatrix)
+            cache_size (int): LRU size for dependencies of non-adjacent pairs, 0 disables it
+            lazy (bool): compute edge dependencies on demand, for queries about a few seeds
+            checkpoint (Checkpoint | None): save (and resume) the dependency pass periodically
+            progress (bool): report progress and throughput of the dependency pass
+            max_memory (int | None): compute dependencies in vertex blocks whose working set
+                fits in this many bytes and spill them to disk (see SpilledDependencies);
+                one block at a time, so not with threads or checkpoint
+            spill_directory (str | None): where blocks are spilled, a temporary directory by default
+            threads (int | None): compute dependencies in this many threads (0 = all cores);
+                on interpreters with the GIL only the Numba kernels run threaded
+        """
+        if storage != "dict" and storage not in STORAGE_TYPECODES:
+            raise ValueError(f"Unknown dependency storage {storage}")
+        if lazy and storage != "dict":
+            raise ValueError("Lazy mode keeps dependencies in dicts")
+        if lazy and max_memory is not None:
+            raise ValueError("Lazy mode cannot be combined with max_memory")
+        if max_memory is not None and checkpoint is not None:
+            raise ValueError("Checkpoints cannot be combined with max_memory, the spilled blocks are not resumable")
+        if max_memory is not None and threads is not None and threads != 1:
+            raise ValueError("max_memory computes one block at a time, threads cannot be combined with it")
+
         self._G: Network = graph
+        self._storage: str = storage
+        self._checkpoint: Checkpoint | None = checkpoint
+        self._progress: bool = progress
+        self._max_memory: int | None = max_memory
+        self._spill_directory: str | None = spill_directory
+        self._spilled: SpilledDependencies | None = None
+        self._threads: int = parallel.thread_workers(threads, compiled=True)
         self._weighted_degree_matrix: dict[str, float] = {}
-        self._dependency_cache: dict[tuple[str, str], float] = {}
+        self._dependency_cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._cache_size: int = cache_size
+        self._cache_hits: int = 0
+        self._cache_misses: int = 0
 
-        self._dependency_matrix: dict[str, dict[str, float]] | None = None
+        self._dependency_matrix: dict[str, dict[str, float]] | CompactDependencyMatrix | None = None
         self._mDep_network_dict: dict[str, dict[str, float]] | None = None
         self._dependency_threshold: float | None = None
+        self._dependency_index: DependencyIndex | None = None
+        self._sketch: DependencySketch | None = None
+
+        if lazy:
+            self._dependency_matrix = LazyDependencyMatrix(self._G, self._dependency)
+        else:
+            self._calc_dependency_matrix()
 
-        self._calc_dependency_matrix()
         if isinstance(dependency, float):
             print(f"Dependency is set to {dependency}")
             self._dependency_threshold = dependency
@@ -25,15 +96,56 @@ class mDepStar:
     @property
     def dependency_threshold(self):
         if self._dependency_threshold is None:
-            self._dependency_threshold = round(
-                self._estimate_dependency(self._G.edges()), 3
-            )
+            # the estimator sums over all edges are kept by the sketch
+            self._dependency_threshold = self.dependency_sketch().suggested_threshold()
         return self._dependency_threshold
 
     @dependency_threshold.setter
     def dependency_threshold(self, value):
+        if value != self._dependency_threshold:
+            # the mDep network belongs to the previous threshold
+            self._mDep_network_dict = None
         self._dependency_threshold = value
 
+    def dependency_index(self) -> DependencyIndex:
+        """Index of the edge dependencies for ranked queries, built on first use.
+
+        It does not depend on the threshold: mDep queries take it as an argument,
+        and get_mDep_network reads the edges above dependency_threshold from it
+        once it exists. In lazy mode building it evaluates every edge.
+
+        Raises:
+            Exception: Dependency matrix is empty
+
+        Returns:
+            DependencyIndex: per node partners and all edges ranked by dependency
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is empty")
+        if self._dependency_index is None:
+            self._dependency_index = DependencyIndex(self._G.csr(), self._dependency_blocks())
+        return self._dependency_index
+
+    def dependency_sketch(self) -> DependencySketch:
+        """Histograms and quantile sketches of d(A -> B), min(d1, d2) and the
+        estimator terms, with the suggested threshold (see mdepstar.sketch).
+
+        With max_memory the sketch is accumulated while the blocks are
+        computed; otherwise it is built in one pass over the stored
+        dependencies on first use. In lazy mode that evaluates every edge.
+        The estimated dependency_threshold is read from this sketch.
+
+        Raises:
+            Exception: Dependency matrix is empty
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is empty")
+        if self._sketch is None and self._spilled is not None:
+            self._sketch = self._spilled.sketch
+        if self._sketch is None:
+            self._sketch = DependencySketch.from_blocks(self._G.csr(), self._dependency_blocks())
+        return self._sketch
+
     def get_dependency(self, A: str, B: str) -> float:
         """Get dependency between two nodes
 
@@ -49,10 +161,60 @@ class mDepStar:
             if self._G.edge_exists(A, B):
                 return self._dependency_matrix[A][B]
             else:
-                return self._dependency(A, B)
+                return self._cached_dependency(A, B)
         else:
             raise Exception("Dependency matrix is None")
 
+    def get_dependencies(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """Dependencies of many (A, B) pairs, adjacent or not.
+
+        Pairs are grouped by A, so the neighbors and weighted degree of every
+        source node are fetched once for all of its targets.
+
+        Args:
+            pairs (list[tuple[str, str]]): (A, B) pairs
+
+        Returns:
+            list[float]: d(A -> B) in the order of pairs
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is None")
+
+        by_source: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        for k, (A, B) in enumerate(pairs):
+            by_source[A].append((k, B))
+
+        res = [0.0] * len(pairs)
+        for A, targets in by_source.items():
+            neighbors_A = self._G.neighbors(A)
+            for k, B in targets:
+                if B in neighbors_A:
+                    res[k] = self._dependency_matrix[A][B]
+                else:
+                    res[k] = self._cached_dependency(A, B, neighbors_A)
+        return res
+
+    def _cached_dependency(self, A: str, B: str, neighbors_A: frozenset[str] | None = None) -> float:
+        d = self._dependency_cache.get((A, B))
+        if d is not None:
+            self._cache_hits += 1
+            self._dependency_cache.move_to_end((A, B))
+            return d
+
+        self._cache_misses += 1
+        d = self._dependency(A, B, neighbors_A)
+        if self._cache_size > 0:
+            self._dependency_cache[(A, B)] = d
+            if len(self._dependency_cache) > self._cache_size:
+                self._dependency_cache.popitem(last=False)
+        return d
+
+    def cache_info(self) -> CacheInfo:
+        """Hits and misses of the non-edge dependency cache."""
+        return CacheInfo(
+            self._cache_hits, self._cache_misses, self._cache_size, len(self._dependency_cache)
+        )
+
     def _avg_dependency(self, edges: list[tuple[str, str]]):
 
         d = 0
@@ -101,22 +263,59 @@ class mDepStar:
         no_dep = 0
 
         if self._dependency_matrix is not None:
+            tau = self.dependency_threshold
             for neighbor in self._G.neighbors(node):
                 d1 = self._dependency_matrix[node][neighbor]
                 d2 = self._dependency_matrix[neighbor][node]
 
-                if d1 < self.dependency_threshold and d2 < self.dependency_threshold:
+                if d1 < tau and d2 < tau:
                     no_dep += 1
-                elif mDepStar._is_greater_or_equal(
-                    d1, self.dependency_threshold, 6
-                ) and mDepStar._is_greater_or_equal(d2, self.dependency_threshold, 6):
+                elif mDepStar._is_greater_or_equal(d1, tau, 6) and mDepStar._is_greater_or_equal(d2, tau, 6):
                     mutual_dep += 1
-                elif mDepStar._is_greater_or_equal(d1, self.dependency_threshold, 6):
+                elif mDepStar._is_greater_or_equal(d1, tau, 6):
                     node_is_dep_on += 1
-                elif mDepStar._is_greater_or_equal(d2, self.dependency_threshold, 6):
+                elif mDepStar._is_greater_or_equal(d2, tau, 6):
                     neighbors_are_dep_on_node += 1
         return mutual_dep, no_dep, node_is_dep_on, neighbors_are_dep_on_node
 
+    def node_dependency_profiles(self, block_slots: int = 2**16) -> dict[str, list[str] | array]:
+        """get_node_deps for every node at once.
+
+        Every directed dependency is classified once, block by block, and the
+        classes are counted per node in one array.
+
+        Raises:
+            Exception: Dependency matrix is empty
+
+        Returns:
+            dict[str, list[str] | array]: "node" (CSR order) and one count column per
+                class of PROFILE_COLUMNS, aligned with it
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is empty")
+
+        csr = self._G.csr()
+        tau = self.dependency_threshold
+        counts = array("q", [0]) * (4 * csr.num_nodes)
+        for lo, hi, forward, reverse in self._dependency_blocks(block_slots):
+            kernels.node_profiles(csr, lo, hi, forward, reverse, tau, counts)
+
+        res: dict[str, list[str] | array] = {"node": list(csr.nodes)}
+        for c, column in enumerate(PROFILE_COLUMNS):
+            res[column] = counts[c::4]
+        return res
+
+    def export_node_dependency_profiles(self, file_name: str, delimiter: str = ";") -> None:
+        """Save node_dependency_profiles as a table with a header line,
+        compressed by extension as in export."""
+        profiles = self.node_dependency_profiles()
+        columns = ("node",) + PROFILE_COLUMNS
+        with open_text(file_name, "w") as f:
+            f.write(delimiter.join(columns) + "\n")
+            for row in zip(*(profiles[c] for c in columns)):
+                f.write(delimiter.join(map(str, row)) + "\n")
+        print(f"Node dependency profiles saved as {file_name}")
+
     def _weight(self, x: str, y: str) -> float:
         if self._G.weighted:
             return self._G.weight(x, y)
@@ -146,11 +345,16 @@ class mDepStar:
 
         return self._weighted_degree_matrix[x]
 
-    def _dependency(self, x: str, y: str) -> float:
+    def _dependency(self, x: str, y: str, neighbors_x: frozenset[str] | None = None) -> float:
 
         common_sum = 0.0
 
-        for node in self._G.common_neighbors(x, y):
+        if neighbors_x is None:
+            common = self._G.common_neighbors(x, y)
+        else:
+            common = neighbors_x.intersection(self._G.neighbors(y))
+
+        for node in common:
             common_sum += self._weight(x, node) * self._r(x, node, y)
 
         denom = self._weighted_degree(x)
@@ -162,6 +366,26 @@ class mDepStar:
         )
 
     def _calc_dependency_matrix(self) -> dict[str, dict[str, float]] | None:
+        if self._max_memory is not None:
+            self._spilled = SpilledDependencies(
+                self._G.csr(),
+                self._G.weighted,
+                self._max_memory,
+                self._storage if self._storage in STORAGE_TYPECODES else "float64",
+                self._spill_directory,
+                self._progress,
+            ).compute()
+            self._dependency_matrix = self._spilled.matrix()
+            return
+
+        if self._checkpoint is not None or self._progress or self._threads > 1:
+            self._calc_blocked_dependency_matrix()
+            return
+
+        if self._storage != "dict":
+            self._calc_compact_dependency_matrix()
+            return
+
         dep_matrix: dict = defaultdict(dict)
 
         for edge in self._G.edges():
@@ -178,6 +402,41 @@ class mDepStar:
 
         self._dependency_matrix = dep_matrix
 
+    def _calc_compact_dependency_matrix(self):
+        csr = self._G.csr()
+        dep_matrix = CompactDependencyMatrix(csr, self._storage)
+        kernels.dependencies(csr, self._G.weighted, dep_matrix.values)
+
+        self._dependency_matrix = dep_matrix
+
+    def _calc_blocked_dependency_matrix(self):
+        csr = self._G.csr()
+        typecode = STORAGE_TYPECODES.get(self._storage, "d")
+        values = compute_dependencies(
+            csr,
+            self._G.weighted,
+            array(typecode, [0.0]) * csr.num_slots,
+            self._checkpoint,
+            progress=self._progress,
+            threads=self._threads,
+        )
+
+        if self._storage != "dict":
+            self._dependency_matrix = CompactDependencyMatrix(csr, self._storage, values)
+            return
+
+        dep_matrix: dict = defaultdict(dict)
+        for i, node in enumerate(csr.nodes):
+            row = dep_matrix[node]
+            for p in csr.row(i):
+                row[csr.nodes[csr.indices[p]]] = values[p]
+        self._dependency_matrix = dep_matrix
+
+    def _compact_mdep_flags(self):
+        values = self._dependency_matrix.values  # type: ignore
+        rev = kernels.reverse_slots(self._G.csr())
+        return values, rev, kernels.mdep_flags(values, rev, self.dependency_threshold)
+
     def _get_mDep_network(self):
 
         if self._dependency_matrix is None:
@@ -185,6 +444,26 @@ class mDepStar:
 
         mDep_network: dict = defaultdict(dict)
 
+        if self._dependency_index is not None:
+            for nodeA, nodeB, d1, d2 in self._dependency_index.mdep_edges(self.dependency_threshold):
+                mDep_network[nodeA][nodeB] = d1
+                mDep_network[nodeB][nodeA] = d2
+            return mDep_network
+
+        if self._spilled is not None:
+            for nodeA, nodeB, d in self._spilled.mdep_edges(self.dependency_threshold):
+                mDep_network[nodeA][nodeB] = d
+            return mDep_network
+
+        if isinstance(self._dependency_matrix, CompactDependencyMatrix):
+            csr = self._G.csr()
+            values, rev, flags = self._compact_mdep_flags()
+            for i, nodeA in enumerate(csr.nodes):
+                for p in csr.row(i):
+                    if flags[p]:
+                        mDep_network[nodeA][csr.nodes[csr.indices[p]]] = values[p]
+            return mDep_network
+
         for nodeA in self._dependency_matrix.keys():
             for nodeB in self._dependency_matrix[nodeA].keys():
                 d1 = self._dependency_matrix[nodeA][nodeB]
@@ -213,24 +492,90 @@ class mDepStar:
         return res
 
 
-    def get_complexes(self, node: str | None = None) -> set[frozenset[str]]:
+    def _star(self, node: str) -> set[str] | None:
+        """Star of node, None when node has no mutually dependent neighbor."""
+        c = set()
+        for neighbor in self._G.neighbors(node):
+            if mDepStar._is_greater_or_equal(
+                self.get_dependency(node, neighbor), self.dependency_threshold, 6
+            ) and mDepStar._is_greater_or_equal(
+                self.get_dependency(neighbor, node), self.dependency_threshold, 6
+            ):
+                c.add(neighbor)
+
+        if len(c) == 0:
+            return None
+        return set([node]).union(self._check_condition(node, c))
+
+    def get_complexes(
+        self,
+        node: str | list[str] | None = None,
+        workers: int | None = None,
+        backend: str = "process",
+    ) -> ComplexSet:
         """Get the complexes in the network based on dependency values and threshold value.
+
+        Only the edges around the requested seeds are evaluated, which in lazy
+        mode avoids computing the dependencies of the whole network.
+
+        Args:
+            node (str | list[str] | None): only the star of this protein, or the stars
+                of these seeds (with at least 3 proteins, as in the full run)
+            workers (int | None): build the stars in this many processes (0 = all cores),
+                the result is identical to the serial path
+            backend (str): "process" forks workers, "thread" builds the stars in a thread
+                pool sharing this object (serial when the interpreter has a GIL)
+
         Raises:
             Exception: Dependency matrix is empty
 
         Returns:
-            set[frozenset[str]]: Set of predicted complexes
+            ComplexSet: Set of predicted complexes (iterates as frozensets)
         """
+        res = self._get_complexes(node, workers, backend)
+        return res if isinstance(res, ComplexSet) else ComplexSet(res, self._G)
 
+    def _get_complexes(
+        self, node: str | list[str] | None, workers: int | None, backend: str
+    ) -> set[frozenset[str]] | ComplexSet:
         if self._dependency_matrix is None:
             raise Exception("Dependency matrix is empty")
 
+        if isinstance(node, str) and node in self._G.nodes():
+            star = self._star(node)
+            if star is not None:
+                return set([frozenset(star)])
+
+        if isinstance(node, list):
+            complexes = set()
+            for seed in node:
+                star = self._star(seed) if seed in self._G.nodes() else None
+                if star is not None and len(star) >= 3:
+                    complexes.add(frozenset(star))
+            return complexes
+
+        if backend not in ("process", "thread"):
+            raise ValueError(f"Unknown backend {backend}")
+
+        if backend == "thread":
+            threads = parallel.thread_workers(workers)
+            if threads > 1 and self._spilled is None:
+                return self._threaded_complexes(threads)
+            workers = None
+
+        if workers in (None, 1) and self._spilled is not None:
+            return self._spilled.complexes(self.dependency_threshold)
+
+        if workers in (None, 1) and isinstance(
+            self._dependency_matrix, CompactDependencyMatrix
+        ):
+            return self._compact_complexes()
+
         complexes: set[frozenset[str]] = set()
         mDep_network = self.get_mDep_network()
 
-        if node is not None and node in mDep_network.nodes():
-            c = set(mDep_network.neighbors(node))
-            return set([frozenset([node]).union(self._check_condition(node, c))])
+        if workers is not None and workers != 1 and parallel.can_fork():
+            return parallel.parallel_complexes(self, mDep_network, workers)
 
         for n in mDep_network.nodes():
             c = set(mDep_network.neighbors(n))
@@ -239,6 +584,50 @@ class mDepStar:
                 complexes.add(frozenset(res))
         return complexes
 
+    def _compact_complexes(self) -> ComplexSet:
+        csr = self._G.csr()
+        values, rev, flags = self._compact_mdep_flags()
+        star = kernels.star_flags(values, rev, flags, self.dependency_threshold)
+
+        # stars are added as CSR ids, which the ComplexSet of this network shares
+        complexes = ComplexSet(network=self._G)
+        for i in range(csr.num_nodes):
+            res = [i]
+            for p in csr.row(i):
+                # a self-loop slot would list the center twice
+                if star[p] and csr.indices[p] != i:
+                    res.append(csr.indices[p])
+            if len(res) >= 3:
+                complexes._add_ids(sorted(res))
+        return complexes
+
+    def _threaded_complexes(self, threads: int) -> set[frozenset[str]]:
+        if isinstance(self._dependency_matrix, CompactDependencyMatrix):
+            csr = self._G.csr()
+            values, rev, flags = self._compact_mdep_flags()
+            star = kernels.star_flags(values, rev, flags, self.dependency_threshold)
+
+            def compact_star(i: int) -> tuple[str, ...] | None:
+                res = [csr.nodes[i]]
+                for p in csr.row(i):
+                    if star[p] and csr.indices[p] != i:
+                        res.append(csr.nodes[csr.indices[p]])
+                return tuple(sorted(res)) if len(res) >= 3 else None
+
+            return parallel.threaded_complexes(compact_star, csr.num_nodes, threads)
+
+        mDep_network = self.get_mDep_network()
+        seeds = list(mDep_network.nodes())
+        # compute the threshold once before the threads read it
+        self.dependency_threshold
+
+        def dict_star(k: int) -> tuple[str, ...] | None:
+            n = seeds[k]
+            res = set([n]).union(self._check_condition(n, set(mDep_network.neighbors(n))))
+            return tuple(sorted(res)) if len(res) >= 3 else None
+
+        return parallel.threaded_complexes(dict_star, len(seeds), threads)
+
     def _get_mDep_network_edges(self, edges: list[tuple[str, str]]):
         if self._dependency_matrix is None:
             raise Exception("Dependency matrix is empty")
@@ -297,23 +686,55 @@ class mDepStar:
 
         return G
 
+    def mDep_csr(self) -> CSRGraph:
+        """mDep network at dependency_threshold as a CSRGraph over the nodes of G.csr().
+
+        The slots keep the weights of G, and nodes outside the mDep network have
+        empty rows, so the result lines up with the network for the converters
+        of mdepstar.interop (to_scipy_sparse, to_igraph, to_networkx).
+
+        Raises:
+            Exception: Dependency matrix is empty
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is empty")
+        csr = self._G.csr()
+        indptr = array("q", [0])
+        indices = array("i")
+        weights = array("d")
+        for lo, hi, forward, reverse in self._dependency_blocks():
+            mdep, _ = kernels.paired_flags(forward, reverse, self.dependency_threshold)
+            begin = csr.indptr[lo]
+            for i in range(lo, hi):
+                for p in csr.row(i):
+                    if mdep[p - begin]:
+                        indices.append(csr.indices[p])
+                        weights.append(csr.weights[p])
+                indptr.append(len(indices))
+        return CSRGraph(csr.nodes, indptr, indices, weights)
+
+    @staticmethod
     def export(
-        self, lst: set[frozenset[str]], file_name: str, delimiter: str = " "
+        lst: set[frozenset[str]] | ComplexSet, file_name: str, delimiter: str = " "
     ) -> None:
         """
         Save complexes to a file, each complex is on a separate line.
+        Compressed when file_name ends with .gz, .bz2, .xz or .zst.
         """
-        with open(file_name, "w") as f:
+        with open_text(file_name, "w") as f:
             for i in list(lst):
                 f.write(f"{delimiter.join(i)}\n")
 
     def export_mDep_network(self, file_name: str):
         """
-        Save mDep network to a file.
+        Save mDep network to a file, compressed by extension as in export.
         """
         res = []
         tmp = set()
 
+        if self._mDep_network_dict is None and self._dependency_matrix is not None:
+            self._mDep_network_dict = self._get_mDep_network()
+
         if self._mDep_network_dict is not None:
             for i in self._mDep_network_dict.keys():
                 for j in self._mDep_network_dict[i].keys():
@@ -324,10 +745,58 @@ class mDepStar:
                 a.append(self._G.get_edge_weight(a[0], a[1]))
                 res.append(a)
             print(f"Mdep networks saved as {file_name}")
-            with open(file_name, "w") as f:
+            with open_text(file_name, "w") as f:
                 for i in res:
                     f.write(f"{i[0]};{i[1]};{i[2]}\n")
 
+    def _dependency_blocks(self, block_slots: int = 2**16):
+        """(lo, hi, forward, reverse) for consecutive row blocks, see write_dependency_table."""
+        csr = self._G.csr()
+
+        if self._spilled is not None:
+            for k in range(len(self._spilled.blocks)):
+                yield self._spilled.read_block(k)
+            return
+
+        if isinstance(self._dependency_matrix, CompactDependencyMatrix):
+            values = self._dependency_matrix.values
+            rev = kernels.reverse_slots(csr)
+            for lo, hi in row_blocks(csr, block_slots):
+                begin, end = csr.indptr[lo], csr.indptr[hi]
+                reverse = array(values.typecode, (values[rev[p]] for p in range(begin, end)))
+                yield lo, hi, values[begin:end], reverse
+            return
+
+        matrix = self._dependency_matrix
+        for lo, hi in row_blocks(csr, block_slots):
+            forward = array("d")
+            reverse = array("d")
+            for i in range(lo, hi):
+                A = csr.nodes[i]
+                for p in csr.row(i):
+                    B = csr.nodes[csr.indices[p]]
+                    forward.append(matrix[A][B])  # type: ignore
+                    reverse.append(matrix[B][A])  # type: ignore
+            yield lo, hi, forward, reverse
+
+    def export_dependency_table(self, file_name: str, block_slots: int = 2**16) -> int:
+        """Save d(a -> b), d(b -> a), weight and mDep membership of every edge.
+
+        The format follows the extension (.parquet, .arrow/.feather or .npz),
+        see mdepstar.table; read it back with mdepstar.table.read_dependency_table.
+
+        Returns:
+            int: number of edges written
+        """
+        if self._dependency_matrix is None:
+            raise Exception("Dependency matrix is empty")
+
+        rows = write_dependency_table(
+            file_name, self._G.csr(), self._dependency_blocks(block_slots), self.dependency_threshold
+        )
+        print(f"Dependency table saved as {file_name}")
+        return rows
+
     @staticmethod
     def _is_greater_or_equal(x: float, y: float, decimals=6) -> bool:
         """Rounding precision errors"""
@@ -1,5 +1,17 @@
+from array import array
 from collections import defaultdict
+from collections.abc import Iterable
 import networkx as nx
+from .CSRGraph import CSRGraph
+from . import interop, ordering
+from .compression import open_text
+
+def _find(parent: list[int], x: int) -> int:
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
 
 class Network(object):
 
@@ -11,13 +23,48 @@ class Network(object):
                             ] = defaultdict(lambda: defaultdict(float))
 
         self._weighted = False
+        # further weightings of every edge by name, stored symmetric as _network
+        self._weightings: dict[str, dict[str, dict[str, float]]] = {}
         self._neighbors = defaultdict(list)
+        # frozenset views of _neighbors, built on first use and dropped when an edge changes
+        self._neighbor_sets: dict[str, frozenset[str]] = {}
         self._file_name: str = None
+        self._csr: CSRGraph | None = None
+        self._order: str | None = None
 
     def __str__(self) -> str:
         return f"{len(self._nodes)} nodes - {len(self._edges)} edges - {hex(id(self))}"
 
-    def read_file(self, file_name: str, sep=';', weighted=False):
+    def read_file(
+        self,
+        file_name: str,
+        sep=';',
+        weighted=False,
+        min_weight: float | None = None,
+        allow: Iterable[str] | None = None,
+        deny: Iterable[str] | None = None,
+        self_loops: bool = True,
+        largest_component: bool = False,
+        weight_columns: dict[str, int] | None = None,
+    ):
+        """Read the edges nodeA<sep>nodeB[<sep>weight], filtering them while parsing.
+
+        A rejected edge is never added to the network. A repeated or reversed
+        pair keeps the weight of its first line.
+
+        Args:
+            file_name (str): edge list, compressed when ending with .gz, .bz2, .xz or .zst
+            sep (str): column delimiter
+            weighted (bool): read the third column as the edge weight
+            min_weight (float | None): drop edges lighter than this
+            allow (Iterable[str] | None): keep only edges between these nodes
+            deny (Iterable[str] | None): drop edges touching these nodes
+            self_loops (bool): keep edges from a node to itself
+            largest_component (bool): keep only the largest connected component,
+                found with a union-find over the kept lines
+            weight_columns (dict[str, int] | None): further weightings to read, name ->
+                zero-based column (e.g. {"experimental": 3}), see weighting_csr
+        """
 
         self._file_name = file_name
         self._weighted = weighted
@@ -25,20 +72,61 @@ class Network(object):
         if len(self.edges()) > 0:
             raise Exception("Edges already exists")
 
-        f = open(file_name, "r")
-
-        if weighted:
-            for l in f.read().splitlines():
-                node = l.split(sep)
-
-                if ',' in node[2]:
-                    self.add_edge(node[0], node[1], float(node[2].replace(',', '.')))
-                else:
-                    self.add_edge(node[0], node[1], float(node[2]))
-        else:
-            for l in f.read().splitlines():
-                node = l.split(sep)
-                self.add_edge(node[0], node[1], 1)
+        if allow is not None:
+            allow = frozenset(allow)
+        deny = frozenset(() if deny is None else deny)
+        columns = {} if weight_columns is None else dict(weight_columns)
+        for name in columns:
+            self._weightings.setdefault(name, defaultdict(dict))
+
+        # with largest_component the kept edges wait here until the components are known
+        pending: list[tuple[str, str, float, dict[str, float] | None]] = []
+        ids: dict[str, int] = {}
+        parent: list[int] = []
+        size: list[int] = []
+
+        with open_text(file_name, "r") as f:
+            for l in f:
+                node = l.rstrip("\n").split(sep)
+                a, b = node[0], node[1]
+                weight = float(node[2].replace(',', '.')) if weighted else 1
+                weights = None
+                if columns:
+                    weights = {name: float(node[c].replace(',', '.')) for name, c in columns.items()}
+
+                if not self_loops and a == b:
+                    continue
+                if min_weight is not None and weight < min_weight:
+                    continue
+                if allow is not None and (a not in allow or b not in allow):
+                    continue
+                if deny and (a in deny or b in deny):
+                    continue
+
+                if not largest_component:
+                    self.add_edge(a, b, weight, weights)
+                    continue
+
+                pending.append((a, b, weight, weights))
+                for n in (a, b):
+                    if n not in ids:
+                        ids[n] = len(parent)
+                        parent.append(len(parent))
+                        size.append(1)
+                ra, rb = _find(parent, ids[a]), _find(parent, ids[b])
+                if ra != rb:
+                    if size[ra] < size[rb]:
+                        ra, rb = rb, ra
+                    parent[rb] = ra
+                    size[ra] += size[rb]
+
+        if pending:
+            # the largest component, the earliest one read among equals
+            root = max(range(len(parent)), key=lambda i: (size[_find(parent, i)], -i))
+            root = _find(parent, root)
+            for a, b, weight, weights in pending:
+                if _find(parent, ids[a]) == root:
+                    self.add_edge(a, b, weight, weights)
 
     @property
     def weighted(self):
@@ -71,18 +159,27 @@ class Network(object):
 
         return n / len(self.nodes())
     
-    def add_edge(self, a: str, b: str, weight: float):
+    def add_edge(self, a: str, b: str, weight: float, weightings: dict[str, float] | None = None):
         if not self.edge_exists(a, b) and not self.edge_exists(b, a):
 
             self._network[a][b] = weight
             self._network[b][a] = weight
 
+            if weightings:
+                for name, w in weightings.items():
+                    table = self._weightings.setdefault(name, defaultdict(dict))
+                    table[a][b] = w
+                    table[b][a] = w
+
             self._neighbors[a].append(b)
             self._neighbors[b].append(a)
 
             self._edges.append((a, b))
             self.add_node(a)
             self.add_node(b)
+            self._neighbor_sets.pop(a, None)
+            self._neighbor_sets.pop(b, None)
+            self._csr = None
 
     def remove_edge(self, a: str, b: str):
         if self.edge_exists(a, b):
@@ -94,9 +191,15 @@ class Network(object):
         
             del self._network[a][b]
             del self._network[b][a]
+            for table in self._weightings.values():
+                table[a].pop(b, None)
+                table[b].pop(a, None)
+            self._csr = None
 
             self._neighbors[a].remove(b)
             self._neighbors[b].remove(a)
+            self._neighbor_sets.pop(a, None)
+            self._neighbor_sets.pop(b, None)
 
             try:
                 self._edges.remove((a, b))
@@ -118,15 +221,21 @@ class Network(object):
         return len(self.neighbors(node))
     
     def clustering_coeficient_node(self, node: str):
-        nodes_around = self.neighbors_depth(set([node]), 0, 1)
-        nodes_around.remove(node)
+        neighbors = self.neighbors(node)
 
         degree = self.degree(node)
 
         if degree == 1:
             return 0
 
-        return (2 * len(self.induced_subgraph(nodes_around).edges())) / (degree * (degree - 1))
+        # every edge between two neighbors is found from both of its ends
+        links = 0
+        for u in neighbors:
+            if u != node:
+                common = neighbors.intersection(self.neighbors(u))
+                links += len(common) - (node in common) - (u in common)
+
+        return links / (degree * (degree - 1))
 
     def clustering_coeficient(self):
         if len(self.nodes()) == 0:
@@ -141,13 +250,67 @@ class Network(object):
         return self._network[a][b]
 
     def neighbors(self, node: str) -> frozenset[str]:
-        return frozenset(self._neighbors[node])
+        res = self._neighbor_sets.get(node)
+        if res is None:
+            res = self._neighbor_sets[node] = frozenset(self._neighbors[node])
+        return res
 
     def common_neighbors(self, x: str, y: str) -> frozenset[str]:
+        # frozenset.intersection probes the larger set with the members of the smaller one
         return self.neighbors(x).intersection(self.neighbors(y))
 
     def weight(self, nodeA: str, nodeB: str) -> float:
-        return self._network[nodeA][nodeB]
+        # 0 for non-adjacent pairs, without inserting them into the network
+        return self._network[nodeA].get(nodeB, 0.0)
+
+    def csr(self) -> CSRGraph:
+        """Integer CSR form of the network, rebuilt after the network changes."""
+        if self._csr is None:
+            self._csr = CSRGraph.from_network(self)
+            if self._order is not None:
+                self._csr = self._csr.permute(ordering.permutation(self._csr, self._order))
+        return self._csr
+
+    def weightings(self) -> list[str]:
+        """Names of the further weightings, in the order they were read."""
+        return list(self._weightings)
+
+    def weighting_csr(self, name: str | None) -> CSRGraph:
+        """csr() with the weights of a further weighting, or unit weights for None.
+
+        The result shares nodes, indptr and indices with csr(), so per-slot
+        arrays of all weightings line up. An edge the weighting does not cover
+        weighs 0.
+
+        Args:
+            name (str | None): a name from weightings(), None for the unweighted network
+        """
+        csr = self.csr()
+        if name is None:
+            weights = array("d", [1.0]) * csr.num_slots
+        elif name not in self._weightings:
+            raise ValueError(f"Unknown weighting {name}, expected one of {', '.join(self._weightings)}")
+        else:
+            table = self._weightings[name]
+            nodes, indices = csr.nodes, csr.indices
+            weights = array("d", [0.0]) * csr.num_slots
+            for i, node in enumerate(nodes):
+                row = table.get(node, {})
+                for p in csr.row(i):
+                    weights[p] = row.get(nodes[indices[p]], 0.0)
+        return csr.with_weights(weights)
+
+    def reorder(self, method: str | None):
+        """Number the CSR nodes in a locality preserving order.
+
+        Args:
+            method (str | None): "degree", "rcm" or "community" (see
+                mdepstar.ordering), None for the reading order
+        """
+        if method is not None and method not in ordering.ORDERS:
+            raise ValueError(f"Unknown node order {method}, expected one of {', '.join(ordering.ORDERS)}")
+        self._order = method
+        self._csr = None
 
     def edges(self) -> list[tuple[str, str]]:
         return self._edges
@@ -188,19 +351,59 @@ class Network(object):
 
             return self.neighbors_depth(res, current_depth + 1, max_depth)
         
-    def to_networkx(self) -> nx.Graph:
-        
-        tmp_G : nx.Graph = nx.Graph()
-        for e in self.edges():
-            tmp_G.add_edge(e[0], e[1], weight=self.weight(e[0], e[1]), label = e[0] +'-'+ e[1])
+    def to_networkx(self, labels: bool = False) -> nx.Graph:
+        """nx.Graph with the edge weights, added in bulk; labels adds an "a-b" label to every edge."""
+        tmp_G: nx.Graph = nx.Graph()
+        network = self._network
+        if labels:
+            tmp_G.add_edges_from(
+                (a, b, {"weight": network[a][b], "label": a + '-' + b}) for a, b in self._edges
+            )
+        else:
+            tmp_G.add_weighted_edges_from((a, b, network[a][b]) for a, b in self._edges)
 
         return tmp_G
 
-    def save_to_file(self, file_name:str):
-        f = open(file_name, mode='w')
-
-        for i in self._edges:
-            f.write(';'.join(i) + ';' + str(self.get_edge_weight(i[0], i[1])) + '\n')
+    def to_scipy_sparse(self):
+        """Weighted adjacency as a scipy.sparse.csr_array sharing the CSR buffers,
+        row i is ``self.csr().nodes[i]`` (see mdepstar.interop.to_scipy_sparse)."""
+        return interop.to_scipy_sparse(self.csr())
+
+    def to_igraph(self):
+        """igraph.Graph with vertex names and edge weights, in CSR order."""
+        return interop.to_igraph(self.csr())
+
+    @staticmethod
+    def from_scipy_sparse(
+        matrix, nodes: list[str] | None = None, weighted: bool = True, self_loops: bool = True
+    ) -> "Network":
+        """Network of a symmetric sparse matrix, diagonal entries are self-loops.
+
+        Unless some row is empty, csr() then reads the matrix buffers instead
+        of being rebuilt (see mdepstar.interop.from_scipy_sparse).
+
+        Args:
+            matrix: SciPy sparse matrix or array
+            nodes (list[str] | None): name of every row, "0", "1", ... by default
+            weighted (bool): weighted network
+            self_loops (bool): keep the diagonal entries, as in read_file
+
+        Returns:
+            Network: the network
+        """
+        csr = interop.from_scipy_sparse(matrix, nodes, self_loops)
+        res = Network()
+        res.weighted = weighted
+        names = csr.nodes
+        for i, j, w in zip(*interop.edge_list(csr)):
+            res.add_edge(names[i], names[j], w)
+        if all(csr.degree(i) > 0 for i in range(csr.num_nodes)):
+            res._csr = csr
+        return res
 
-        f.close()
+    def save_to_file(self, file_name:str):
+        """Save the edges as nodeA;nodeB;weight, compressed when file_name ends with .gz, .bz2, .xz or .zst."""
+        with open_text(file_name, "w") as f:
+            for i in self._edges:
+                f.write(';'.join(i) + ';' + str(self.get_edge_weight(i[0], i[1])) + '\n')
 
@@ -1,2 +1,7 @@
 from .Network import Network
-from .Mdepstar import mDepStar
\ No newline at end of file
+from .Mdepstar import mDepStar
+from .CSRGraph import CSRGraph
+from .ComplexSet import ComplexSet
+from .DependencyMatrix import CompactDependencyMatrix
+from .DependencyIndex import DependencyIndex
+from .checkpoint import Checkpoint, TimeBudgetExceeded
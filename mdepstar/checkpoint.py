@@ -0,0 +1,175 @@
+import json
+import os
+import time
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from . import kernels
+from .CSRGraph import CSRGraph
+
+CHECKPOINT_VERSION = 1
+
+
+class TimeBudgetExceeded(Exception):
+    """The time budget ran out; the last checkpoint holds the progress so far."""
+
+
+class Checkpoint(object):
+    """Where and how often the dependency pass saves its partial results.
+
+    The file holds a one line JSON header followed by the raw values of the
+    finished slots. Writes go through a temporary file and os.replace, so a
+    killed job always leaves the previous complete checkpoint behind.
+
+    Args:
+        path (str): checkpoint file
+        interval (float): seconds between checkpoints
+        resume (bool): continue from the checkpoint in path, if there is one
+        time_budget (float | None): seconds after which the pass saves and raises TimeBudgetExceeded
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = 60.0,
+        resume: bool = False,
+        time_budget: float | None = None,
+    ) -> None:
+        self.path = path
+        self.interval = interval
+        self.resume = resume
+        self.time_budget = time_budget
+
+    @staticmethod
+    def fingerprint(csr: CSRGraph, weighted: bool) -> int:
+        crc = zlib.crc32(csr.indptr.tobytes())
+        crc = zlib.crc32(csr.indices.tobytes(), crc)
+        crc = zlib.crc32(csr.weights.tobytes(), crc)
+        crc = zlib.crc32("\0".join(csr.nodes).encode(), crc)
+        return zlib.crc32(str(weighted).encode(), crc)
+
+    def load(self, csr: CSRGraph, weighted: bool, out: array) -> int:
+        """Copy the saved values into out, returns the first row still to compute."""
+        if not self.resume or not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as f:
+            header = json.loads(f.readline())
+            if header["version"] != CHECKPOINT_VERSION or header[
+                "fingerprint"
+            ] != Checkpoint.fingerprint(csr, weighted):
+                raise Exception(f"Checkpoint {self.path} belongs to a different network")
+
+            values = array(header["typecode"])
+            values.frombytes(f.read())
+
+        if len(values) != header["slots"]:
+            raise Exception(f"Checkpoint {self.path} is truncated")
+
+        out[: len(values)] = array(out.typecode, values)
+        return header["next_row"]
+
+    def save(self, csr: CSRGraph, weighted: bool, out: array, next_row: int) -> None:
+        slots = csr.indptr[next_row]
+        header = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": Checkpoint.fingerprint(csr, weighted),
+            "typecode": out.typecode,
+            "next_row": next_row,
+            "slots": slots,
+        }
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(out[:slots].tobytes())
+        os.replace(tmp, self.path)
+
+
+def row_blocks(csr: CSRGraph, block_slots: int, start: int = 0) -> list[tuple[int, int]]:
+    """Consecutive row ranges holding about block_slots slots each."""
+    blocks = []
+    begin = start
+    for i in range(start, csr.num_nodes):
+        if csr.indptr[i + 1] - csr.indptr[begin] >= block_slots:
+            blocks.append((begin, i + 1))
+            begin = i + 1
+    if begin < csr.num_nodes:
+        blocks.append((begin, csr.num_nodes))
+    return blocks
+
+
+def compute_dependencies(
+    csr: CSRGraph,
+    weighted: bool,
+    out: array,
+    checkpoint: Checkpoint | None = None,
+    block_slots: int = 2**16,
+    progress: bool = False,
+    threads: int = 1,
+) -> array:
+    """Fill out with the dependency of every CSR slot, one block of rows at a time.
+
+    Progress and throughput (edges/s) are reported with tqdm when progress is
+    set; with a checkpoint the partial array is saved every checkpoint.interval
+    seconds and after the last block.
+
+    With threads > 1 the blocks are computed by a thread pool, each block
+    writing its own disjoint range of out (blocks are shrunk to give every
+    thread about four). Blocks are consumed in order, so a checkpoint always
+    covers a finished prefix of the rows.
+
+    Raises:
+        TimeBudgetExceeded: checkpoint.time_budget ran out (progress is saved first)
+    """
+    start = 0 if checkpoint is None else checkpoint.load(csr, weighted, out)
+    wdeg = kernels.weighted_degrees(csr, weighted)
+
+    began = last_saved = time.monotonic()
+    bar = tqdm(
+        total=csr.num_slots,
+        initial=csr.indptr[start],
+        unit="edge",
+        unit_scale=True,
+        disable=not progress,
+    )
+
+    def run(block: tuple[int, int]) -> tuple[int, int]:
+        kernels.dependencies(csr, weighted, out, wdeg, block[0], block[1])
+        return block
+
+    if threads > 1:
+        block_slots = max(1, min(block_slots, (csr.num_slots - csr.indptr[start]) // (4 * threads)))
+    blocks = row_blocks(csr, block_slots, start)
+    pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+
+    try:
+        done = map(run, blocks) if pool is None else pool.map(run, blocks)
+        for lo, hi in done:
+            bar.update(csr.indptr[hi] - csr.indptr[lo])
+
+            if checkpoint is None:
+                continue
+
+            now = time.monotonic()
+            if hi == csr.num_nodes or now - last_saved >= checkpoint.interval:
+                checkpoint.save(csr, weighted, out, hi)
+                last_saved = now
+
+            if (
+                checkpoint.time_budget is not None
+                and hi < csr.num_nodes
+                and now - began >= checkpoint.time_budget
+            ):
+                if last_saved != now:
+                    checkpoint.save(csr, weighted, out, hi)
+                raise TimeBudgetExceeded(
+                    f"Time budget exceeded after {hi} of {csr.num_nodes} nodes, resume from {checkpoint.path}"
+                )
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        bar.close()
+
+    return out
@@ -1,5 +1,26 @@
 import argparse
-from mdepstar import mDepStar, Network
+import json
+import os
+import sys
+from mdepstar import Checkpoint, mDepStar, Network, TimeBudgetExceeded
+from mdepstar.distributed import env_authkey, run_partitioned
+from mdepstar.merging import merge_similar
+from mdepstar.nullmodel import complex_pvalues
+from mdepstar.compression import open_text
+from mdepstar.outofcore import parse_memory
+from mdepstar.sketch import DependencySketch
+from mdepstar.weightings import export_weighting_tables
+
+
+def _weight_columns(value: str) -> dict[str, int]:
+    res = {}
+    for item in value.split(","):
+        name, _, column = item.partition("=")
+        if not name or not column.isdigit():
+            raise argparse.ArgumentTypeError(f"Expected NAME=COLUMN, got {item}")
+        res[name] = int(column)
+    return res
+
 
 parser = argparse.ArgumentParser(
     prog="mDepStar", description="Mutually Dependent Star method", epilog="Help"
@@ -22,44 +43,353 @@ parser.add_argument("-o", "--output", help="Export predicted complexes")
 parser.add_argument(
     "-m", "--mdepexport", action="store_true", help="Export mDep network"
 )
+parser.add_argument(
+    "--compress",
+    choices=["gz", "bz2", "xz", "zst"],
+    help="Compress the -o and -m outputs (the network file is detected by extension)",
+)
+parser.add_argument(
+    "--dependency-table",
+    help="Export every edge's dependencies and mDep membership (.parquet, .arrow or .npz)",
+)
+parser.add_argument(
+    "--weighting-tables",
+    metavar="FILE",
+    help="Export a dependency table per weighting (weight, unweighted, --weight-columns) "
+    "from one pass, FILE.<weighting>.<ext>",
+)
+parser.add_argument(
+    "--node-profiles",
+    help="Export per protein counts of mutual, no, outgoing and incoming dependencies (delimited text)",
+)
+parser.add_argument(
+    "--sketch",
+    action="store_true",
+    help="Print quantiles of the dependency distribution and the suggested threshold",
+)
+parser.add_argument(
+    "--top-edges",
+    type=int,
+    metavar="K",
+    help="Print the K edges with the highest mutual dependency min(d(a->b), d(b->a))",
+)
+parser.add_argument(
+    "--merge-similar",
+    type=float,
+    metavar="SCORE",
+    help="Collapse predicted complexes whose overlap score reaches SCORE (MinHash/LSH)",
+)
+parser.add_argument(
+    "--merge-mode",
+    default="merge",
+    choices=["merge", "drop"],
+    help="Replace near duplicates by their union, or keep only the largest",
+)
+parser.add_argument(
+    "--null-replicates",
+    type=int,
+    metavar="R",
+    help="Empirical p-values of the complexes against R degree-preserving rewirings (-j chains)",
+)
 parser.add_argument("-w", "--weighted", action="store_true", help="Weighted network")
-parser.add_argument("-n", "--node", help="Specific protein node")
+parser.add_argument(
+    "--weight-columns",
+    type=_weight_columns,
+    metavar="NAME=COL,...",
+    help="Read further weightings from these zero-based columns, e.g. experimental=3,textmining=4",
+)
+parser.add_argument(
+    "--min-weight", type=float, help="Skip network edges lighter than this while reading"
+)
+parser.add_argument(
+    "--keep-nodes", help="File with one node per line, read only edges between these nodes"
+)
+parser.add_argument(
+    "--drop-nodes", help="File with one node per line, skip edges touching these nodes"
+)
+parser.add_argument(
+    "--no-self-loops", action="store_true", help="Skip edges from a node to itself"
+)
+parser.add_argument(
+    "--largest-component",
+    action="store_true",
+    help="Keep only the largest connected component of the network",
+)
+parser.add_argument(
+    "--reorder",
+    choices=["degree", "rcm", "community"],
+    help="Renumber the nodes of the integer CSR view for memory locality (see mdepstar.ordering)",
+)
+parser.add_argument("-n", "--node", nargs="+", help="Specific protein node(s)")
+parser.add_argument(
+    "--storage",
+    default="dict",
+    choices=["dict", "float32", "float64"],
+    help="Dependency storage, float32/float64 use a compact array instead of nested dicts",
+)
+
+parser.add_argument(
+    "--lazy",
+    action="store_true",
+    help="Compute dependencies only around the -n seeds instead of the whole network",
+)
+parser.add_argument(
+    "--threshold-cache",
+    help="JSON file remembering estimated dependency thresholds per network file",
+)
+parser.add_argument(
+    "--checkpoint", help="Periodically save the dependency computation to this file"
+)
+parser.add_argument(
+    "--checkpoint-interval",
+    type=float,
+    default=60.0,
+    help="Seconds between checkpoints",
+)
+parser.add_argument(
+    "--resume", action="store_true", help="Resume from the --checkpoint file"
+)
+parser.add_argument(
+    "--time-budget",
+    type=float,
+    help="Stop after this many seconds with exit code 75, progress is kept in --checkpoint",
+)
+parser.add_argument(
+    "--progress", action="store_true", help="Show progress of the dependency computation"
+)
+parser.add_argument(
+    "--max-memory",
+    type=parse_memory,
+    help="Compute dependencies in blocks fitting this memory (e.g. 512M) and spill them to disk; "
+    "the budget covers the blocks, the network itself stays in memory",
+)
+parser.add_argument("--spill-dir", help="Directory for --max-memory blocks")
+parser.add_argument(
+    "--partitions",
+    type=int,
+    help="Split the network over this many worker processes (see mdepstar.distributed)",
+)
+parser.add_argument(
+    "--partition-method", default="hash", choices=["hash", "bfs"], help="Node partitioner"
+)
+parser.add_argument(
+    "--listen",
+    help="HOST:PORT to wait for remote --partitions workers on, instead of starting local ones",
+)
+parser.add_argument(
+    "-j",
+    "--workers",
+    type=int,
+    default=1,
+    help="Worker processes for star construction, 0 uses all cores",
+)
+parser.add_argument(
+    "-t",
+    "--threads",
+    type=int,
+    help="Threads for the dependency and star phases instead of processes, 0 uses all cores",
+)
 
 args = parser.parse_args()
 
 G: Network = Network()
 
-G.read_file(args.filename, args.delimiter, args.weighted)
 
-print(f"<k> {G.avg_degree}, <CC> {G.clustering_coeficient()}")
+
+def _node_list(file_name: str | None) -> list[str] | None:
+    if file_name is None:
+        return None
+    with open_text(file_name, "r") as f:
+        return [l.strip() for l in f if l.strip()]
+
+
+G.read_file(
+    args.filename,
+    args.delimiter,
+    args.weighted,
+    min_weight=args.min_weight,
+    allow=_node_list(args.keep_nodes),
+    deny=_node_list(args.drop_nodes),
+    self_loops=not args.no_self_loops,
+    largest_component=args.largest_component,
+    weight_columns=args.weight_columns,
+)
+G.reorder(args.reorder)
+
+if not args.lazy:
+    print(f"<k> {G.avg_degree}, <CC> {G.clustering_coeficient()}")
 
 print("{} nodes / {} edges".format(len(G.nodes()), len(G.edges())))
 
 
+def _threshold_key() -> str:
+    stat = os.stat(args.filename)
+    key = f"{os.path.abspath(args.filename)}:{stat.st_size}:{stat.st_mtime_ns}:{args.weighted}"
+    # the loading filters change the network, and so its threshold
+    filters = (args.min_weight, args.keep_nodes, args.drop_nodes, args.no_self_loops, args.largest_component)
+    if any(filters):
+        key += ":" + ":".join(map(str, filters))
+    return key
+
+
+def _cached_threshold() -> float | None:
+    if args.threshold_cache is None or not os.path.exists(args.threshold_cache):
+        return None
+    with open(args.threshold_cache, "r") as f:
+        return json.load(f).get(_threshold_key())
+
+
+def _save_threshold(value: float):
+    cache = {}
+    if os.path.exists(args.threshold_cache):
+        with open(args.threshold_cache, "r") as f:
+            cache = json.load(f)
+    cache[_threshold_key()] = value
+    with open(args.threshold_cache, "w") as f:
+        json.dump(cache, f, indent=1)
+
+
+def _suffix() -> str:
+    return "" if args.compress is None else "." + args.compress
+
+
+def _export(res):
+    if args.output:
+        print(
+            "Found {} complexes, file name {}".format(
+                len(res), args.output + "_clusters.txt" + _suffix()
+            )
+        )
+        mDepStar.export(res, args.output + "_clusters.txt" + _suffix())
+    else:
+        print("Found {} complexes, no output (use -o)".format(len(res)))
+
+
+def _partitioned():
+    address = None
+    if args.listen is not None:
+        try:
+            env_authkey()
+        except Exception as e:
+            parser.error(str(e))
+        host, port = args.listen.rsplit(":", 1)
+        address = (host, int(port))
+
+    sketch = DependencySketch() if args.sketch else None
+    dependency, res = run_partitioned(
+        G,
+        args.partitions,
+        args.dependency,
+        args.partition_method,
+        address,
+        local_workers=args.listen is None,
+        sketch=sketch,
+    )
+    if sketch is not None:
+        print(sketch.report())
+    print(f"Dependency -> {dependency}")
+    _export(res)
+
+
 def main():
-    mdep_star = mDepStar(G)
+    if args.partitions is not None:
+        _partitioned()
+        return
+
+    checkpoint = None
+    if args.checkpoint is not None:
+        checkpoint = Checkpoint(
+            args.checkpoint, args.checkpoint_interval, args.resume, args.time_budget
+        )
+    elif args.resume or args.time_budget is not None:
+        parser.error("--resume and --time-budget need --checkpoint")
+    if args.max_memory is not None and (args.checkpoint is not None or args.threads not in (None, 1)):
+        parser.error("--max-memory cannot be combined with --checkpoint or --threads")
+
+    try:
+        mdep_star = mDepStar(
+            G,
+            storage=args.storage,
+            lazy=args.lazy,
+            checkpoint=checkpoint,
+            progress=args.progress,
+            max_memory=args.max_memory,
+            spill_directory=args.spill_dir,
+            threads=args.threads,
+        )
+    except TimeBudgetExceeded as e:
+        print(e)
+        sys.exit(75)
 
     if not args.dependency:
-        print(f"Estimated dependency -> {mdep_star.dependency_threshold}")
+        cached = _cached_threshold()
+        if cached is not None:
+            mdep_star.dependency_threshold = cached
+            print(f"Cached dependency -> {cached}")
+        else:
+            print(f"Estimated dependency -> {mdep_star.dependency_threshold}")
+            if args.threshold_cache is not None:
+                _save_threshold(mdep_star.dependency_threshold)
     else:
         mdep_star.dependency_threshold = float(args.dependency)
 
-    res = mdep_star.get_complexes(args.node)
+    if args.sketch:
+        print(mdep_star.dependency_sketch().report())
+
+    if args.top_edges:
+        index = mdep_star.dependency_index()
+        print(f"Top {args.top_edges} of {len(index)} edges by mutual dependency")
+        for a, b, d_ab, d_ba in index.top_edges(args.top_edges):
+            print(f"{a};{b};{d_ab};{d_ba}")
+
+    node = args.node
+    if node is not None and len(node) == 1:
+        node = node[0]
+
+    if args.threads is not None:
+        res = mdep_star.get_complexes(node, args.threads, backend="thread")
+    else:
+        res = mdep_star.get_complexes(node, args.workers)
+
+    if args.merge_similar is not None:
+        res = merge_similar(res, args.merge_similar, args.merge_mode)
 
     if args.mdepexport:
         mdep_star.export_mDep_network(
-            "{}_mDep.csv".format(args.filename.split("\\")[-1].split("_")[0])
+            "{}_mDep.csv{}".format(args.filename.split("\\")[-1].split("_")[0], _suffix())
         )
 
-    if args.output:
-        print(
-            "Found {} complexes, file name {}".format(
-                len(res), args.output + "_clusters.txt"
-            )
+    if args.dependency_table:
+        mdep_star.export_dependency_table(args.dependency_table)
+
+    if args.weighting_tables:
+        export_weighting_tables(
+            G, args.weighting_tables, thresholds={"weight" if args.weighted else "unweighted": mdep_star.dependency_threshold}
         )
-        mdep_star.export(res, args.output + "_clusters.txt")
-    else:
-        print("Found {} complexes, no output (use -o)".format(len(res)))
+
+    if args.node_profiles:
+        mdep_star.export_node_dependency_profiles(args.node_profiles)
+
+    _export(res)
+
+    if args.null_replicates:
+        _pvalues(res)
+
+
+def _pvalues(res):
+    workers = None if args.workers == 1 else args.workers
+    observed, pvalues = complex_pvalues(G, res, args.null_replicates, workers=workers)
+    print(
+        "{} of {} complexes with p <= 0.05 over {} rewirings".format(
+            sum(1 for p in pvalues if p <= 0.05), len(res), args.null_replicates
+        )
+    )
+    if args.output:
+        file_name = args.output + "_pvalues.txt" + _suffix()
+        with open_text(file_name, "w") as f:
+            for c, d, p in zip(res, observed, pvalues):
+                f.write(f"{p}\t{d}\t{' '.join(c)}\n")
+        print(f"P-values saved as {file_name}")
 
 
 if __name__ == "__main__":
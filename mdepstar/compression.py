@@ -0,0 +1,127 @@
+"""Text files compressed with gzip, bzip2, xz or zstd, detected by extension.
+
+Compressed input is decompressed by a background thread a chunk ahead of the
+parser. zlib, bz2 and lzma release the GIL while they work, so decompression
+overlaps with parsing even on interpreters with a GIL. zstd needs the optional
+zstandard package and compresses on all cores when writing.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 2**20
+PREFETCH_CHUNKS = 4
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+EXTENSIONS = (".gz", ".bz2", ".xz", ".zst")
+
+
+def codec(file_name: str) -> str | None:
+    """Compression of file_name by its extension, None for plain text."""
+    for ext in EXTENSIONS:
+        if file_name.endswith(ext):
+            return ext[1:]
+    return None
+
+
+def _open_binary(file_name: str, mode: str, kind: str):
+    if kind == "gz":
+        return gzip.open(file_name, mode, compresslevel=GZIP_LEVEL) if mode == "wb" else gzip.open(file_name, mode)
+    if kind == "bz2":
+        return bz2.open(file_name, mode)
+    if kind == "xz":
+        return lzma.open(file_name, mode)
+
+    if zstandard is None:
+        raise ImportError(f"{file_name}: zstd files need the zstandard package (pip install mDepStar[zstd])")
+    if mode == "wb":
+        return zstandard.open(file_name, mode, cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1))
+    return zstandard.open(file_name, mode)
+
+
+class _Prefetcher(io.RawIOBase):
+    """Reads a decompressing stream in a background thread.
+
+    Decompressed chunks are handed over through a bounded queue, so at most
+    PREFETCH_CHUNKS chunks are held ahead of the reader.
+    """
+
+    def __init__(self, stream, chunk_size: int = CHUNK_SIZE) -> None:
+        super().__init__()
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._queue: queue.Queue = queue.Queue(PREFETCH_CHUNKS)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                chunk = self._stream.read(self._chunk_size)
+                if not self._put(chunk) or not chunk:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = memoryview(item)
+
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+def open_text(file_name: str, mode: str = "r"):
+    """Open a text file for reading ("r") or writing ("w"), compressed or not by its extension."""
+    if mode not in ("r", "w"):
+        raise ValueError(f"Unsupported mode {mode}")
+
+    kind = codec(file_name)
+    if kind is None:
+        return open(file_name, mode)
+
+    if mode == "w":
+        return io.TextIOWrapper(_open_binary(file_name, "wb", kind))
+    return io.TextIOWrapper(io.BufferedReader(_Prefetcher(_open_binary(file_name, "rb", kind)), CHUNK_SIZE))
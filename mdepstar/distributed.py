@@ -0,0 +1,274 @@
+"""Partitioned execution of mDepStar over several worker processes or machines.
+
+The coordinator splits the nodes into partitions and sends every worker the
+edges of its own nodes and of their one-hop ghost neighbours. That is enough
+for a worker to compute d(x -> y) and d(y -> x) for every edge of an owned node
+x, so the threshold estimate and the stars of the owned seeds need no further
+exchange between workers.
+
+Workers connect to the coordinator with multiprocessing.connection, over a
+local socket or TCP. A worker on another machine is started with
+
+    python -m mdepstar.distributed HOST:PORT
+
+and MDEPSTAR_AUTHKEY set to the coordinator's key.
+"""
+
+import multiprocessing
+import os
+import secrets
+import sys
+import zlib
+from collections import deque
+from multiprocessing.connection import Client, Listener
+from .Network import Network
+from .Mdepstar import mDepStar
+from .sketch import DependencySketch
+
+
+def partition_nodes(network: Network, parts: int, method: str = "hash") -> list[list[str]]:
+    """Split the nodes into parts.
+
+    "hash" assigns nodes by crc32 of their name, "bfs" cuts a breadth-first
+    order (started from the highest degree nodes) into contiguous pieces, which
+    keeps neighbourhoods together and shrinks the ghost sets.
+    """
+    nodes = sorted(network.nodes())
+
+    if method == "hash":
+        res: list[list[str]] = [[] for _ in range(parts)]
+        for n in nodes:
+            res[zlib.crc32(n.encode()) % parts].append(n)
+        return res
+
+    if method != "bfs":
+        raise ValueError(f"Unknown partition method {method}")
+
+    order = []
+    seen = set()
+    for start in sorted(nodes, key=network.degree, reverse=True):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            n = queue.popleft()
+            order.append(n)
+            for m in sorted(network.neighbors(n)):
+                if m not in seen:
+                    seen.add(m)
+                    queue.append(m)
+
+    size = -(-len(order) // parts)
+    return [order[k * size:(k + 1) * size] for k in range(parts)]
+
+
+def partition_payload(network: Network, owned: list[str]) -> dict:
+    """Owned nodes plus the edges of the owned nodes and of their ghosts."""
+    ghosts = set()
+    for n in owned:
+        ghosts.update(network.neighbors(n))
+
+    edges = set()
+    for n in ghosts.union(owned):
+        for m in network.neighbors(n):
+            edges.add((n, m) if n < m else (m, n))
+
+    return {
+        "owned": owned,
+        "weighted": network.weighted,
+        "edges": [(a, b, network.weight(a, b)) for a, b in sorted(edges)],
+    }
+
+
+class _Partition(object):
+    """Worker side state: the local network and a lazy mDepStar over it."""
+
+    def __init__(self, payload: dict) -> None:
+        self.owned: list[str] = payload["owned"]
+        self.owned_set = set(self.owned)
+
+        G = Network()
+        G.weighted = payload["weighted"]
+        for a, b, w in payload["edges"]:
+            G.add_edge(a, b, w)
+
+        self.network = G
+        self.model = mDepStar(G, lazy=True)
+
+    def estimate_terms(self) -> tuple[float, float]:
+        """Sums of mDepStar._estimate_dependency over the edges this partition owns.
+
+        An edge is owned by the partition of its lexicographically smaller node,
+        a self-loop by the partition of its node, and counted once as in G.edges().
+        """
+        dep_weighted_sum = 0.0
+        dep_weights = 0.0
+        for a in self.owned:
+            for b in self.network.neighbors(a):
+                if a <= b:
+                    d1 = self.model.get_dependency(a, b)
+                    d2 = self.model.get_dependency(b, a)
+                    min_of_dep = min(d1, d2)
+                    dep_weighted_sum += min_of_dep * ((d1 + d2) / 2)
+                    dep_weights += min_of_dep
+        return dep_weighted_sum, dep_weights
+
+    def sketch(self) -> DependencySketch:
+        """DependencySketch of the edges this partition owns, as in estimate_terms."""
+        res = DependencySketch()
+        res.update_edges(
+            (self.model.get_dependency(a, b), self.model.get_dependency(b, a))
+            for a in self.owned
+            for b in self.network.neighbors(a)
+            if a <= b
+        )
+        return res
+
+    def complexes(self, tau: float) -> list[tuple[str, ...]]:
+        self.model.dependency_threshold = tau
+        return [tuple(sorted(c)) for c in self.model.get_complexes(self.owned)]
+
+
+def env_authkey() -> bytes:
+    """Connection key of remote workers from MDEPSTAR_AUTHKEY.
+
+    Raises:
+        Exception: MDEPSTAR_AUTHKEY is not set
+    """
+    key = os.environb.get(b"MDEPSTAR_AUTHKEY")
+    if not key:
+        raise Exception(
+            "Remote workers need a shared key: export MDEPSTAR_AUTHKEY=<secret> for the coordinator and every worker"
+        )
+    return key
+
+
+def worker(address, authkey: bytes) -> None:
+    """Serve one partition for the coordinator at address until it says stop."""
+    with Client(address, authkey=authkey) as conn:
+        partition = None
+        while True:
+            message = conn.recv()
+            command = message[0]
+
+            if command == "partition":
+                partition = _Partition(message[1])
+                conn.send(("ready", len(partition.owned)))
+            elif command == "estimate":
+                conn.send(("estimate", partition.estimate_terms()))  # type: ignore
+            elif command == "sketch":
+                conn.send(("sketch", partition.sketch()))  # type: ignore
+            elif command == "complexes":
+                conn.send(("complexes", partition.complexes(message[1])))  # type: ignore
+            elif command == "stop":
+                return
+            else:
+                raise Exception(f"Unknown command {command}")
+
+
+def run_partitioned(
+    network: Network,
+    parts: int,
+    dependency: float | None = None,
+    method: str = "hash",
+    address: tuple[str, int] | str | None = None,
+    authkey: bytes | None = None,
+    local_workers: bool = True,
+    sketch: DependencySketch | None = None,
+) -> tuple[float, set[frozenset[str]]]:
+    """Predict complexes with parts workers, each holding one partition.
+
+    Args:
+        network (Network): PPI network
+        parts (int): number of partitions and workers
+        dependency (float | None): threshold, estimated across the partitions if None
+        method (str): "hash" or "bfs", see partition_nodes
+        address: where the coordinator listens, an ephemeral localhost port by default
+        authkey (bytes | None): connection key, random when workers are local
+        local_workers (bool): start the workers as local processes; otherwise wait
+            for parts workers started with ``python -m mdepstar.distributed``
+        sketch (DependencySketch | None): the partitions' DependencySketch are merged into it
+
+    Returns:
+        tuple[float, set[frozenset[str]]]: threshold and deduplicated complexes
+    """
+    if authkey is None:
+        authkey = secrets.token_bytes(16) if local_workers else env_authkey()
+    if address is None:
+        address = ("127.0.0.1", 0)
+
+    partitions = partition_nodes(network, parts, method)
+    processes = []
+
+    with Listener(address, authkey=authkey) as listener:
+        if local_workers:
+            for _ in range(parts):
+                p = multiprocessing.Process(target=worker, args=(listener.address, authkey))
+                p.start()
+                processes.append(p)
+        else:
+            print(f"Waiting for {parts} workers on {listener.address}")
+
+        connections = [listener.accept() for _ in range(parts)]
+
+    try:
+        for conn, owned in zip(connections, partitions):
+            conn.send(("partition", partition_payload(network, owned)))
+        for conn in connections:
+            conn.recv()
+
+        if dependency is None:
+            for conn in connections:
+                conn.send(("estimate",))
+            terms = [conn.recv()[1] for conn in connections]
+            dep_weighted_sum = sum(t[0] for t in terms)
+            dep_weights = sum(t[1] for t in terms)
+            dependency = 1 if dep_weights == 0 else round(dep_weighted_sum / dep_weights / 2, 3)
+
+        if sketch is not None:
+            for conn in connections:
+                conn.send(("sketch",))
+            for conn in connections:
+                sketch.merge(conn.recv()[1])
+
+        for conn in connections:
+            conn.send(("complexes", dependency))
+
+        complexes: set[frozenset[str]] = set()
+        seen: set[tuple[str, ...]] = set()
+        for conn in connections:
+            for t in conn.recv()[1]:
+                if t not in seen:
+                    seen.add(t)
+                    complexes.add(frozenset(t))
+    finally:
+        for conn in connections:
+            try:
+                conn.send(("stop",))
+            except OSError:
+                pass
+            conn.close()
+        for p in processes:
+            p.join()
+
+    return dependency, complexes
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python -m mdepstar.distributed HOST:PORT (key in MDEPSTAR_AUTHKEY)")
+        sys.exit(2)
+
+    try:
+        authkey = env_authkey()
+    except Exception as e:
+        print(e)
+        sys.exit(2)
+
+    host, port = sys.argv[1].rsplit(":", 1)
+    worker((host, int(port)), authkey)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Conversions of the CSR view of a network to SciPy, igraph and networkx.
+
+CSRGraph and SciPy's csr_array share one layout: indptr, sorted indices and
+the weights of both directions of every edge. to_scipy_sparse wraps the
+CSR buffers without copying them, and from_scipy_sparse builds a CSRGraph
+over the matrix buffers. The functions take a CSRGraph, so they convert both
+a Network (``network.csr()``, see the Network methods) and an mDep network
+(``mDepStar.mDep_csr()``).
+
+SciPy (with numpy) and python-igraph are optional.
+"""
+
+from array import array
+import networkx as nx
+from .CSRGraph import CSRGraph
+
+try:
+    import numpy as np
+    import scipy.sparse
+except ImportError:
+    np = None
+    scipy = None
+
+try:
+    import igraph
+except ImportError:
+    igraph = None
+
+
+def _require_scipy() -> None:
+    if scipy is None:
+        raise ImportError("SciPy sparse matrices need scipy and numpy (pip install scipy)")
+
+
+def _shared(values: "np.ndarray", typecode: str) -> memoryview:
+    # a memoryview over the numpy buffer with the typecode the kernels expect
+    return memoryview(np.ascontiguousarray(values)).cast("B").cast(typecode)
+
+
+def edge_list(csr: CSRGraph, self_loops: bool = True) -> tuple[array, array, array]:
+    """Every undirected edge once as parallel arrays (i, j, weight) with i <= j.
+
+    Args:
+        csr (CSRGraph): graph
+        self_loops (bool): keep edges from a node to itself
+    """
+    heads = array("i")
+    tails = array("i")
+    weights = array("d")
+    for i in range(csr.num_nodes):
+        for p in csr.row(i):
+            j = csr.indices[p]
+            if j > i or (j == i and self_loops):
+                heads.append(i)
+                tails.append(j)
+                weights.append(csr.weights[p])
+    return heads, tails, weights
+
+
+def to_scipy_sparse(csr: CSRGraph) -> "scipy.sparse.csr_array":
+    """Symmetric weighted adjacency matrix, row i is csr.nodes[i].
+
+    data and indices share the CSR buffers. SciPy needs one dtype for both
+    index arrays, so indptr is narrowed to int32 (a copy of num_nodes + 1
+    values) unless the graph has 2**31 slots or more, which copies indices
+    instead.
+    """
+    _require_scipy()
+    indices = np.frombuffer(csr.indices, dtype=np.int32)
+    indptr = np.frombuffer(csr.indptr, dtype=np.int64)
+    if csr.num_slots < 2**31:
+        indptr = indptr.astype(np.int32)
+    else:
+        indices = indices.astype(np.int64)
+    weights = np.frombuffer(csr.weights, dtype=np.float64)
+    return scipy.sparse.csr_array((weights, indices, indptr), shape=(csr.num_nodes, csr.num_nodes), copy=False)
+
+
+def from_scipy_sparse(matrix, nodes: list[str] | None = None, self_loops: bool = True) -> CSRGraph:
+    """CSRGraph of a symmetric sparse matrix, reading its buffers where possible.
+
+    int32 indices and float64 data of a canonical CSR matrix are shared, indptr
+    is widened to int64. Other formats and dtypes are converted first. Diagonal
+    entries are self-loops; without self_loops they are dropped with a copy.
+
+    Args:
+        matrix: SciPy sparse matrix or array
+        nodes (list[str] | None): name of every row, "0", "1", ... by default
+        self_loops (bool): keep the diagonal entries
+
+    Raises:
+        ValueError: the matrix is not square and symmetric
+    """
+    _require_scipy()
+    matrix = scipy.sparse.csr_array(matrix)
+    n = matrix.shape[0]
+    if matrix.shape[1] != n:
+        raise ValueError("The matrix must be square")
+    if (matrix != matrix.T).nnz:
+        raise ValueError("The matrix must be symmetric")
+    if nodes is None:
+        nodes = [str(i) for i in range(n)]
+    elif len(nodes) != n:
+        raise ValueError(f"Expected {n} node names, got {len(nodes)}")
+
+    drop_diagonal = not self_loops and matrix.diagonal().any()
+    if not matrix.has_canonical_format or drop_diagonal:
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+        if drop_diagonal:
+            matrix.setdiag(0)
+            matrix.eliminate_zeros()
+
+    return CSRGraph(
+        list(nodes),
+        _shared(matrix.indptr.astype(np.int64, copy=False), "q"),
+        _shared(matrix.indices.astype(np.int32, copy=False), "i"),
+        _shared(matrix.data.astype(np.float64, copy=False), "d"),
+    )
+
+
+def to_igraph(csr: CSRGraph, self_loops: bool = True) -> "igraph.Graph":
+    """Undirected igraph.Graph with vertex attribute "name" and edge attribute "weight",
+    without the self-loops unless self_loops."""
+    if igraph is None:
+        raise ImportError("to_igraph needs python-igraph (pip install igraph)")
+    heads, tails, weights = edge_list(csr, self_loops)
+    return igraph.Graph(
+        n=csr.num_nodes,
+        edges=list(zip(heads, tails)),
+        directed=False,
+        vertex_attrs={"name": list(csr.nodes)},
+        edge_attrs={"weight": list(weights)},
+    )
+
+
+def to_networkx(csr: CSRGraph, labels: bool = False, self_loops: bool = True) -> nx.Graph:
+    """nx.Graph of the edges added in bulk; labels adds the "a-b" label attribute to every edge.
+
+    Nodes without edges (e.g. outside the mDep network) are left out, and so
+    are self-loops unless self_loops.
+    """
+    heads, tails, weights = edge_list(csr, self_loops)
+    nodes = csr.nodes
+    res = nx.Graph()
+    if labels:
+        res.add_edges_from(
+            (nodes[i], nodes[j], {"weight": w, "label": nodes[i] + "-" + nodes[j]})
+            for i, j, w in zip(heads, tails, weights)
+        )
+    else:
+        res.add_weighted_edges_from((nodes[i], nodes[j], w) for i, j, w in zip(heads, tails, weights))
+    return res
@@ -0,0 +1,1151 @@
+"""Numeric kernels over the integer CSR form of a Network (see CSRGraph).
+
+Every kernel has a pure-Python implementation. When Numba is importable the
+same loops are JIT compiled instead (releasing the GIL, so they scale over
+threads); set MDEPSTAR_KERNELS=python to force the fallback. Both backends
+compute the same formulas as mDepStar._dependency, mDepStar._r,
+mDepStar._weighted_degree and mDepStar._check_condition, only the summation
+order of the common neighbours differs (sorted ids).
+"""
+
+import math
+import os
+from array import array
+from bisect import bisect_left
+from .CSRGraph import CSRGraph
+
+try:
+    if os.environ.get("MDEPSTAR_KERNELS", "").lower() == "python":
+        raise ImportError("pure-Python kernels requested")
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+    np = None
+
+BACKEND: str = "python" if numba is None else "numba"
+
+REL_TOL = pow(10.0, -6)
+
+# modulus of the MinHash permutations (a * x + b) % MINHASH_PRIME, a Mersenne prime
+MINHASH_PRIME = 2**31 - 1
+
+# Lehmer generator x = x * SWAP_MULTIPLIER % MINHASH_PRIME (minstd), the same
+# sequence on both backends
+SWAP_MULTIPLIER = 48271
+
+# Strategies for the common neighbours of i and j (rows of the CSR):
+#   merge     walk both sorted rows, O(deg i + deg j)
+#   gallop    binary search the longer row from every id of the shorter one
+#             with doubling steps, O(deg short * log(deg long / deg short))
+#   probe     row i is scattered once into a dense slot array, then row j is
+#             probed id by id, O(deg j) per neighbour j of a hub
+# The adaptive choice gallops when row j is GALLOP_RATIO times longer than row
+# i, probes from rows i of at least HUB_DEGREE (the scatter is paid once per
+# row), gallops when row i is GALLOP_RATIO times longer and merges otherwise.
+# Both thresholds were tuned with benchmarks/intersections.py on BioGRID. Every
+# strategy visits the common neighbours in increasing id, so the sums are
+# identical.
+INTERSECTIONS = ("adaptive", "merge", "gallop", "probe")
+GALLOP_RATIO = 32
+HUB_DEGREE = 32
+
+
+def _py_ge(x: float, y: float) -> bool:
+    # mDepStar._is_greater_or_equal with 6 decimals
+    return x > y or math.isclose(x, y, rel_tol=REL_TOL)
+
+
+def _py_weighted_degrees(indptr, weights, weighted, out):
+    for i in range(len(indptr) - 1):
+        if weighted:
+            s = 0.0
+            for p in range(indptr[i], indptr[i + 1]):
+                s += weights[p]
+            out[i] = s
+        else:
+            out[i] = float(indptr[i + 1] - indptr[i])
+
+
+def _py_dependencies(indptr, indices, weights, weighted, wdeg, out, start, stop):
+    rows: dict[int, dict[int, float]] = {}
+    for i in range(start, stop):
+        for p in range(indptr[i], indptr[i + 1]):
+            out[p] = _py_dependency(indptr, indices, weights, weighted, wdeg, rows, i, p)
+
+
+def _py_slot_dependencies(indptr, indices, weights, weighted, wdeg, owners, slots, out):
+    rows: dict[int, dict[int, float]] = {}
+    for k in range(len(slots)):
+        out[k] = _py_dependency(indptr, indices, weights, weighted, wdeg, rows, owners[k], slots[k])
+
+
+def _py_dependency(indptr, indices, weights, weighted, wdeg, rows, i, p):
+    # d(i -> indices[p]); rows caches neighbour -> weight dicts
+    row_i = _py_row(indptr, indices, weights, weighted, rows, i)
+    row_j = _py_row(indptr, indices, weights, weighted, rows, indices[p])
+    common_sum = 0.0
+    for n in row_i.keys() & row_j.keys():
+        w_in = row_i[n]
+        w_nj = row_j[n]
+        denom = w_in + w_nj
+        common_sum += w_in * (0 if denom == 0 else w_nj / denom)
+    deg = wdeg[i]
+    return 0 if deg == 0 else (row_i[indices[p]] + common_sum) / deg
+
+
+def _py_multi_dependencies(indptr, indices, weights, wdeg, out, start, stop):
+    # one intersection per slot for all weightings; rows cache neighbour -> slot dicts
+    rows: dict[int, dict[int, int]] = {}
+    for i in range(start, stop):
+        row_i = _py_slots(indptr, indices, rows, i)
+        for p in range(indptr[i], indptr[i + 1]):
+            row_j = _py_slots(indptr, indices, rows, indices[p])
+            pairs = [(row_i[n], row_j[n]) for n in row_i.keys() & row_j.keys()]
+            for k in range(len(weights)):
+                common_sum = 0.0
+                for a, b in pairs:
+                    common_sum += _py_term(weights[k], True, a, b)
+                deg = wdeg[k][i]
+                out[k][p] = 0 if deg == 0 else (weights[k][p] + common_sum) / deg
+
+
+def _py_slots(indptr, indices, rows, i):
+    r = rows.get(i)
+    if r is None:
+        lo, hi = indptr[i], indptr[i + 1]
+        r = rows[i] = dict(zip(indices[lo:hi], range(lo, hi)))
+    return r
+
+
+def _py_row(indptr, indices, weights, weighted, rows, i):
+    r = rows.get(i)
+    if r is None:
+        lo, hi = indptr[i], indptr[i + 1]
+        if weighted:
+            r = dict(zip(indices[lo:hi], weights[lo:hi]))
+        else:
+            r = dict.fromkeys(indices[lo:hi], 1.0)
+        rows[i] = r
+    return r
+
+
+def _py_reverse_slots(indptr, indices, out):
+    cursor = array("q", indptr[:-1])
+    for i in range(len(indptr) - 1):
+        for p in range(indptr[i], indptr[i + 1]):
+            j = indices[p]
+            out[p] = cursor[j]
+            cursor[j] += 1
+
+
+def _py_mdep_flags(values, rev, tau, out):
+    for p in range(len(values)):
+        out[p] = _py_ge(values[p], tau) and _py_ge(values[rev[p]], tau)
+
+
+def _py_star_flags(values, rev, flags, tau, out):
+    tau2 = 2 * tau
+    for p in range(len(values)):
+        out[p] = flags[p] and (_py_ge(values[rev[p]], tau2) or _py_ge(values[p], tau2))
+
+
+def _py_paired_flags(forward, reverse, tau, mdep, star):
+    tau2 = 2 * tau
+    for p in range(len(forward)):
+        mdep[p] = _py_ge(forward[p], tau) and _py_ge(reverse[p], tau)
+        star[p] = mdep[p] and (_py_ge(reverse[p], tau2) or _py_ge(forward[p], tau2))
+
+
+def _py_node_profiles(indptr, forward, reverse, tau, lo, hi, out):
+    # forward/reverse hold the slots of the rows lo..hi, out[4 * i + class] counts
+    # the classes of mDepStar.get_node_deps: mutual, none, node on neighbor, neighbor on node
+    base = indptr[lo]
+    for i in range(lo, hi):
+        for p in range(indptr[i] - base, indptr[i + 1] - base):
+            d1, d2 = forward[p], reverse[p]
+            if d1 < tau and d2 < tau:
+                out[4 * i + 1] += 1
+            elif _py_ge(d1, tau) and _py_ge(d2, tau):
+                out[4 * i] += 1
+            elif _py_ge(d1, tau):
+                out[4 * i + 2] += 1
+            elif _py_ge(d2, tau):
+                out[4 * i + 3] += 1
+
+
+def _py_histogram(values, out):
+    bins = len(out)
+    for x in values:
+        b = int(x * bins)
+        out[min(max(b, 0), bins - 1)] += 1
+
+
+def _py_mutual_terms(indptr, indices, lo, hi, forward, reverse, mutual, weighted):
+    # terms of mDepStar._estimate_dependency, every edge from its lower node
+    # and a self-loop from its only slot
+    base = indptr[lo]
+    n = 0
+    for i in range(lo, hi):
+        for p in range(indptr[i], indptr[i + 1]):
+            if indices[p] >= i:
+                d1, d2 = forward[p - base], reverse[p - base]
+                min_of_dep = min(d1, d2)
+                mutual[n] = min_of_dep
+                weighted[n] = min_of_dep * ((d1 + d2) / 2)
+                n += 1
+    return n
+
+
+def _py_induced_rows(indptr, indices, weights, global_ids, local, out_indptr, out_indices, out_weights):
+    n = 0
+    for k in range(len(global_ids)):
+        g = global_ids[k]
+        for p in range(indptr[g], indptr[g + 1]):
+            l = local[indices[p]]
+            if l >= 0:
+                out_indices[n] = l
+                out_weights[n] = weights[p]
+                n += 1
+        out_indptr[k + 1] = n
+    return n
+
+
+def _py_overlap_scores(offsets_a, members_a, offsets_b, members_b, pair_a, pair_b, out):
+    for k in range(len(pair_a)):
+        a, b = pair_a[k], pair_b[k]
+        set_a = set(members_a[offsets_a[a]:offsets_a[a + 1]])
+        len_b = offsets_b[b + 1] - offsets_b[b]
+        common = len(set_a.intersection(members_b[offsets_b[b]:offsets_b[b + 1]]))
+        out[k] = common**2 / (float(len(set_a)) * len_b)
+
+
+def _py_minhash(offsets, members, coef_a, coef_b, out):
+    num_perm = len(coef_a)
+    for c in range(len(offsets) - 1):
+        for h in range(num_perm):
+            m = MINHASH_PRIME
+            for p in range(offsets[c], offsets[c + 1]):
+                v = (coef_a[h] * members[p] + coef_b[h]) % MINHASH_PRIME
+                if v < m:
+                    m = v
+            out[c * num_perm + h] = m
+
+
+def _py_find(indptr, indices, i, j):
+    lo, hi = indptr[i], indptr[i + 1]
+    p = bisect_left(indices, j, lo, hi)
+    return p if p < hi and indices[p] == j else -1
+
+
+def _py_replace(indptr, indices, weights, i, old, new, weight):
+    # row i loses old and gains new, shifting the slots in between to stay sorted
+    lo, hi = indptr[i], indptr[i + 1]
+    p = _py_find(indptr, indices, i, old)
+    while p + 1 < hi and indices[p + 1] < new:
+        indices[p] = indices[p + 1]
+        weights[p] = weights[p + 1]
+        p += 1
+    while p > lo and indices[p - 1] > new:
+        indices[p] = indices[p - 1]
+        weights[p] = weights[p - 1]
+        p -= 1
+    indices[p] = new
+    weights[p] = weight
+
+
+def _py_double_edge_swaps(indptr, indices, weights, heads, tails, swaps, max_attempts, rng, touched):
+    m = len(heads)
+    x = rng[0]
+    done = 0
+    attempts = 0
+    while done < swaps and attempts < max_attempts:
+        attempts += 1
+        x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+        e1 = x % m
+        x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+        e2 = x % m
+        x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+        a, b = heads[e1], tails[e1]
+        c, d = heads[e2], tails[e2]
+        if x & 1024:
+            c, d = d, c
+
+        if a == c or a == d or b == c or b == d:
+            continue
+        if _py_find(indptr, indices, a, d) >= 0 or _py_find(indptr, indices, c, b) >= 0:
+            continue
+
+        w1 = weights[_py_find(indptr, indices, a, b)]
+        w2 = weights[_py_find(indptr, indices, c, d)]
+        _py_replace(indptr, indices, weights, a, b, d, w1)
+        _py_replace(indptr, indices, weights, d, c, a, w1)
+        _py_replace(indptr, indices, weights, c, d, b, w2)
+        _py_replace(indptr, indices, weights, b, a, c, w2)
+        heads[e1], tails[e1] = a, d
+        heads[e2], tails[e2] = c, b
+        touched[a] = touched[b] = touched[c] = touched[d] = 1
+        done += 1
+    rng[0] = x
+    return done
+
+
+def _py_touched_dependencies(indptr, indices, weights, weighted, wdeg, touched, out):
+    for i in range(len(indptr) - 1):
+        if touched[i] and weighted:
+            s = 0.0
+            for p in range(indptr[i], indptr[i + 1]):
+                s += weights[p]
+            wdeg[i] = s
+    rows: dict[int, dict[int, float]] = {}
+    for i in range(len(indptr) - 1):
+        for p in range(indptr[i], indptr[i + 1]):
+            if touched[i] or touched[indices[p]]:
+                out[p] = _py_dependency(indptr, indices, weights, weighted, wdeg, rows, i, p)
+
+
+def _py_term(weights, weighted, a, b):
+    # w(i, n) * r(i, n, j) for the common neighbour n at slots a (row i) and b (row j)
+    w_in = weights[a] if weighted else 1.0
+    w_nj = weights[b] if weighted else 1.0
+    denom = w_in + w_nj
+    return 0.0 if denom == 0 else w_in * (w_nj / denom)
+
+
+def _py_common_sums(indptr, indices, weights, weighted, owners, slots, strategy, out):
+    # the numba strategies step by step, for cross-checking them
+    position: dict[int, int] = {}
+    current = -1
+    for k in range(len(slots)):
+        i, j = owners[k], indices[slots[k]]
+        a, a_hi = indptr[i], indptr[i + 1]
+        b, b_hi = indptr[j], indptr[j + 1]
+        if strategy == "adaptive":
+            if b_hi - b > GALLOP_RATIO * (a_hi - a):
+                how = "gallop"
+            elif a_hi - a >= HUB_DEGREE:
+                how = "probe"
+            elif a_hi - a > GALLOP_RATIO * (b_hi - b):
+                how = "gallop"
+            else:
+                how = "merge"
+        else:
+            how = strategy
+
+        s = 0.0
+        if how == "probe":
+            if i != current:
+                position = {indices[q]: q for q in range(a, a_hi)}
+                current = i
+            for q in range(b, b_hi):
+                x = position.get(indices[q])
+                if x is not None:
+                    s += _py_term(weights, weighted, x, q)
+        elif how == "gallop" and b_hi - b >= a_hi - a:
+            for x in range(a, a_hi):
+                b = bisect_left(indices, indices[x], b, b_hi)
+                if b < b_hi and indices[b] == indices[x]:
+                    s += _py_term(weights, weighted, x, b)
+        elif how == "gallop":
+            for y in range(b, b_hi):
+                a = bisect_left(indices, indices[y], a, a_hi)
+                if a < a_hi and indices[a] == indices[y]:
+                    s += _py_term(weights, weighted, a, y)
+        else:
+            while a < a_hi and b < b_hi:
+                if indices[a] == indices[b]:
+                    s += _py_term(weights, weighted, a, b)
+                    a += 1
+                    b += 1
+                elif indices[a] < indices[b]:
+                    a += 1
+                else:
+                    b += 1
+        out[k] = s
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_ge(x, y):
+        if x > y:
+            return True
+        diff = abs(x - y)
+        return x == y or diff <= abs(REL_TOL * y) or diff <= abs(REL_TOL * x)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_weighted_degrees(indptr, weights, weighted, out):
+        for i in range(len(indptr) - 1):
+            if weighted:
+                s = 0.0
+                for p in range(indptr[i], indptr[i + 1]):
+                    s += weights[p]
+                out[i] = s
+            else:
+                out[i] = float(indptr[i + 1] - indptr[i])
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_term(weights, weighted, a, b):
+        w_in = weights[a] if weighted else 1.0
+        w_nj = weights[b] if weighted else 1.0
+        denom = w_in + w_nj
+        return 0.0 if denom == 0 else w_in * (w_nj / denom)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_gallop(indices, lo, hi, x):
+        # first position of indices[lo:hi] holding at least x
+        if lo >= hi or indices[lo] >= x:
+            return lo
+        prev = lo
+        step = 1
+        while prev + step < hi and indices[prev + step] < x:
+            prev += step
+            step *= 2
+        lo = prev + 1
+        hi = min(prev + step, hi)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if indices[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_merge_sum(indices, weights, weighted, a, a_hi, b, b_hi):
+        s = 0.0
+        while a < a_hi and b < b_hi:
+            x = indices[a]
+            y = indices[b]
+            if x == y:
+                s += _nb_term(weights, weighted, a, b)
+                a += 1
+                b += 1
+            elif x < y:
+                a += 1
+            else:
+                b += 1
+        return s
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_gallop_sum(indices, weights, weighted, a, a_hi, b, b_hi):
+        s = 0.0
+        if b_hi - b >= a_hi - a:
+            while a < a_hi and b < b_hi:
+                b = _nb_gallop(indices, b, b_hi, indices[a])
+                if b < b_hi and indices[b] == indices[a]:
+                    s += _nb_term(weights, weighted, a, b)
+                    b += 1
+                a += 1
+        else:
+            while a < a_hi and b < b_hi:
+                a = _nb_gallop(indices, a, a_hi, indices[b])
+                if a < a_hi and indices[a] == indices[b]:
+                    s += _nb_term(weights, weighted, a, b)
+                    a += 1
+                b += 1
+        return s
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_probe_sum(indices, weights, weighted, position, b, b_hi):
+        # position[n] is the slot of n in the scattered row, -1 elsewhere
+        s = 0.0
+        for q in range(b, b_hi):
+            a = position[indices[q]]
+            if a >= 0:
+                s += _nb_term(weights, weighted, a, q)
+        return s
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_scatter(indices, position, lo, hi, value):
+        for a in range(lo, hi):
+            position[indices[a]] = a if value else -1
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_common_sum(indptr, indices, weights, weighted, position, i, j):
+        # adaptive choice; position holds row i when it is a hub
+        a = indptr[i]
+        a_hi = indptr[i + 1]
+        b = indptr[j]
+        b_hi = indptr[j + 1]
+        if b_hi - b > GALLOP_RATIO * (a_hi - a):
+            return _nb_gallop_sum(indices, weights, weighted, a, a_hi, b, b_hi)
+        if a_hi - a >= HUB_DEGREE and len(position) > 0:
+            return _nb_probe_sum(indices, weights, weighted, position, b, b_hi)
+        if a_hi - a > GALLOP_RATIO * (b_hi - b):
+            return _nb_gallop_sum(indices, weights, weighted, a, a_hi, b, b_hi)
+        return _nb_merge_sum(indices, weights, weighted, a, a_hi, b, b_hi)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_dependency(indptr, indices, weights, weighted, wdeg, position, i, p):
+        common_sum = _nb_common_sum(indptr, indices, weights, weighted, position, i, indices[p])
+        w_ij = weights[p] if weighted else 1.0
+        deg = wdeg[i]
+        return 0.0 if deg == 0 else (w_ij + common_sum) / deg
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_dependencies(indptr, indices, weights, weighted, wdeg, out, start, stop):
+        position = np.full(len(indptr) - 1, -1, dtype=np.int64)
+        for i in range(start, stop):
+            hub = indptr[i + 1] - indptr[i] >= HUB_DEGREE
+            if hub:
+                _nb_scatter(indices, position, indptr[i], indptr[i + 1], True)
+            for p in range(indptr[i], indptr[i + 1]):
+                out[p] = _nb_dependency(indptr, indices, weights, weighted, wdeg, position, i, p)
+            if hub:
+                _nb_scatter(indices, position, indptr[i], indptr[i + 1], False)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_common_pairs(indptr, indices, position, i, j, pa, pb):
+        # slots (row i, row j) of the common neighbours in increasing id, chosen as
+        # in _nb_common_sum; returns their number
+        a = indptr[i]
+        a_hi = indptr[i + 1]
+        b = indptr[j]
+        b_hi = indptr[j + 1]
+        m = 0
+        if b_hi - b <= GALLOP_RATIO * (a_hi - a) and a_hi - a >= HUB_DEGREE and len(position) > 0:
+            for q in range(b, b_hi):
+                x = position[indices[q]]
+                if x >= 0:
+                    pa[m] = x
+                    pb[m] = q
+                    m += 1
+            return m
+        gallop = b_hi - b > GALLOP_RATIO * (a_hi - a) or a_hi - a > GALLOP_RATIO * (b_hi - b)
+        while a < a_hi and b < b_hi:
+            if gallop:
+                if b_hi - b >= a_hi - a:
+                    b = _nb_gallop(indices, b, b_hi, indices[a])
+                else:
+                    a = _nb_gallop(indices, a, a_hi, indices[b])
+                if a == a_hi or b == b_hi:
+                    break
+            x = indices[a]
+            y = indices[b]
+            if x == y:
+                pa[m] = a
+                pb[m] = b
+                m += 1
+                a += 1
+                b += 1
+            elif x < y:
+                a += 1
+            else:
+                b += 1
+        return m
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_multi_dependencies(indptr, indices, weights, wdeg, out, start, stop):
+        # weights, wdeg and out hold one row per weighting
+        n = len(indptr) - 1
+        width = 0
+        for i in range(n):
+            width = max(width, indptr[i + 1] - indptr[i])
+        pa = np.empty(width, dtype=np.int64)
+        pb = np.empty(width, dtype=np.int64)
+        position = np.full(n, -1, dtype=np.int64)
+        for i in range(start, stop):
+            hub = indptr[i + 1] - indptr[i] >= HUB_DEGREE
+            if hub:
+                _nb_scatter(indices, position, indptr[i], indptr[i + 1], True)
+            for p in range(indptr[i], indptr[i + 1]):
+                m = _nb_common_pairs(indptr, indices, position, i, indices[p], pa, pb)
+                for k in range(weights.shape[0]):
+                    w = weights[k]
+                    common_sum = 0.0
+                    for t in range(m):
+                        common_sum += _nb_term(w, True, pa[t], pb[t])
+                    deg = wdeg[k, i]
+                    out[k, p] = 0.0 if deg == 0 else (w[p] + common_sum) / deg
+            if hub:
+                _nb_scatter(indices, position, indptr[i], indptr[i + 1], False)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_common_sums(indptr, indices, weights, weighted, owners, slots, strategy, out):
+        # strategy indexes INTERSECTIONS; hub rows are scattered once per run of equal owners
+        position = np.full(len(indptr) - 1, -1, dtype=np.int64)
+        current = -1
+        for k in range(len(slots)):
+            i = owners[k]
+            j = indices[slots[k]]
+            if i != current:
+                if current >= 0:
+                    _nb_scatter(indices, position, indptr[current], indptr[current + 1], False)
+                current = -1
+                if strategy == 3 or (strategy == 0 and indptr[i + 1] - indptr[i] >= HUB_DEGREE):
+                    _nb_scatter(indices, position, indptr[i], indptr[i + 1], True)
+                    current = i
+            a = indptr[i]
+            a_hi = indptr[i + 1]
+            b = indptr[j]
+            b_hi = indptr[j + 1]
+            if strategy == 0:
+                out[k] = _nb_common_sum(indptr, indices, weights, weighted, position, i, j)
+            elif strategy == 1:
+                out[k] = _nb_merge_sum(indices, weights, weighted, a, a_hi, b, b_hi)
+            elif strategy == 2:
+                out[k] = _nb_gallop_sum(indices, weights, weighted, a, a_hi, b, b_hi)
+            else:
+                out[k] = _nb_probe_sum(indices, weights, weighted, position, b, b_hi)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_slot_dependencies(indptr, indices, weights, weighted, wdeg, owners, slots, out):
+        # scattered slots: no probing, merge or gallop only
+        position = np.empty(0, dtype=np.int64)
+        for k in range(len(slots)):
+            out[k] = _nb_dependency(indptr, indices, weights, weighted, wdeg, position, owners[k], slots[k])
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_reverse_slots(indptr, indices, out):
+        cursor = indptr[:-1].copy()
+        for i in range(len(indptr) - 1):
+            for p in range(indptr[i], indptr[i + 1]):
+                j = indices[p]
+                out[p] = cursor[j]
+                cursor[j] += 1
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_mdep_flags(values, rev, tau, out):
+        for p in range(len(values)):
+            out[p] = _nb_ge(values[p], tau) and _nb_ge(values[rev[p]], tau)
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_star_flags(values, rev, flags, tau, out):
+        tau2 = 2 * tau
+        for p in range(len(values)):
+            out[p] = flags[p] != 0 and (
+                _nb_ge(values[rev[p]], tau2) or _nb_ge(values[p], tau2)
+            )
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_paired_flags(forward, reverse, tau, mdep, star):
+        tau2 = 2 * tau
+        for p in range(len(forward)):
+            mdep[p] = _nb_ge(forward[p], tau) and _nb_ge(reverse[p], tau)
+            star[p] = mdep[p] != 0 and (_nb_ge(reverse[p], tau2) or _nb_ge(forward[p], tau2))
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_node_profiles(indptr, forward, reverse, tau, lo, hi, out):
+        base = indptr[lo]
+        for i in range(lo, hi):
+            for p in range(indptr[i] - base, indptr[i + 1] - base):
+                d1 = forward[p]
+                d2 = reverse[p]
+                if d1 < tau and d2 < tau:
+                    out[4 * i + 1] += 1
+                elif _nb_ge(d1, tau) and _nb_ge(d2, tau):
+                    out[4 * i] += 1
+                elif _nb_ge(d1, tau):
+                    out[4 * i + 2] += 1
+                elif _nb_ge(d2, tau):
+                    out[4 * i + 3] += 1
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_histogram(values, out):
+        bins = len(out)
+        for x in values:
+            b = int(x * bins)
+            out[min(max(b, 0), bins - 1)] += 1
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_mutual_terms(indptr, indices, lo, hi, forward, reverse, mutual, weighted):
+        base = indptr[lo]
+        n = 0
+        for i in range(lo, hi):
+            for p in range(indptr[i], indptr[i + 1]):
+                if indices[p] >= i:
+                    d1 = forward[p - base]
+                    d2 = reverse[p - base]
+                    min_of_dep = min(d1, d2)
+                    mutual[n] = min_of_dep
+                    weighted[n] = min_of_dep * ((d1 + d2) / 2)
+                    n += 1
+        return n
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_induced_rows(indptr, indices, weights, global_ids, local, out_indptr, out_indices, out_weights):
+        n = 0
+        for k in range(len(global_ids)):
+            g = global_ids[k]
+            for p in range(indptr[g], indptr[g + 1]):
+                l = local[indices[p]]
+                if l >= 0:
+                    out_indices[n] = l
+                    out_weights[n] = weights[p]
+                    n += 1
+            out_indptr[k + 1] = n
+        return n
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_overlap_scores(offsets_a, members_a, offsets_b, members_b, pair_a, pair_b, out):
+        # members of every complex are sorted ascending
+        for k in range(len(pair_a)):
+            a_lo = offsets_a[pair_a[k]]
+            a_hi = offsets_a[pair_a[k] + 1]
+            b_lo = offsets_b[pair_b[k]]
+            b_hi = offsets_b[pair_b[k] + 1]
+            x = a_lo
+            y = b_lo
+            common = 0
+            while x < a_hi and y < b_hi:
+                if members_a[x] == members_b[y]:
+                    common += 1
+                    x += 1
+                    y += 1
+                elif members_a[x] < members_b[y]:
+                    x += 1
+                else:
+                    y += 1
+            out[k] = common**2 / (float(a_hi - a_lo) * (b_hi - b_lo))
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_minhash(offsets, members, coef_a, coef_b, out):
+        num_perm = len(coef_a)
+        for c in range(len(offsets) - 1):
+            for h in range(num_perm):
+                m = MINHASH_PRIME
+                for p in range(offsets[c], offsets[c + 1]):
+                    v = (coef_a[h] * members[p] + coef_b[h]) % MINHASH_PRIME
+                    if v < m:
+                        m = v
+                out[c * num_perm + h] = m
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_find(indptr, indices, i, j):
+        lo = indptr[i]
+        hi = indptr[i + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if indices[mid] < j:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < indptr[i + 1] and indices[lo] == j:
+            return lo
+        return -1
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_replace(indptr, indices, weights, i, old, new, weight):
+        lo = indptr[i]
+        hi = indptr[i + 1]
+        p = _nb_find(indptr, indices, i, old)
+        while p + 1 < hi and indices[p + 1] < new:
+            indices[p] = indices[p + 1]
+            weights[p] = weights[p + 1]
+            p += 1
+        while p > lo and indices[p - 1] > new:
+            indices[p] = indices[p - 1]
+            weights[p] = weights[p - 1]
+            p -= 1
+        indices[p] = new
+        weights[p] = weight
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_double_edge_swaps(indptr, indices, weights, heads, tails, swaps, max_attempts, rng, touched):
+        m = len(heads)
+        x = rng[0]
+        done = 0
+        attempts = 0
+        while done < swaps and attempts < max_attempts:
+            attempts += 1
+            x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+            e1 = x % m
+            x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+            e2 = x % m
+            x = x * SWAP_MULTIPLIER % MINHASH_PRIME
+            a = heads[e1]
+            b = tails[e1]
+            c = heads[e2]
+            d = tails[e2]
+            if x & 1024:
+                c, d = d, c
+
+            if a == c or a == d or b == c or b == d:
+                continue
+            if _nb_find(indptr, indices, a, d) >= 0 or _nb_find(indptr, indices, c, b) >= 0:
+                continue
+
+            w1 = weights[_nb_find(indptr, indices, a, b)]
+            w2 = weights[_nb_find(indptr, indices, c, d)]
+            _nb_replace(indptr, indices, weights, a, b, d, w1)
+            _nb_replace(indptr, indices, weights, d, c, a, w1)
+            _nb_replace(indptr, indices, weights, c, d, b, w2)
+            _nb_replace(indptr, indices, weights, b, a, c, w2)
+            heads[e1] = a
+            tails[e1] = d
+            heads[e2] = c
+            tails[e2] = b
+            touched[a] = 1
+            touched[b] = 1
+            touched[c] = 1
+            touched[d] = 1
+            done += 1
+        rng[0] = x
+        return done
+
+    @numba.njit(cache=True, nogil=True)
+    def _nb_touched_dependencies(indptr, indices, weights, weighted, wdeg, touched, out):
+        for i in range(len(indptr) - 1):
+            if touched[i] and weighted:
+                s = 0.0
+                for p in range(indptr[i], indptr[i + 1]):
+                    s += weights[p]
+                wdeg[i] = s
+        position = np.empty(0, dtype=np.int64)
+        for i in range(len(indptr) - 1):
+            for p in range(indptr[i], indptr[i + 1]):
+                if touched[i] or touched[indices[p]]:
+                    out[p] = _nb_dependency(indptr, indices, weights, weighted, wdeg, position, i, p)
+
+
+def _view(a):
+    return np.frombuffer(a, dtype=a.typecode if isinstance(a, array) else a.format)
+
+
+def _use_numba(backend: str | None) -> bool:
+    backend = BACKEND if backend is None else backend
+    if backend == "numba" and numba is None:
+        raise ImportError("numba is not installed")
+    return backend == "numba"
+
+
+def greater_or_equal(x: float, y: float) -> bool:
+    """x >= y up to REL_TOL, the test of the kernels and of mDepStar._is_greater_or_equal."""
+    return _py_ge(x, y)
+
+
+def weighted_degrees(csr: CSRGraph, weighted: bool, backend: str | None = None) -> array:
+    out = array("d", [0.0]) * csr.num_nodes
+    if _use_numba(backend):
+        _nb_weighted_degrees(_view(csr.indptr), _view(csr.weights), weighted, _view(out))
+    else:
+        _py_weighted_degrees(csr.indptr, csr.weights, weighted, out)
+    return out
+
+
+def dependencies(
+    csr: CSRGraph,
+    weighted: bool,
+    out: array,
+    wdeg: array | None = None,
+    start: int = 0,
+    stop: int | None = None,
+    backend: str | None = None,
+) -> array:
+    """Fill ``out[p]`` with d(i -> j) for every slot p of the rows ``start..stop``."""
+    if wdeg is None:
+        wdeg = weighted_degrees(csr, weighted, backend)
+    if stop is None:
+        stop = csr.num_nodes
+
+    if _use_numba(backend):
+        _nb_dependencies(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights),
+            weighted, _view(wdeg), _view(out), start, stop,
+        )
+    else:
+        _py_dependencies(csr.indptr, csr.indices, csr.weights, weighted, wdeg, out, start, stop)
+    return out
+
+
+def multi_dependencies(
+    csr: CSRGraph,
+    weights: list[array],
+    out: list[array],
+    start: int = 0,
+    stop: int | None = None,
+    backend: str | None = None,
+) -> list[array]:
+    """dependencies for several weightings of one graph, sharing the intersections.
+
+    ``weights[k]`` holds the slot weights of weighting k (unit weights give the
+    unweighted dependencies) and ``out[k]`` receives its d(i -> j) for the
+    slots of the rows ``start..stop``. The common neighbours of every slot are
+    found once and summed in the same order as dependencies, so each
+    ``out[k]`` equals a separate dependencies call with ``csr.with_weights(weights[k])``.
+    """
+    if len(out) != len(weights):
+        raise ValueError("Expected one output array per weighting")
+    if stop is None:
+        stop = csr.num_nodes
+    if not weights:
+        return out
+    wdeg = [weighted_degrees(csr.with_weights(w), True, backend) for w in weights]
+
+    if _use_numba(backend):
+        begin, end = csr.indptr[start], csr.indptr[stop]
+        values = np.zeros((len(weights), csr.num_slots))
+        _nb_multi_dependencies(
+            _view(csr.indptr), _view(csr.indices),
+            np.stack([_view(w).astype(np.float64) for w in weights]),
+            np.stack([_view(d) for d in wdeg]), values, start, stop,
+        )
+        for k, o in enumerate(out):
+            _view(o)[begin:end] = values[k, begin:end]
+    else:
+        _py_multi_dependencies(csr.indptr, csr.indices, weights, wdeg, out, start, stop)
+    return out
+
+
+def common_sums(
+    csr: CSRGraph,
+    weighted: bool,
+    owners: array,
+    slots: array,
+    strategy: str = "adaptive",
+    backend: str | None = None,
+) -> array:
+    """Sum of w(i, n) * r(i, n, j) over the common neighbours n of every slot i -> j.
+
+    ``slots[k]`` lies in row ``owners[k]``, slots of one row are expected
+    together. strategy forces one of INTERSECTIONS, for comparing them.
+    """
+    if strategy not in INTERSECTIONS:
+        raise ValueError(f"Unknown intersection strategy {strategy}, expected one of {', '.join(INTERSECTIONS)}")
+    out = array("d", [0.0]) * len(slots)
+    if _use_numba(backend):
+        _nb_common_sums(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights), weighted,
+            _view(owners), _view(slots), INTERSECTIONS.index(strategy), _view(out),
+        )
+    else:
+        _py_common_sums(csr.indptr, csr.indices, csr.weights, weighted, owners, slots, strategy, out)
+    return out
+
+
+def slot_dependencies(
+    csr: CSRGraph,
+    weighted: bool,
+    wdeg: array,
+    owners: array,
+    slots: array,
+    out: array,
+    backend: str | None = None,
+) -> array:
+    """Fill ``out[k]`` with the dependency of slot ``slots[k]``, which lies in row ``owners[k]``."""
+    if _use_numba(backend):
+        _nb_slot_dependencies(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights),
+            weighted, _view(wdeg), _view(owners), _view(slots), _view(out),
+        )
+    else:
+        _py_slot_dependencies(
+            csr.indptr, csr.indices, csr.weights, weighted, wdeg, owners, slots, out
+        )
+    return out
+
+
+def reverse_slots(csr: CSRGraph, backend: str | None = None) -> array:
+    """``rev[p]`` is the slot of j -> i for the slot p of i -> j."""
+    out = array("q", [0]) * csr.num_slots
+    if _use_numba(backend):
+        _nb_reverse_slots(_view(csr.indptr), _view(csr.indices), _view(out))
+    else:
+        _py_reverse_slots(csr.indptr, csr.indices, out)
+    return out
+
+
+def mdep_flags(values: array, rev: array, tau: float, backend: str | None = None) -> array:
+    """1 for slots whose edge is mutually dependent (both directions >= tau)."""
+    out = array("b", [0]) * len(values)
+    if _use_numba(backend):
+        _nb_mdep_flags(_view(values), _view(rev), tau, _view(out))
+    else:
+        _py_mdep_flags(values, rev, tau, out)
+    return out
+
+
+def star_flags(
+    values: array, rev: array, flags: array, tau: float, backend: str | None = None
+) -> array:
+    """1 for slots i -> j where j joins the star of i (mDep edge, one direction >= 2 * tau)."""
+    out = array("b", [0]) * len(values)
+    if _use_numba(backend):
+        _nb_star_flags(_view(values), _view(rev), _view(flags), tau, _view(out))
+    else:
+        _py_star_flags(values, rev, flags, tau, out)
+    return out
+
+
+def paired_flags(
+    forward: array, reverse: array, tau: float, backend: str | None = None
+) -> tuple[array, array]:
+    """mdep_flags and star_flags when d(j -> i) is given aligned with d(i -> j) in reverse."""
+    mdep = array("b", [0]) * len(forward)
+    star = array("b", [0]) * len(forward)
+    if _use_numba(backend):
+        _nb_paired_flags(_view(forward), _view(reverse), tau, _view(mdep), _view(star))
+    else:
+        _py_paired_flags(forward, reverse, tau, mdep, star)
+    return mdep, star
+
+
+def node_profiles(
+    csr: CSRGraph,
+    lo: int,
+    hi: int,
+    forward: array,
+    reverse: array,
+    tau: float,
+    out: array,
+    backend: str | None = None,
+) -> array:
+    """Add the dependency classes of the slots of rows lo..hi to ``out`` (4 counts per node).
+
+    forward holds d(i -> j) and reverse d(j -> i) for those slots, as in
+    mDepStar._dependency_blocks; ``out[4 * i + c]`` counts class c of
+    mDepStar.get_node_deps (mutual, none, node on neighbor, neighbor on node).
+    """
+    if _use_numba(backend):
+        _nb_node_profiles(_view(csr.indptr), _view(forward), _view(reverse), tau, lo, hi, _view(out))
+    else:
+        _py_node_profiles(csr.indptr, forward, reverse, tau, lo, hi, out)
+    return out
+
+
+def histogram(values: array, out: array, backend: str | None = None) -> array:
+    """Add values in [0, 1] to the counts of len(out) equal bins, out of range values to the end bins."""
+    if _use_numba(backend):
+        _nb_histogram(_view(values), _view(out))
+    else:
+        _py_histogram(values, out)
+    return out
+
+
+def mutual_terms(
+    csr: CSRGraph, lo: int, hi: int, forward: array, reverse: array, backend: str | None = None
+) -> tuple[array, array]:
+    """min(d1, d2) and min(d1, d2) * (d1 + d2) / 2 of the edges i -> j, i <= j, of rows lo..hi.
+
+    forward and reverse hold the slots of those rows, as in node_profiles.
+    """
+    slots = csr.indptr[hi] - csr.indptr[lo]
+    mutual = array("d", [0.0]) * slots
+    weighted = array("d", [0.0]) * slots
+    if _use_numba(backend):
+        n = _nb_mutual_terms(
+            _view(csr.indptr), _view(csr.indices), lo, hi,
+            _view(forward), _view(reverse), _view(mutual), _view(weighted),
+        )
+    else:
+        n = _py_mutual_terms(csr.indptr, csr.indices, lo, hi, forward, reverse, mutual, weighted)
+    del mutual[n:]
+    del weighted[n:]
+    return mutual, weighted
+
+
+def induced_subgraph(csr: CSRGraph, global_ids: array, local: array, backend: str | None = None) -> CSRGraph:
+    """CSR of the nodes global_ids (sorted), keeping only edges between them.
+
+    ``local`` maps a global id to its position in global_ids and holds -1 for
+    every other node; node ids of the result are those positions.
+    """
+    capacity = sum(csr.degree(g) for g in global_ids)
+    indptr = array("q", [0]) * (len(global_ids) + 1)
+    indices = array("i", [0]) * capacity
+    weights = array("d", [0.0]) * capacity
+
+    if _use_numba(backend):
+        n = _nb_induced_rows(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights), _view(global_ids),
+            _view(local), _view(indptr), _view(indices), _view(weights),
+        )
+    else:
+        n = _py_induced_rows(
+            csr.indptr, csr.indices, csr.weights, global_ids, local, indptr, indices, weights
+        )
+
+    del indices[n:]
+    del weights[n:]
+    return CSRGraph([csr.nodes[g] for g in global_ids], indptr, indices, weights)
+
+
+def overlap_scores(
+    offsets_a: array,
+    members_a: array,
+    offsets_b: array,
+    members_b: array,
+    pair_a: array,
+    pair_b: array,
+    backend: str | None = None,
+) -> array:
+    """Overlap score of complex ``pair_a[k]`` of A and ``pair_b[k]`` of B.
+
+    Complexes are given as ragged arrays (offsets + members) of sorted integer ids.
+    """
+    out = array("d", [0.0]) * len(pair_a)
+    if _use_numba(backend):
+        _nb_overlap_scores(
+            _view(offsets_a), _view(members_a), _view(offsets_b), _view(members_b),
+            _view(pair_a), _view(pair_b), _view(out),
+        )
+    else:
+        _py_overlap_scores(offsets_a, members_a, offsets_b, members_b, pair_a, pair_b, out)
+    return out
+
+
+def minhash(
+    offsets: array, members: array, coef_a: array, coef_b: array, backend: str | None = None
+) -> array:
+    """MinHash signatures of ragged sets: ``out[c * k + h]`` is the minimum of
+    ``(coef_a[h] * x + coef_b[h]) % MINHASH_PRIME`` over the members x of set c,
+    with k = len(coef_a). Coefficients and members must be below MINHASH_PRIME.
+    """
+    out = array("q", [0]) * ((len(offsets) - 1) * len(coef_a))
+    if _use_numba(backend):
+        _nb_minhash(_view(offsets), _view(members), _view(coef_a), _view(coef_b), _view(out))
+    else:
+        _py_minhash(offsets, members, coef_a, coef_b, out)
+    return out
+
+
+def double_edge_swaps(
+    csr: CSRGraph,
+    heads: array,
+    tails: array,
+    swaps: int,
+    rng: array,
+    touched: array,
+    max_attempts: int,
+    backend: str | None = None,
+) -> int:
+    """Degree-preserving double-edge swaps, in place.
+
+    Edge e is (heads[e], tails[e]); a swap turns (a, b), (c, d) into (a, d),
+    (c, b), moving the weights with the edges and keeping every CSR row
+    sorted. ``rng`` holds the state of the Lehmer generator (1..MINHASH_PRIME - 1)
+    and ``touched[i]`` is set for every endpoint of a swap. Stops after swaps
+    successful swaps or max_attempts attempts, returns the successful ones.
+    """
+    if _use_numba(backend):
+        return _nb_double_edge_swaps(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights),
+            _view(heads), _view(tails), swaps, max_attempts, _view(rng), _view(touched),
+        )
+    return _py_double_edge_swaps(
+        csr.indptr, csr.indices, csr.weights, heads, tails, swaps, max_attempts, rng, touched
+    )
+
+
+def touched_dependencies(
+    csr: CSRGraph,
+    weighted: bool,
+    wdeg: array,
+    touched: array,
+    out: array,
+    backend: str | None = None,
+) -> array:
+    """Refresh wdeg of the touched rows and d(i -> j) of every slot with i or j touched.
+
+    After an edit limited to the edges of the touched nodes no other
+    dependency changes: d(i -> j) only reads the rows of i and j.
+    """
+    if _use_numba(backend):
+        _nb_touched_dependencies(
+            _view(csr.indptr), _view(csr.indices), _view(csr.weights),
+            weighted, _view(wdeg), _view(touched), _view(out),
+        )
+    else:
+        _py_touched_dependencies(csr.indptr, csr.indices, csr.weights, weighted, wdeg, touched, out)
+    return out
@@ -0,0 +1,164 @@
+"""Merging or dropping near-duplicate complexes.
+
+Candidate pairs come from MinHash signatures with LSH banding, so similar
+complexes are found without comparing all pairs. Every candidate is then
+verified exactly with kernels.overlap_scores, which computes
+mdepstar_analysis.scores.overlap_score (|A & B|^2 / (|A| |B|)) on the ragged
+ids, or the Jaccard index derived from it.
+
+The bands are tuned so that a pair whose Jaccard index equals the threshold
+becomes a candidate with probability ``recall``. Two sets with an overlap
+score of at least t also have a Jaccard index of at least t, so the same
+banding serves both measures.
+"""
+
+import math
+import random
+from array import array
+from . import kernels
+from .ComplexSet import ComplexSet
+
+MEASURES = ("overlap", "jaccard")
+MODES = ("merge", "drop")
+
+
+def lsh_bands(threshold: float, num_perm: int, recall: float = 0.99) -> tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm and the most rows per band
+    (fewest candidates) for which a pair with Jaccard index threshold shares
+    a band with probability 1 - (1 - threshold ** rows) ** bands >= recall."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold**rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+def similar_pairs(
+    complexes: ComplexSet,
+    threshold: float,
+    measure: str = "overlap",
+    num_perm: int = 64,
+    seed: int = 1,
+    recall: float = 0.99,
+) -> list[tuple[int, int, float]]:
+    """Pairs (i, j, similarity) of complexes with similarity >= threshold, i < j.
+
+    Args:
+        complexes (ComplexSet): complexes to compare
+        threshold (float): minimal overlap score or Jaccard index
+        measure (str): "overlap" or "jaccard"
+        num_perm (int): MinHash permutations, more gives fewer missed pairs
+        seed (int): seed of the permutations
+        recall (float): targeted share of pairs at exactly threshold found, see lsh_bands
+
+    Returns:
+        list[tuple[int, int, float]]: verified pairs
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure {measure}")
+
+    rng = random.Random(seed)
+    coef_a = array("q", (rng.randrange(1, kernels.MINHASH_PRIME) for _ in range(num_perm)))
+    coef_b = array("q", (rng.randrange(0, kernels.MINHASH_PRIME) for _ in range(num_perm)))
+    signatures = kernels.minhash(complexes.offsets, complexes.members, coef_a, coef_b)
+
+    bands, rows = lsh_bands(threshold, num_perm, recall)
+    candidates: set[tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: dict[bytes, list[int]] = {}
+        for c in range(len(complexes)):
+            begin = c * num_perm + band * rows
+            buckets.setdefault(signatures[begin:begin + rows].tobytes(), []).append(c)
+        for bucket in buckets.values():
+            for x in range(len(bucket)):
+                for y in range(x + 1, len(bucket)):
+                    candidates.add((bucket[x], bucket[y]))
+
+    pair_a = array("q")
+    pair_b = array("q")
+    for i, j in sorted(candidates):
+        pair_a.append(i)
+        pair_b.append(j)
+    scores = kernels.overlap_scores(
+        complexes.offsets, complexes.members, complexes.offsets, complexes.members, pair_a, pair_b
+    )
+
+    res = []
+    for i, j, score in zip(pair_a, pair_b, scores):
+        if measure == "jaccard":
+            size_i, size_j = complexes.size(i), complexes.size(j)
+            common = round(math.sqrt(score * size_i * size_j))
+            score = common / (size_i + size_j - common)
+        if score >= threshold:
+            res.append((i, j, score))
+    return res
+
+
+def merge_similar(
+    complexes: ComplexSet,
+    threshold: float = 0.8,
+    mode: str = "merge",
+    measure: str = "overlap",
+    num_perm: int = 64,
+    seed: int = 1,
+) -> ComplexSet:
+    """Collapse complexes whose similarity reaches threshold.
+
+    "merge" replaces every group of transitively similar complexes with the
+    union of its members. "drop" keeps complexes from the largest down and
+    drops any complex similar to one already kept. The result shares the
+    node ids of complexes.
+
+    Args:
+        complexes (ComplexSet): predicted complexes
+        threshold (float): minimal similarity of near duplicates
+        mode (str): "merge" or "drop"
+        measure (str): "overlap" (overlap score) or "jaccard"
+        num_perm (int): MinHash permutations
+        seed (int): seed of the permutations
+
+    Returns:
+        ComplexSet: complexes without near duplicates
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode}")
+
+    pairs = similar_pairs(complexes, threshold, measure, num_perm, seed)
+    res = complexes._empty_like()
+
+    if mode == "drop":
+        similar: dict[int, list[int]] = {}
+        for i, j, _ in pairs:
+            similar.setdefault(i, []).append(j)
+            similar.setdefault(j, []).append(i)
+
+        dropped = set()
+        for c in sorted(range(len(complexes)), key=lambda c: (-complexes.size(c), c)):
+            if c in dropped:
+                continue
+            res._add_ids(complexes.ids(c))
+            dropped.update(similar.get(c, ()))
+        return res
+
+    parent = list(range(len(complexes)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    groups: dict[int, set[int]] = {}
+    for c in range(len(complexes)):
+        groups.setdefault(find(c), set()).update(complexes.ids(c))
+    for root in sorted(groups):
+        res._add_ids(sorted(groups[root]))
+    return res
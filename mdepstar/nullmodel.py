@@ -0,0 +1,175 @@
+"""Degree-preserving null model for the significance of predicted complexes.
+
+Every replicate rewires the network with double-edge swaps: (a, b) and
+(c, d) become (a, d) and (c, b), each edge keeping its weight. Swaps keep every
+degree, so they edit the CSR arrays in place without changing indptr. After a
+batch of swaps only rows around the swapped endpoints have changed. The
+dependencies are recomputed for those rows and for the slots pointing into
+them; every other d(x -> y) is unaffected.
+
+The statistic of a complex C is its mutual dependency density: the sum of
+min(d(u -> v), d(v -> u)) over the edges inside C, divided by the number of
+pairs in C. Node identities survive the swaps, so the same protein sets are
+scored on every replicate and the empirical p-value is
+(1 + replicates scoring at least the real value) / (1 + replicates).
+Independent swap chains run in parallel worker processes.
+"""
+
+from array import array
+from bisect import bisect_left
+from . import kernels, parallel
+from .CSRGraph import CSRGraph
+from .ComplexSet import ComplexSet
+from .Network import Network
+
+# attempts allowed per requested swap before the network counts as not rewirable
+MAX_ATTEMPTS = 100
+
+
+class RewiredGraph(object):
+    """Mutable copy of a CSR graph supporting in-place double-edge swaps.
+
+    Args:
+        csr (CSRGraph): network to rewire, left unchanged
+        weighted (bool): weighted dependencies
+        seed (int): seed of the swap chain
+    """
+
+    def __init__(self, csr: CSRGraph, weighted: bool, seed: int = 1) -> None:
+        self.csr = CSRGraph(csr.nodes, array("q", csr.indptr), array("i", csr.indices), array("d", csr.weights))
+        self.weighted = weighted
+        self.rng = array("q", [seed % (kernels.MINHASH_PRIME - 1) + 1])
+
+        # endpoints of every undirected edge, for sampling the swapped pairs
+        self.heads = array("i")
+        self.tails = array("i")
+        for i in range(csr.num_nodes):
+            for p in csr.row(i):
+                if csr.indices[p] > i:
+                    self.heads.append(i)
+                    self.tails.append(csr.indices[p])
+
+        self.wdeg = kernels.weighted_degrees(self.csr, weighted)
+        self.values = kernels.dependencies(self.csr, weighted, array("d", [0.0]) * self.csr.num_slots, self.wdeg)
+
+    def _find(self, i: int, j: int) -> int:
+        csr = self.csr
+        lo, hi = csr.indptr[i], csr.indptr[i + 1]
+        p = bisect_left(csr.indices, j, lo, hi)
+        return p if p < hi and csr.indices[p] == j else -1
+
+    def rewire(self, swaps: int, batch_size: int = 1024) -> None:
+        """Perform swaps successful swaps, updating the dependencies after every batch.
+
+        Raises:
+            Exception: the swaps are rejected too often (e.g. a complete graph)
+        """
+        touched = array("b", [0]) * self.csr.num_nodes
+        done = 0
+        while done < swaps:
+            batch = min(batch_size, swaps - done)
+            res = kernels.double_edge_swaps(
+                self.csr, self.heads, self.tails, batch, self.rng, touched, MAX_ATTEMPTS * batch
+            )
+            if res < batch:
+                raise Exception("Too many rejected swaps, the network cannot be rewired")
+            done += res
+
+            kernels.touched_dependencies(self.csr, self.weighted, self.wdeg, touched, self.values)
+            touched[:] = array("b", [0]) * len(touched)
+
+    def densities(self, complexes: list[array]) -> array:
+        """Mutual dependency density of every complex, given as sorted CSR ids."""
+        csr = self.csr
+        res = array("d", [0.0]) * len(complexes)
+        for k, ids in enumerate(complexes):
+            members = set(ids)
+            s = 0.0
+            for u in ids:
+                for p in csr.row(u):
+                    v = csr.indices[p]
+                    if v > u and v in members:
+                        s += min(self.values[p], self.values[self._find(v, u)])
+            n = len(ids)
+            res[k] = s / (n * (n - 1) / 2) if n > 1 else 0.0
+        return res
+
+
+def _chain(args: tuple[int, int]) -> list[array]:
+    replicates, seed = args
+    state = parallel._STATE
+    graph = RewiredGraph(state["csr"], state["weighted"], seed)
+    swaps = state["swaps"]
+
+    graph.rewire(state["burn_in"], state["batch_size"])
+    res = []
+    for _ in range(replicates):
+        graph.rewire(swaps, state["batch_size"])
+        res.append(graph.densities(state["complexes"]))
+    return res
+
+
+def complex_pvalues(
+    network: Network,
+    complexes: ComplexSet,
+    replicates: int = 100,
+    swaps_per_edge: float = 1.0,
+    burn_in: float = 10.0,
+    batch_size: int = 1024,
+    workers: int | None = None,
+    seed: int = 1,
+) -> tuple[array, array]:
+    """Empirical p-values of complexes against degree-preserving rewirings.
+
+    Args:
+        network (Network): the real network
+        complexes (ComplexSet): complexes predicted on it
+        replicates (int): number of rewired networks
+        swaps_per_edge (float): swaps between two replicates, per edge
+        burn_in (float): swaps per edge before the first replicate of a chain
+        batch_size (int): swaps between incremental dependency updates
+        workers (int | None): parallel swap chains (0 = all cores), one chain by default
+        seed (int): seed of the first chain, chain k uses seed + k
+
+    Returns:
+        tuple[array, array]: observed density and p-value of every complex, in the order of complexes
+    """
+    csr = network.csr()
+    ids = []
+    for c in complexes:
+        ids.append(array("i", sorted(csr.index[n] for n in c)))
+
+    observed = RewiredGraph(csr, network.weighted, seed).densities(ids)
+
+    edges = csr.num_slots // 2
+    state = {
+        "csr": csr,
+        "weighted": network.weighted,
+        "complexes": ids,
+        "swaps": max(1, int(swaps_per_edge * edges)),
+        "burn_in": int(burn_in * edges),
+        "batch_size": batch_size,
+    }
+
+    chains = 1 if workers is None else min(parallel.available_workers(workers), replicates)
+    jobs = [(replicates // chains + (k < replicates % chains), seed + k) for k in range(chains)]
+
+    if chains > 1 and parallel.can_fork():
+        with parallel.fork_pool(chains, **state) as pool:
+            results = list(pool.map(_chain, jobs))
+    else:
+        parallel._STATE.update(state)
+        try:
+            results = [_chain(job) for job in jobs]
+        finally:
+            parallel._STATE.clear()
+
+    at_least = array("q", [0]) * len(ids)
+    for chain in results:
+        for densities in chain:
+            for k, d in enumerate(densities):
+                if d >= observed[k] - kernels.REL_TOL * abs(observed[k]):
+                    at_least[k] += 1
+
+    pvalues = array("d", ((1 + n) / (1 + replicates) for n in at_least))
+    return observed, pvalues
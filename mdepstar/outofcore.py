@@ -0,0 +1,252 @@
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+import warnings
+import weakref
+from array import array
+from tqdm import tqdm
+from . import kernels
+from .CSRGraph import CSRGraph
+from .DependencyMatrix import CompactDependencyMatrix, STORAGE_TYPECODES
+from .sketch import DependencySketch
+
+# Approximate working set of one slot of a block's local CSR: indices, weights,
+# forward and reverse values and the kernel's temporaries.
+BYTES_PER_SLOT = 64
+
+_UNITS = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_memory(value: str) -> int:
+    """Bytes from a size such as 512M, 4G or 1000000."""
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def memory_blocks(csr: CSRGraph, max_memory: int) -> list[tuple[int, int]]:
+    """Consecutive row ranges whose halo working set stays under max_memory.
+
+    A row costs its own slots plus the slots of its neighbours' rows, an upper
+    bound of what it adds to the block's halo. A row costing more than the
+    budget alone still becomes a block of its own, with a RuntimeWarning, since
+    rows are not split. The budget covers the blocks only: the CSR of the
+    network is held in memory besides them.
+    """
+    budget = max(1, max_memory // BYTES_PER_SLOT)
+    blocks = []
+    begin = 0
+    used = 0
+    over = 0
+    largest = 0
+    for i in range(csr.num_nodes):
+        cost = csr.degree(i)
+        for p in csr.row(i):
+            cost += csr.degree(csr.indices[p])
+        if cost > budget:
+            over += 1
+            largest = max(largest, cost)
+
+        if used + cost > budget and i > begin:
+            blocks.append((begin, i))
+            begin = i
+            used = 0
+        used += cost
+
+    if begin < csr.num_nodes:
+        blocks.append((begin, csr.num_nodes))
+
+    if over:
+        warnings.warn(
+            f"{over} rows need more than max_memory ({max_memory} bytes) on their own, up to "
+            f"{largest * BYTES_PER_SLOT} bytes; their blocks exceed the budget",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return blocks
+
+
+def halo_csr(csr: CSRGraph, lo: int, hi: int, local: array | None = None) -> tuple[CSRGraph, array]:
+    """Local CSR of the rows lo..hi and their one-hop halo.
+
+    Block rows are complete; halo rows keep only neighbours inside the local
+    node set, which is all d(i -> j) and d(j -> i) need for a block node i when
+    the halo's weighted degrees come from the whole network. Local ids keep the
+    global order, so the block rows map onto the global slots indptr[lo]..indptr[hi].
+    ``local`` is an optional scratch array of -1s of length csr.num_nodes, left as found.
+    Returns the local CSR and the global id of every local node.
+    """
+    members = set(range(lo, hi))
+    members.update(csr.indices[csr.indptr[lo]:csr.indptr[hi]])
+    global_ids = array("i", sorted(members))
+
+    if local is None:
+        local = array("i", [-1]) * csr.num_nodes
+    for k, g in enumerate(global_ids):
+        local[g] = k
+
+    res = kernels.induced_subgraph(csr, global_ids, local)
+
+    for g in global_ids:
+        local[g] = -1
+    return res, global_ids
+
+
+class SpilledDependencies(object):
+    """Dependencies computed in vertex blocks and spilled to disk-backed arrays.
+
+    ``forward.bin`` holds d(i -> j) for every CSR slot in global order and
+    ``reverse.bin`` holds d(j -> i) aligned with it, so the mutually dependent
+    network and the stars can be assembled by streaming both files block by
+    block. Only one block's halo is held in memory at a time; the CSR of the
+    network itself stays in memory, outside max_memory.
+
+    Args:
+        csr (CSRGraph): network
+        weighted (bool): weighted network
+        max_memory (int): bytes for one block's working set
+        storage (str): "float32" or "float64" values on disk
+        directory (str | None): spill directory, a temporary one (removed with this object) by default
+        progress (bool): show progress of both passes
+    """
+
+    def __init__(
+        self,
+        csr: CSRGraph,
+        weighted: bool,
+        max_memory: int,
+        storage: str = "float64",
+        directory: str | None = None,
+        progress: bool = False,
+    ) -> None:
+        self.csr = csr
+        self.weighted = weighted
+        self.storage = storage
+        self.typecode = STORAGE_TYPECODES[storage]
+        self.progress = progress
+        self.blocks = memory_blocks(csr, max_memory)
+
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="mdepstar_")
+            self._finalizer = weakref.finalize(self, shutil.rmtree, directory, True)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.forward_path = os.path.join(directory, "forward.bin")
+        self.reverse_path = os.path.join(directory, "reverse.bin")
+
+        self.sketch = DependencySketch()
+        self._mmap: mmap.mmap | None = None
+
+    def compute(self) -> "SpilledDependencies":
+        wdeg = kernels.weighted_degrees(self.csr, self.weighted)
+        local = array("i", [-1]) * self.csr.num_nodes
+
+        with open(self.forward_path, "wb") as fwd, open(self.reverse_path, "wb") as rev:
+            for lo, hi in tqdm(self.blocks, unit="block", disable=not self.progress):
+                sub, global_ids = halo_csr(self.csr, lo, hi, local)
+                sub_wdeg = array("d", (wdeg[g] for g in global_ids))
+
+                first = global_ids.index(lo)
+                last = first + hi - lo
+                begin, end = sub.indptr[first], sub.indptr[last]
+
+                # d(i -> j) for the block rows, d(j -> i) only for their reverse slots
+                forward = kernels.dependencies(
+                    sub, self.weighted, array("d", [0.0]) * sub.num_slots, sub_wdeg, first, last
+                )[begin:end]
+                rev_slots = kernels.reverse_slots(sub)[begin:end]
+                owners = sub.indices[begin:end]
+                reverse = kernels.slot_dependencies(
+                    sub, self.weighted, sub_wdeg, owners, rev_slots, array("d", [0.0]) * (end - begin)
+                )
+
+                array(self.typecode, forward).tofile(fwd)
+                array(self.typecode, reverse).tofile(rev)
+
+                self.sketch.update_block(self.csr, lo, hi, forward, reverse)
+        return self
+
+    def matrix(self) -> CompactDependencyMatrix:
+        """Memory-mapped view of the forward file with the usual matrix[A][B] interface."""
+        if self.csr.num_slots == 0:
+            return CompactDependencyMatrix(self.csr, self.storage)
+
+        if self._mmap is None:
+            with open(self.forward_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return CompactDependencyMatrix(self.csr, self.storage, memoryview(self._mmap).cast(self.typecode))
+
+    def read_block(self, k: int) -> tuple[int, int, array, array]:
+        """Rows, forward and reverse values of block k, read sequentially from disk."""
+        lo, hi = self.blocks[k]
+        itemsize = array(self.typecode).itemsize
+        offset = self.csr.indptr[lo] * itemsize
+        count = self.csr.indptr[hi] - self.csr.indptr[lo]
+
+        res = []
+        for path in (self.forward_path, self.reverse_path):
+            values = array(self.typecode)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                values.fromfile(f, count)
+            res.append(values)
+        return lo, hi, res[0], res[1]
+
+    def mdep_edges(self, tau: float):
+        """Stream (A, B, d(A -> B)) for every directed mutually dependent edge."""
+        csr = self.csr
+        for k in range(len(self.blocks)):
+            lo, hi, forward, reverse = self.read_block(k)
+            mdep, _ = kernels.paired_flags(forward, reverse, tau)
+            base = csr.indptr[lo]
+            for i in range(lo, hi):
+                for p in csr.row(i):
+                    if mdep[p - base]:
+                        yield csr.nodes[i], csr.nodes[csr.indices[p]], forward[p - base]
+
+    def complexes(self, tau: float) -> set[frozenset[str]]:
+        """Stars of all seeds, assembled block by block.
+
+        Each block writes its stars as sorted runs of canonical tuples; the runs
+        are then merged with heapq.merge, dropping duplicates on the fly.
+        """
+        csr = self.csr
+        runs = []
+        for k in tqdm(range(len(self.blocks)), unit="block", disable=not self.progress):
+            lo, hi, forward, reverse = self.read_block(k)
+            _, star = kernels.paired_flags(forward, reverse, tau)
+            base = csr.indptr[lo]
+
+            stars = set()
+            for i in range(lo, hi):
+                res = [csr.nodes[i]]
+                for p in csr.row(i):
+                    if star[p - base] and csr.indices[p] != i:
+                        res.append(csr.nodes[csr.indices[p]])
+                if len(res) >= 3:
+                    stars.add("\t".join(sorted(res)))
+
+            run = os.path.join(self.directory, f"stars_{k}.txt")
+            with open(run, "w") as f:
+                for line in sorted(stars):
+                    f.write(line + "\n")
+            runs.append(run)
+
+        complexes: set[frozenset[str]] = set()
+        files = [open(run, "r") for run in runs]
+        try:
+            previous = None
+            for line in heapq.merge(*files):
+                if line != previous:
+                    complexes.add(frozenset(line.rstrip("\n").split("\t")))
+                    previous = line
+        finally:
+            for f in files:
+                f.close()
+            for run in runs:
+                os.remove(run)
+        return complexes
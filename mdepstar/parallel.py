@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import sys
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from . import kernels
+
+# Objects shared with forked workers. They are inherited through fork instead of
+# being pickled, so a Network never has to be serialised.
+_STATE: dict = {}
+
+
+def available_workers(workers: int | None) -> int:
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def can_fork() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def gil_enabled() -> bool:
+    """False only on a free-threaded interpreter (3.13t) running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def thread_workers(threads: int | None, compiled: bool = False) -> int:
+    """Threads worth starting for a phase, 1 when they would only contend for the GIL.
+
+    Args:
+        threads (int | None): requested threads, 0 uses all cores, None means serial
+        compiled (bool): the phase runs in Numba kernels, which release the GIL
+    """
+    if threads is None or threads == 1:
+        return 1
+    if gil_enabled() and not (compiled and kernels.BACKEND == "numba"):
+        warnings.warn(
+            "The GIL is enabled and the phase runs in Python, running it in a single thread",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return 1
+    return available_workers(threads)
+
+
+@contextmanager
+def fork_pool(workers: int, **state):
+    """Process pool whose workers see ``state`` through the module level ``_STATE``."""
+    _STATE.update(state)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            yield pool
+    finally:
+        _STATE.clear()
+
+
+def partition_of(complex_ids: tuple[str, ...], partitions: int) -> int:
+    """Stable hash partition of a canonical (sorted) complex, equal across processes."""
+    return zlib.crc32("\0".join(complex_ids).encode()) % partitions
+
+
+def _star_shard(args: tuple[list[str], int]) -> list[list[tuple[str, ...]]]:
+    seeds, partitions = args
+    model = _STATE["model"]
+    mDep_network = _STATE["mDep_network"]
+
+    buckets: list[set[tuple[str, ...]]] = [set() for _ in range(partitions)]
+    for n in seeds:
+        c = set(mDep_network.neighbors(n))
+        res = set([n]).union(model._check_condition(n, c))
+        if len(res) >= 3:
+            t = tuple(sorted(res))
+            buckets[partition_of(t, partitions)].add(t)
+
+    return [list(b) for b in buckets]
+
+
+def parallel_complexes(model, mDep_network, workers: int | None = None) -> set[frozenset[str]]:
+    """Build the mutually dependent stars of all seeds in worker processes.
+
+    Seeds are striped over ``4 * workers`` shards so that large stars (dense
+    graphs, low threshold) spread over all workers. Each shard returns canonical
+    sorted tuples already split into hash partitions; the partitions are then
+    deduplicated independently and concatenated.
+    """
+    workers = available_workers(workers)
+    seeds = list(mDep_network.nodes())
+
+    shards = min(len(seeds), workers * 4) or 1
+    partitions = workers
+
+    # compute the threshold once in the parent instead of in every worker
+    model.dependency_threshold
+
+    merged: list[set[tuple[str, ...]]] = [set() for _ in range(partitions)]
+    with fork_pool(workers, model=model, mDep_network=mDep_network) as pool:
+        jobs = [(seeds[k::shards], partitions) for k in range(shards)]
+        for buckets in pool.map(_star_shard, jobs):
+            for k, bucket in enumerate(buckets):
+                merged[k].update(bucket)
+
+    complexes: set[frozenset[str]] = set()
+    for bucket in merged:
+        complexes.update(frozenset(t) for t in bucket)
+    return complexes
+
+
+def threaded_complexes(star_of, seeds: int, threads: int) -> set[frozenset[str]]:
+    """Build the stars of seeds 0..seeds-1 in a thread pool.
+
+    ``star_of(k)`` returns the canonical (sorted) star of seed k, or None when
+    it is smaller than 3. Each thread writes only its own slots of a
+    preallocated result list, so nothing shared is mutated concurrently;
+    deduplication happens afterwards in the calling thread.
+    """
+    results: list[tuple[str, ...] | None] = [None] * seeds
+
+    def stripe(k: int) -> None:
+        for s in range(k, seeds, threads):
+            results[s] = star_of(s)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(stripe, range(threads)))
+
+    return set(frozenset(t) for t in results if t is not None)
@@ -0,0 +1,190 @@
+"""Mergeable summaries of the dependency distribution for choosing tau.
+
+A DependencySketch follows three streams:
+
+    dependency  every directed d(a -> b)
+    mutual      min(d(a -> b), d(b -> a)) of every edge, which decides mDep membership
+    weighted    min(d1, d2) * (d1 + d2) / 2, the terms of mDepStar._estimate_dependency
+
+Dependencies lie in [0, 1], so each stream keeps a fixed-width histogram and
+a KLL quantile sketch, whose rank error is about 1.7 / k of the stream
+length. The sums of the estimator are kept exactly; suggested_threshold()
+is the estimated mDepStar.dependency_threshold. Sketches of disjoint edge sets
+(row blocks, worker processes, partitions) merge into the sketch of their
+union.
+"""
+
+import math
+import random
+from array import array
+from collections.abc import Iterable
+from . import kernels
+from .CSRGraph import CSRGraph
+
+STREAMS = ("dependency", "mutual", "weighted")
+
+# quantiles printed by DependencySketch.report
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class QuantileSketch(object):
+    """KLL sketch of a stream of floats.
+
+    Level h holds items of weight 2**h. A level over its capacity is sorted
+    and every other item, from a random offset, moves up a level.
+
+    Args:
+        k (int): capacity of the top level, the accuracy parameter
+        seed (int): seed of the compaction offsets
+    """
+
+    def __init__(self, k: int = 200, seed: int = 1) -> None:
+        self.k = k
+        self.n = 0
+        self.levels: list[list[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, h: int) -> int:
+        return max(2, int(self.k * (2 / 3) ** (len(self.levels) - 1 - h)))
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                level = sorted(self.levels[h])
+                # an odd item stays at its level
+                self.levels[h] = [level.pop()] if len(level) % 2 else []
+                self.levels[h + 1].extend(level[self._rng.randrange(2)::2])
+            h += 1
+
+    def update(self, values: Iterable[float]) -> None:
+        level = self.levels[0]
+        size = len(level)
+        level.extend(values)
+        self.n += len(level) - size
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append([])
+            self.levels[h].extend(level)
+        self.n += other.n
+        self._compress()
+
+    def _weighted(self) -> list[tuple[float, int]]:
+        return sorted((x, 1 << h) for h, level in enumerate(self.levels) for x in level)
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile q (0..1)."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        items = self._weighted()
+        if not items:
+            return 0.0
+        target = q * sum(w for _, w in items)
+        seen = 0
+        for x, w in items:
+            seen += w
+            if seen >= target:
+                return x
+        return items[-1][0]
+
+    def rank(self, x: float) -> float:
+        """Approximate share of the stream below x."""
+        items = self._weighted()
+        total = sum(w for _, w in items)
+        return 0.0 if total == 0 else sum(w for v, w in items if v < x) / total
+
+
+class DependencySketch(object):
+    """Histograms, quantile sketches and estimator sums of the dependency streams.
+
+    Args:
+        bins (int): histogram bins over [0, 1]
+        k (int): accuracy of the quantile sketches
+        seed (int): seed of the quantile sketches
+    """
+
+    def __init__(self, bins: int = 100, k: int = 200, seed: int = 1) -> None:
+        self.bins = bins
+        self.histograms: dict[str, array] = {s: array("q", [0]) * bins for s in STREAMS}
+        self.quantiles: dict[str, QuantileSketch] = {s: QuantileSketch(k, seed) for s in STREAMS}
+        self.dep_weighted_sum = 0.0
+        self.dep_weights = 0.0
+
+    @staticmethod
+    def from_blocks(
+        csr: CSRGraph, blocks: Iterable[tuple[int, int, array, array]], **kwargs
+    ) -> "DependencySketch":
+        """Sketch of (lo, hi, forward, reverse) blocks, see mDepStar._dependency_blocks."""
+        res = DependencySketch(**kwargs)
+        for lo, hi, forward, reverse in blocks:
+            res.update_block(csr, lo, hi, forward, reverse)
+        return res
+
+    def _add(self, dependency: array, mutual: array, weighted: array) -> None:
+        for stream, values in zip(STREAMS, (dependency, mutual, weighted)):
+            kernels.histogram(values, self.histograms[stream])
+            self.quantiles[stream].update(values)
+        self.dep_weighted_sum += math.fsum(weighted)
+        self.dep_weights += math.fsum(mutual)
+
+    def update_block(self, csr: CSRGraph, lo: int, hi: int, forward: array, reverse: array) -> None:
+        """Add the slots of rows lo..hi; every edge counts once, from its lower node."""
+        mutual, weighted = kernels.mutual_terms(csr, lo, hi, forward, reverse)
+        self._add(forward, mutual, weighted)
+
+    def update_edges(self, edges: Iterable[tuple[float, float]]) -> None:
+        """Add edges given as (d(a -> b), d(b -> a))."""
+        dependency = array("d")
+        mutual = array("d")
+        weighted = array("d")
+        for d1, d2 in edges:
+            dependency.append(d1)
+            dependency.append(d2)
+            min_of_dep = min(d1, d2)
+            mutual.append(min_of_dep)
+            weighted.append(min_of_dep * ((d1 + d2) / 2))
+        self._add(dependency, mutual, weighted)
+
+    def merge(self, other: "DependencySketch") -> "DependencySketch":
+        """Add the sketch of a disjoint set of edges, returns self."""
+        if other.bins != self.bins:
+            raise ValueError("Sketches with different bins cannot be merged")
+        for s in STREAMS:
+            hist = self.histograms[s]
+            for b, c in enumerate(other.histograms[s]):
+                hist[b] += c
+            self.quantiles[s].merge(other.quantiles[s])
+        self.dep_weighted_sum += other.dep_weighted_sum
+        self.dep_weights += other.dep_weights
+        return self
+
+    @property
+    def edges(self) -> int:
+        return len(self.quantiles["mutual"])
+
+    def quantile(self, stream: str, q: float) -> float:
+        return self.quantiles[stream].quantile(q)
+
+    def suggested_threshold(self) -> float:
+        """mDepStar._estimate_dependency from the accumulated sums, rounded as dependency_threshold."""
+        if self.dep_weights == 0:
+            return 1
+        return round(self.dep_weighted_sum / self.dep_weights / 2, 3)
+
+    def report(self) -> str:
+        """Quantiles of every stream and the suggested threshold, one line each."""
+        lines = [f"{self.edges} edges, quantiles " + " ".join(f"{q:g}" for q in REPORT_QUANTILES)]
+        for s in STREAMS:
+            values = " ".join(f"{self.quantile(s, q):.3f}" for q in REPORT_QUANTILES)
+            lines.append(f"{s:10} {values}")
+        tau = self.suggested_threshold()
+        lines.append(f"suggested dependency {tau}, {1 - self.quantiles['mutual'].rank(tau):.1%} of edges mutual")
+        return "\n".join(lines)
@@ -0,0 +1,183 @@
+"""The per-edge dependency table in columnar files.
+
+Every undirected edge is one row with the columns
+
+    a, b      the nodes, a before b in the CSR order (a == b for a self-loop)
+    d_ab      d(a -> b)
+    d_ba      d(b -> a)
+    weight    edge weight
+    mdep      both directions reach the threshold (the edge is in the mDep network)
+
+The format follows the extension: ``.parquet`` (one row group per block of
+rows) or ``.arrow``/``.feather`` (Arrow IPC file, one record batch per block)
+when pyarrow is installed, ``.npz`` with numpy alone. Node names are stored
+once, a and b as int32 ids into them (an Arrow dictionary column), so loading
+the table parses no text.
+"""
+
+from array import array
+from collections.abc import Iterable
+from . import kernels
+from .CSRGraph import CSRGraph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+COLUMNS = ("a", "b", "d_ab", "d_ba", "weight", "mdep")
+
+
+def table_format(file_name: str) -> str:
+    if file_name.endswith(".parquet"):
+        return "parquet"
+    if file_name.endswith((".arrow", ".feather")):
+        return "arrow"
+    if file_name.endswith(".npz"):
+        return "npz"
+    raise ValueError(f"{file_name}: expected a .parquet, .arrow, .feather or .npz file")
+
+
+def _require(fmt: str) -> None:
+    if np is None:
+        raise ImportError("The dependency table needs numpy (pip install mDepStar[fast])")
+    if fmt != "npz" and pa is None:
+        raise ImportError(f"{fmt} files need pyarrow (pip install mDepStar[arrow]), or use .npz")
+
+
+def _numpy(values) -> "np.ndarray":
+    return np.frombuffer(values, dtype=values.typecode if isinstance(values, array) else values.format)
+
+
+def _block_columns(csr: CSRGraph, lo: int, hi: int, forward, reverse, tau: float) -> dict:
+    """Columns of the edges whose first node is in the rows lo..hi."""
+    indptr = _numpy(csr.indptr)
+    begin, end = indptr[lo], indptr[hi]
+
+    rows = np.repeat(np.arange(lo, hi, dtype=np.int32), np.diff(indptr[lo:hi + 1]))
+    cols = _numpy(csr.indices)[begin:end]
+    keep = cols >= rows
+
+    mdep, _ = kernels.paired_flags(forward, reverse, tau)
+    return {
+        "a": rows[keep],
+        "b": cols[keep],
+        "d_ab": _numpy(forward)[keep].astype(np.float64),
+        "d_ba": _numpy(reverse)[keep].astype(np.float64),
+        "weight": _numpy(csr.weights)[begin:end][keep],
+        "mdep": _numpy(mdep)[keep].astype(np.bool_),
+    }
+
+
+def write_dependency_table(
+    file_name: str,
+    csr: CSRGraph,
+    blocks: Iterable[tuple[int, int, array, array]],
+    tau: float,
+) -> int:
+    """Write the table from blocks of (lo, hi, forward, reverse) covering all rows in order.
+
+    forward holds d(i -> j) and reverse d(j -> i) for the slots of the rows
+    lo..hi. Parquet and Arrow files are written block by block; .npz keeps the
+    compact columns in memory until the end. Returns the number of rows.
+    """
+    fmt = table_format(file_name)
+    _require(fmt)
+
+    rows = 0
+    if fmt == "npz":
+        chunks: dict[str, list] = {c: [] for c in COLUMNS}
+        for lo, hi, forward, reverse in blocks:
+            for column, values in _block_columns(csr, lo, hi, forward, reverse, tau).items():
+                chunks[column].append(values)
+        columns = {c: np.concatenate(v) if v else np.empty(0) for c, v in chunks.items()}
+        np.savez(file_name, nodes=np.array(csr.nodes, dtype=str), **columns)
+        return len(columns["a"])
+
+    dictionary = pa.array(csr.nodes, type=pa.string())
+    schema = pa.schema([
+        ("a", pa.dictionary(pa.int32(), pa.string())),
+        ("b", pa.dictionary(pa.int32(), pa.string())),
+        ("d_ab", pa.float64()),
+        ("d_ba", pa.float64()),
+        ("weight", pa.float64()),
+        ("mdep", pa.bool_()),
+    ])
+
+    if fmt == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(file_name, schema)
+    else:
+        writer = pyarrow.ipc.new_file(file_name, schema)
+
+    with writer:
+        for lo, hi, forward, reverse in blocks:
+            columns = _block_columns(csr, lo, hi, forward, reverse, tau)
+            batch = pa.record_batch([
+                pa.DictionaryArray.from_arrays(columns["a"], dictionary),
+                pa.DictionaryArray.from_arrays(columns["b"], dictionary),
+                columns["d_ab"],
+                columns["d_ba"],
+                columns["weight"],
+                columns["mdep"],
+            ], schema=schema)
+            if fmt == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def read_dependency_table(file_name: str, names: bool = True) -> dict[str, "np.ndarray"]:
+    """Load a table written by write_dependency_table as numpy columns.
+
+    Args:
+        file_name (str): .parquet, .arrow, .feather or .npz file
+        names (bool): a and b as node names; otherwise as int ids into the "nodes" column
+
+    Returns:
+        dict[str, np.ndarray]: the COLUMNS plus "nodes", ready for pandas.DataFrame
+    """
+    fmt = table_format(file_name)
+    _require(fmt)
+
+    if fmt == "npz":
+        with np.load(file_name) as z:
+            res = {c: z[c] for c in ("nodes",) + COLUMNS}
+    else:
+        if fmt == "parquet":
+            table = pyarrow.parquet.read_table(file_name)
+        else:
+            with pa.memory_map(file_name) as source:
+                table = pyarrow.ipc.open_file(source).read_all()
+        table = table.unify_dictionaries()
+
+        res = {}
+        dictionaries = {}
+        for c in ("a", "b"):
+            column = table.column(c).combine_chunks()
+            dictionaries[c] = column.dictionary.to_numpy(zero_copy_only=False).astype(str)
+            res[c] = column.indices.to_numpy()
+
+        # Parquet may keep only the names used by each column
+        if np.array_equal(dictionaries["a"], dictionaries["b"]):
+            res["nodes"] = dictionaries["a"]
+        else:
+            res["nodes"] = np.union1d(dictionaries["a"], dictionaries["b"])
+            for c in ("a", "b"):
+                res[c] = np.searchsorted(res["nodes"], dictionaries[c])[res[c]]
+
+        for c in COLUMNS[2:]:
+            res[c] = table.column(c).to_numpy()
+
+    if names:
+        res["a"] = res["nodes"][res["a"]]
+        res["b"] = res["nodes"][res["b"]]
+    return res
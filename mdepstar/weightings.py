@@ -0,0 +1,128 @@
+"""Dependencies of several weightings of one network in a single pass.
+
+A weighting gives every edge a weight. These names are available:
+
+    weight      the edge weight the network was read with (weighted networks only)
+    unweighted  every edge weighs 1
+    <name>      a further column read with Network.read_file(weight_columns=...)
+
+All weightings share the CSR layout of network.csr(). d(i -> j) takes one
+intersection of the rows of i and j, whatever the weights are, so
+kernels.multi_dependencies finds the common neighbours of every slot once and
+sums the terms of every weighting from them. The result for each weighting
+equals an mDepStar run on the network with those weights.
+"""
+
+import os
+from array import array
+from . import kernels
+from .CSRGraph import CSRGraph
+from .Network import Network
+from .checkpoint import row_blocks
+from .sketch import DependencySketch
+from .table import write_dependency_table
+
+EDGE_WEIGHT = "weight"
+UNWEIGHTED = "unweighted"
+
+
+def weighting_names(network: Network) -> list[str]:
+    """Every weighting of the network: weight (when weighted), unweighted, then the further columns."""
+    res = [EDGE_WEIGHT] if network.weighted else []
+    return res + [UNWEIGHTED] + network.weightings()
+
+
+def weighting_graphs(network: Network, names: list[str] | None = None) -> dict[str, CSRGraph]:
+    """CSR view of every weighting, all sharing nodes, indptr and indices.
+
+    Args:
+        network (Network): the network
+        names (list[str] | None): weightings, all of weighting_names by default
+
+    Raises:
+        ValueError: unknown weighting, or a further column named weight or unweighted
+    """
+    if names is None:
+        names = weighting_names(network)
+    for name in (EDGE_WEIGHT, UNWEIGHTED):
+        if name in network.weightings():
+            raise ValueError(f"The weight column name {name} is reserved")
+
+    res = {}
+    for name in names:
+        if name == EDGE_WEIGHT:
+            res[name] = network.csr()
+        elif name == UNWEIGHTED:
+            res[name] = network.weighting_csr(None)
+        else:
+            res[name] = network.weighting_csr(name)
+    return res
+
+
+def weighting_dependencies(network: Network, names: list[str] | None = None) -> dict[str, array]:
+    """d(i -> j) of every CSR slot for every weighting, from one traversal of the common neighbours.
+
+    Args:
+        network (Network): the network
+        names (list[str] | None): weightings, all of weighting_names by default
+
+    Returns:
+        dict[str, array]: weighting -> dependencies aligned with network.csr()
+    """
+    return _dependencies(network.csr(), weighting_graphs(network, names))
+
+
+def _dependencies(csr: CSRGraph, graphs: dict[str, CSRGraph]) -> dict[str, array]:
+    out = [array("d", [0.0]) * csr.num_slots for _ in graphs]
+    kernels.multi_dependencies(csr, [g.weights for g in graphs.values()], out)
+    return dict(zip(graphs, out))
+
+
+def dependency_blocks(csr: CSRGraph, values: array, block_slots: int = 2**16):
+    """(lo, hi, forward, reverse) of per-slot dependencies, see mDepStar._dependency_blocks."""
+    rev = kernels.reverse_slots(csr)
+    for lo, hi in row_blocks(csr, block_slots):
+        begin, end = csr.indptr[lo], csr.indptr[hi]
+        reverse = array(values.typecode, (values[rev[p]] for p in range(begin, end)))
+        yield lo, hi, values[begin:end], reverse
+
+
+def table_name(file_name: str, weighting: str) -> str:
+    """file_name with the weighting before the extension, deps.parquet -> deps.unweighted.parquet."""
+    root, ext = os.path.splitext(file_name)
+    return f"{root}.{weighting}{ext}"
+
+
+def export_weighting_tables(
+    network: Network,
+    file_name: str,
+    names: list[str] | None = None,
+    thresholds: dict[str, float] | None = None,
+    block_slots: int = 2**16,
+) -> dict[str, float]:
+    """Write one dependency table per weighting (see mdepstar.table), named by table_name.
+
+    Args:
+        network (Network): the network
+        file_name (str): .parquet, .arrow/.feather or .npz name the weighting is inserted into
+        names (list[str] | None): weightings, all of weighting_names by default
+        thresholds (dict[str, float] | None): tau of the mdep column per weighting; missing
+            ones are estimated as mDepStar does
+        block_slots (int): slots per written block
+
+    Returns:
+        dict[str, float]: the threshold used for every weighting
+    """
+    graphs = weighting_graphs(network, names)
+    values = _dependencies(network.csr(), graphs)
+    thresholds = {} if thresholds is None else thresholds
+
+    res = {}
+    for name, csr in graphs.items():
+        tau = thresholds.get(name)
+        if tau is None:
+            tau = DependencySketch.from_blocks(csr, dependency_blocks(csr, values[name], block_slots)).suggested_threshold()
+        write_dependency_table(table_name(file_name, name), csr, dependency_blocks(csr, values[name], block_slots), tau)
+        print(f"Dependency table of {name} (dependency {tau}) saved as {table_name(file_name, name)}")
+        res[name] = tau
+    return res
@@ -1 +1,3 @@
-from .scores import *
\ No newline at end of file
+from .scores import *
+from .references import ReferenceSet
+from .bootstrap import bootstrap
@@ -0,0 +1,202 @@
+"""Bootstrap confidence intervals of the evaluation metrics.
+
+Every replicate draws the reference complexes (and optionally the predicted
+ones) with replacement. A replicate is only a vector of draw counts per
+complex, so all of them reuse one OverlapMatrix. Recall and MMR average over
+the drawn reference complexes, precision and PPV over the drawn predicted
+ones, while every complex stays available as a match.
+
+Precision, recall and PPV reduce to weighted means of per-complex values of
+the overlap matrix, computed for many replicates at once with numpy when it
+is installed. MMR reweights the per-reference scores of the maximum matching
+of the data in the same way; with ``rematch`` every replicate gets its own
+matching, in which every drawn copy is a vertex, and those replicates are
+split over worker processes.
+"""
+
+import random
+from .mwmatching import maxWeightMatching
+from .scores import F_measure, evaluate, overlap_matrix
+from mdepstar import parallel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METRICS = ("precision", "recall", "F_measure", "PPV", "MMR", "MR_score")
+
+# replicates in one numpy matrix product
+CHUNK_SIZE = 256
+
+
+def _draws(n: int, replicates: int, rng: random.Random, resample: bool) -> list[list[int]]:
+    if not resample:
+        return [[1] * n for _ in range(replicates)]
+    res = []
+    for _ in range(replicates):
+        counts = [0] * n
+        for _ in range(n):
+            counts[rng.randrange(n)] += 1
+        res.append(counts)
+    return res
+
+
+def _percentile(values: list[float], q: float) -> float:
+    # linear interpolation between the closest ranks, as numpy.percentile
+    values = sorted(values)
+    if not values:
+        return 0.0
+    x = q * (len(values) - 1)
+    lo = int(x)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (x - lo)
+
+
+class _Pairs(object):
+    """The non-zero overlap scores as parallel lists of reference id, predicted id and score."""
+
+    def __init__(self, scores: dict[tuple[int, int], float]) -> None:
+        self.ref = [i for i, _ in scores]
+        self.pred = [j for _, j in scores]
+        self.score = list(scores.values())
+
+
+def _weighted_means(draws: list[list[int]], values: list[float]) -> list[float]:
+    """Mean of values over the drawn complexes of every replicate."""
+    if np is not None:
+        res = []
+        for lo in range(0, len(draws), CHUNK_SIZE):
+            counts = np.asarray(draws[lo:lo + CHUNK_SIZE], dtype=np.float64)
+            res.extend((counts @ np.asarray(values, dtype=np.float64) / counts.sum(axis=1)).tolist())
+        return res
+    return [sum(c * v for c, v in zip(counts, values)) / sum(counts) for counts in draws]
+
+
+def _matching(pairs: _Pairs, ref_counts: list[int], pred_counts: list[int], threshold: float) -> list[float]:
+    """Score matched to every drawn reference copy, in reference order (0 when unmatched)."""
+    # every drawn copy is its own vertex of the matching
+    ref_copies: dict[int, list[int]] = {}
+    pred_copies: dict[int, list[int]] = {}
+    vertex = 0
+    for i, c in enumerate(ref_counts):
+        if c:
+            ref_copies[i] = list(range(vertex, vertex + c))
+            vertex += c
+    for j, c in enumerate(pred_counts):
+        if c:
+            pred_copies[j] = list(range(vertex, vertex + c))
+            vertex += c
+
+    edges = []
+    weight = {}
+    for i, j, s in zip(pairs.ref, pairs.pred, pairs.score):
+        if s > threshold and i in ref_copies and j in pred_copies:
+            for u in ref_copies[i]:
+                for v in pred_copies[j]:
+                    edges.append((u, v, s))
+                    weight[u, v] = s
+
+    mates = maxWeightMatching(edges)
+    res = [0.0] * sum(ref_counts)
+    for u in range(min(len(mates), len(res))):
+        if mates[u] != -1:
+            res[u] = weight[u, mates[u]]
+    return res
+
+
+def _mmr(pairs: _Pairs, ref_counts: list[int], pred_counts: list[int], threshold: float) -> float:
+    return sum(_matching(pairs, ref_counts, pred_counts, threshold)) / sum(ref_counts)
+
+
+def _mmr_shard(jobs: list[tuple[list[int], list[int]]]) -> list[float]:
+    state = parallel._STATE
+    return [_mmr(state["pairs"], r, p, state["threshold"]) for r, p in jobs]
+
+
+def bootstrap(
+    reference,
+    predicted,
+    replicates: int = 1000,
+    threshold: float = 0.25,
+    confidence: float = 0.95,
+    resample_predicted: bool = True,
+    mmr: bool = True,
+    rematch: bool = False,
+    workers: int | None = None,
+    seed: int = 1,
+) -> dict[str, tuple[float, float, float]]:
+    """Percentile bootstrap intervals of the metrics of evaluate.
+
+    Args:
+        reference: reference complexes (ReferenceSet or sets)
+        predicted: predicted complexes (ComplexSet or sets)
+        replicates (int): bootstrap replicates
+        threshold (float): overlap score threshold
+        confidence (float): coverage of the intervals
+        resample_predicted (bool): draw the predicted complexes too, otherwise
+            precision and PPV keep their values on the data
+        mmr (bool): include MMR and MR_score
+        rematch (bool): recompute the maximum matching of every replicate on its drawn
+            copies instead of reweighting the matching of the data; duplicated
+            complexes then compete for matches, which shifts MMR down
+        workers (int | None): processes for the rematched MMR replicates (0 = all cores)
+        seed (int): seed of the draws
+
+    Returns:
+        dict[str, tuple[float, float, float]]: metric -> (value on the data, lower, upper)
+    """
+    matrix = overlap_matrix(reference, predicted)
+    point = evaluate(reference, predicted, threshold)
+
+    n_ref = len(matrix.reference)
+    n_pred = len(matrix.predicted)
+    rng = random.Random(seed)
+    ref_draws = _draws(n_ref, replicates, rng, True)
+    pred_draws = _draws(n_pred, replicates, rng, resample_predicted)
+    pairs = _Pairs(matrix.scores)
+
+    # per complex indicators from the overlap matrix, weighted by the draws
+    matched_pred = matrix.matched_predicted(threshold)
+    matched_ref = matrix.matched_reference(threshold)
+    best = [0.0] * n_pred
+    for (id1, id2), score in matrix.scores.items():
+        best[id2] = max(best[id2], score)
+
+    samples: dict[str, list[float]] = {m: [] for m in METRICS}
+    samples["precision"] = _weighted_means(pred_draws, [float(j in matched_pred) for j in range(n_pred)])
+    samples["recall"] = _weighted_means(ref_draws, [float(i in matched_ref) for i in range(n_ref)])
+    samples["PPV"] = _weighted_means(pred_draws, [b if b > threshold else 0.0 for b in best])
+    samples["F_measure"] = [F_measure(p, r) for p, r in zip(samples["precision"], samples["recall"])]
+
+    if mmr and not rematch:
+        matched = _matching(pairs, [1] * n_ref, [1] * n_pred, threshold)
+        samples["MMR"] = _weighted_means(ref_draws, matched)
+        samples["MR_score"] = [F_measure(ppv, m) for ppv, m in zip(samples["PPV"], samples["MMR"])]
+
+    if mmr and rematch:
+        jobs = list(zip(ref_draws, pred_draws))
+        workers = 1 if workers is None else parallel.available_workers(workers)
+        if workers > 1 and parallel.can_fork():
+            shards = [jobs[k::workers] for k in range(workers)]
+            with parallel.fork_pool(workers, pairs=pairs, threshold=threshold) as pool:
+                results = list(pool.map(_mmr_shard, shards))
+            # undo the striping so replicate k stays at position k
+            values = [0.0] * replicates
+            for k, shard in enumerate(results):
+                values[k::workers] = shard
+        else:
+            values = [_mmr(pairs, r, p, threshold) for r, p in jobs]
+        samples["MMR"] = values
+        samples["MR_score"] = [F_measure(ppv, m) for ppv, m in zip(samples["PPV"], values)]
+
+    alpha = (1 - confidence) / 2
+    res = {}
+    for metric in METRICS:
+        if samples[metric]:
+            res[metric] = (
+                point[metric],
+                _percentile(samples[metric], alpha),
+                _percentile(samples[metric], 1 - alpha),
+            )
+    return res
@@ -0,0 +1,142 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from mdepstar import Network
+from mdepstar.compression import open_text
+
+
+class ReferenceSet(object):
+    """Reference complexes parsed once and stored as sorted integer ids.
+
+    Proteins present in ``network`` share its CSR ids (``network.csr().index``),
+    proteins outside the network get ids after ``network.csr().num_nodes``.
+    Complex ``k`` is ``members[offsets[k]:offsets[k + 1]]``; the inverted index
+    maps a protein id to the complexes containing it. Iterating yields
+    frozensets of protein names, so a ReferenceSet can be passed to every
+    function of ``mdepstar_analysis.scores`` in place of a list of sets.
+    """
+
+    def __init__(
+        self,
+        complexes: Iterable[Iterable[str]],
+        network: Network | None = None,
+        file_name: str | None = None,
+    ) -> None:
+        self._file_name = file_name
+        self._network = network
+
+        if network is not None:
+            csr = network.csr()
+            self.proteins: list[str] = list(csr.nodes)
+            self.index: dict[str, int] = dict(csr.index)
+        else:
+            self.proteins = []
+            self.index = {}
+
+        self.offsets: array = array("q", [0])
+        self.members: array = array("i")
+
+        for c in complexes:
+            self.members.extend(sorted(set(self._intern(p) for p in c)))
+            self.offsets.append(len(self.members))
+
+        self._inverted: dict[int, array] = {}
+        for k in range(len(self)):
+            for p in self.ids(k):
+                self._inverted.setdefault(p, array("i")).append(k)
+
+        self._sets: list[frozenset[str]] | None = None
+        self._filtered: dict[tuple, tuple[object, "ReferenceSet"]] = {}
+
+    def __str__(self) -> str:
+        return f"{len(self)} complexes - {len(self._inverted)} proteins - {hex(id(self))}"
+
+    @staticmethod
+    def read_file(file_name: str, network: Network | None = None, sep: str | None = None) -> "ReferenceSet":
+        """One complex per line, proteins separated by ``sep`` (any whitespace by default)."""
+        with open_text(file_name, "r") as f:
+            complexes = [l.split(sep) for l in f.read().splitlines() if l.strip()]
+        return ReferenceSet(complexes, network, file_name)
+
+    def _intern(self, protein: str) -> int:
+        i = self.index.get(protein)
+        if i is None:
+            i = len(self.proteins)
+            self.index[protein] = i
+            self.proteins.append(protein)
+        return i
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, k: int) -> frozenset[str]:
+        return self.sets()[k]
+
+    def __iter__(self) -> Iterator[frozenset[str]]:
+        return iter(self.sets())
+
+    def file_name(self) -> str | None:
+        return self._file_name
+
+    def ids(self, k: int) -> array:
+        """Sorted protein ids of complex k."""
+        return self.members[self.offsets[k]:self.offsets[k + 1]]
+
+    def size(self, k: int) -> int:
+        return self.offsets[k + 1] - self.offsets[k]
+
+    def sets(self) -> list[frozenset[str]]:
+        if self._sets is None:
+            proteins = self.proteins
+            self._sets = [frozenset(proteins[p] for p in self.ids(k)) for k in range(len(self))]
+        return self._sets
+
+    def complexes_of(self, protein: str) -> array:
+        """Indices of the complexes containing protein."""
+        i = self.index.get(protein)
+        return self._inverted.get(i, array("i")) if i is not None else array("i")
+
+    def candidates(self, proteins: Iterable[str]) -> set[int]:
+        """Indices of the complexes sharing at least one protein with ``proteins``."""
+        res: set[int] = set()
+        for p in proteins:
+            res.update(self.complexes_of(p))
+        return res
+
+    def filter_to_network(
+        self, network: Network, min_size: int = 2, min_fraction: float = 0.5, dedup: bool = True
+    ) -> "ReferenceSet":
+        """Restrict the references to a network the ClusterOne way.
+
+        Proteins missing from the network are removed; a complex is kept when at
+        least ``min_size`` of its proteins and at least ``min_fraction`` of its
+        original size remain. With ``dedup`` only the first of complexes that
+        become identical is kept.
+
+        The defaults reproduce ``BiogridCC_SGD24_complexes.txt`` from
+        ``SGD24_references.txt``; ``min_fraction=0.4, dedup=False`` reproduces
+        ``CollinsCC_CYC_complexes.txt`` and ``KroganCoreCC_CYC_complexes.txt``
+        from ``CYC_complexes.txt``. The result shares the network id space and
+        is cached until the network changes.
+        """
+        csr = network.csr()
+        key = (id(network), min_size, min_fraction, dedup)
+        cached = self._filtered.get(key)
+        if cached is not None and cached[0] is csr:
+            return cached[1]
+
+        nodes = csr.index
+        complexes = []
+        seen: set[frozenset[str]] = set()
+        for c in self.sets():
+            kept = frozenset(p for p in c if p in nodes)
+            if len(kept) < min_size or len(kept) < min_fraction * len(c):
+                continue
+            if dedup:
+                if kept in seen:
+                    continue
+                seen.add(kept)
+            complexes.append(kept)
+
+        res = ReferenceSet(complexes, network, self._file_name)
+        self._filtered[key] = (csr, res)
+        return res
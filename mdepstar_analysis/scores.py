@@ -1,7 +1,11 @@
 """ Nepusz, T., Yu, H. & Paccanaro, A., 2012. Detecting overlapping protein complexes in protein-protein
     interaction networks. Nature Methods, Volume 9, pp. 471-472."""
 
+from array import array
+from collections import OrderedDict
+from mdepstar import ComplexSet, kernels
 from .mwmatching import maxWeightMatching
+from .references import ReferenceSet
 
 def overlap_score(set1, set2):
     return len(set1.intersection(set2)) ** 2 / (float(len(set1)) * len(set2))
@@ -64,3 +68,150 @@ def F_measure(p, r): # / MR-score
     if r == 0 and p == 0:
         return 0
     return (2 * p * r) / (p + r)
+
+
+class OverlapMatrix(object):
+    """Sparse overlap scores between reference and predicted complexes.
+
+    Only pairs sharing at least one protein are stored, found through an
+    inverted protein -> reference index, so ``scores[ref, pred]`` holds every
+    non-zero overlap score. A ReferenceSet scored against a ComplexSet never
+    builds Python sets: the predicted ids are mapped into the reference id
+    space and the scores come from kernels.overlap_scores.
+    """
+
+    def __init__(self, reference, predicted) -> None:
+        self.reference = reference if isinstance(reference, ReferenceSet) else [set(c) for c in reference]
+        self.predicted = predicted if isinstance(predicted, ComplexSet) else [set(c) for c in predicted]
+        self.scores: dict[tuple[int, int], float] = {}
+        self.evaluated: dict[float, dict[str, float]] = {}
+
+        if isinstance(reference, ReferenceSet) and isinstance(predicted, ComplexSet):
+            self._score_ragged(reference, predicted)
+            return
+
+        if isinstance(reference, ReferenceSet):
+            candidates = reference.candidates
+        else:
+            inverted: dict[str, list[int]] = {}
+            for id1, c1 in enumerate(self.reference):
+                for p in c1:
+                    inverted.setdefault(p, []).append(id1)
+
+            def candidates(c):
+                return set(id1 for p in c for id1 in inverted.get(p, ()))
+
+        for id2, c2 in enumerate(self.predicted):
+            for id1 in sorted(candidates(c2)):
+                self.scores[id1, id2] = overlap_score(self.reference[id1], c2)
+
+    def _score_ragged(self, reference: ReferenceSet, predicted: ComplexSet) -> None:
+        # proteins missing from the reference get ids past it, so they count only towards sizes
+        translate = array("i", [0]) * len(predicted.nodes)
+        extra = len(reference.proteins)
+        for i, protein in enumerate(predicted.nodes):
+            j = reference.index.get(protein)
+            if j is None:
+                j = extra
+                extra += 1
+            translate[i] = j
+
+        offsets = array("q", [0])
+        members = array("i")
+        pair_a = array("q")
+        pair_b = array("q")
+        for id2 in range(len(predicted)):
+            ids = sorted(translate[i] for i in predicted.ids(id2))
+            members.extend(ids)
+            offsets.append(len(members))
+
+            candidates = set()
+            for p in ids:
+                candidates.update(reference._inverted.get(p, ()))
+            for id1 in sorted(candidates):
+                pair_a.append(id1)
+                pair_b.append(id2)
+
+        values = kernels.overlap_scores(
+            reference.offsets, reference.members, offsets, members, pair_a, pair_b
+        )
+        self.scores = dict(zip(zip(pair_a, pair_b), values))
+
+    def matched_predicted(self, threshold=0.25) -> set[int]:
+        return set(id2 for (id1, id2), score in self.scores.items() if score > threshold)
+
+    def matched_reference(self, threshold=0.25) -> set[int]:
+        return set(id1 for (id1, id2), score in self.scores.items() if score > threshold)
+
+    def precision(self, threshold=0.25):
+        return len(self.matched_predicted(threshold)) / float(len(self.predicted))
+
+    def recall(self, threshold=0.25):
+        return len(self.matched_reference(threshold)) / float(len(self.reference))
+
+    def predictive_matching_ratio(self, threshold=0.25):
+        best: dict[int, float] = {}
+        for (id1, id2), score in self.scores.items():
+            if score > best.get(id2, 0):
+                best[id2] = score
+        return sum(m for m in best.values() if m > threshold) / len(self.predicted)
+
+    def maximum_matching_ratio(self, score_threshold=0.25):
+        n = len(self.reference)
+        if n == 0:
+            return 0
+
+        scores = {(id1, id2 + n): w for (id1, id2), w in self.scores.items() if w > score_threshold}
+        mates = maxWeightMatching([(v1, v2, w) for (v1, v2), w in scores.items()])
+        return sum(scores[i, mate] for i, mate in enumerate(mates) if i < mate) / n
+
+
+_OVERLAP_CACHE: OrderedDict = OrderedDict()
+OVERLAP_CACHE_SIZE = 16
+
+
+def _cache_key(complexes):
+    # ReferenceSets hash by identity and ComplexSets by content, both are immutable
+    if isinstance(complexes, (ReferenceSet, ComplexSet)):
+        return complexes
+    return tuple(frozenset(c) for c in complexes)
+
+
+def overlap_matrix(reference, predicted) -> OverlapMatrix:
+    """OverlapMatrix of the two complex sets, reused while the same sets are evaluated."""
+    key = (_cache_key(reference), _cache_key(predicted))
+    matrix = _OVERLAP_CACHE.get(key)
+    if matrix is None:
+        matrix = OverlapMatrix(reference, predicted)
+        _OVERLAP_CACHE[key] = matrix
+        if len(_OVERLAP_CACHE) > OVERLAP_CACHE_SIZE:
+            _OVERLAP_CACHE.popitem(last=False)
+    else:
+        _OVERLAP_CACHE.move_to_end(key)
+    return matrix
+
+
+def evaluate(reference, predicted, threshold=0.25) -> dict[str, float]:
+    """All metrics from one overlap matrix.
+
+    Returns precision, recall, their F-measure, PPV (predictive_matching_ratio),
+    MMR (maximum_matching_ratio) and the MR-score, the F_measure of PPV and MMR.
+    """
+    matrix = overlap_matrix(reference, predicted)
+    if threshold in matrix.evaluated:
+        return dict(matrix.evaluated[threshold])
+
+    p = matrix.precision(threshold)
+    r = matrix.recall(threshold)
+    ppv = matrix.predictive_matching_ratio(threshold)
+    mmr = matrix.maximum_matching_ratio(threshold)
+
+    matrix.evaluated[threshold] = {
+        "precision": p,
+        "recall": r,
+        "F_measure": F_measure(p, r),
+        "PPV": ppv,
+        "MMR": mmr,
+        "MR_score": F_measure(ppv, mmr),
+    }
+    return dict(matrix.evaluated[threshold])
@@ -16,6 +16,13 @@ setuptools.setup(
     license="GPL",
     packages=["mdepstar", "mdepstar_analysis"],
     install_requires=["networkx", "tqdm"],
+    extras_require={
+        "fast": ["numba", "numpy"],
+        "zstd": ["zstandard"],
+        "arrow": ["pyarrow", "numpy"],
+        "scipy": ["scipy", "numpy"],
+        "igraph": ["igraph"],
+    },
     entry_points={
         "console_scripts": [
             "mdepstar=mdepstar.cli:main",
@@ -0,0 +1,28 @@
+import pytest
+from mdepstar import Network
+
+# a small weighted network with two self-loops, which read_file keeps by default
+LOOPED_EDGES = [
+    ("A", "B", 0.9),
+    ("A", "C", 0.8),
+    ("B", "C", 0.7),
+    ("C", "D", 0.3),
+    ("D", "E", 0.6),
+    ("A", "A", 1.0),
+    ("E", "E", 1.0),
+    ("B", "D", 0.2),
+]
+
+
+@pytest.fixture
+def looped_file(tmp_path) -> str:
+    file_name = tmp_path / "looped.csv"
+    file_name.write_text("".join(f"{a};{b};{w}\n" for a, b, w in LOOPED_EDGES))
+    return str(file_name)
+
+
+@pytest.fixture
+def looped_network(looped_file) -> Network:
+    G = Network()
+    G.read_file(looped_file, ";", True)
+    return G
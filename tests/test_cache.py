@@ -0,0 +1,29 @@
+from mdepstar import mDepStar
+
+
+def test_cache_counts_hits_and_misses(looped_network):
+    model = mDepStar(looped_network)
+    d = model.get_dependency("A", "D")
+    assert model.get_dependency("A", "D") == d
+
+    hits, misses, maxsize, currsize = model.cache_info()
+    assert (hits, misses, currsize) == (1, 1, 1)
+    assert maxsize == 2**16
+
+
+def test_cache_evicts_least_recently_used(looped_network):
+    model = mDepStar(looped_network, cache_size=2)
+    for A, B in (("A", "D"), ("A", "E"), ("B", "E")):
+        model.get_dependency(A, B)
+    assert model.cache_info() == (0, 3, 2, 2)
+
+    model.get_dependency("B", "E")
+    model.get_dependency("A", "D")
+    assert model.cache_info() == (1, 4, 2, 2)
+
+
+def test_cache_disabled(looped_network):
+    model = mDepStar(looped_network, cache_size=0)
+    model.get_dependency("A", "D")
+    model.get_dependency("A", "D")
+    assert model.cache_info() == (0, 2, 0, 0)
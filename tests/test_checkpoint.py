@@ -0,0 +1,35 @@
+import pytest
+from array import array
+from mdepstar import Checkpoint, Network, TimeBudgetExceeded, mDepStar
+from mdepstar.checkpoint import compute_dependencies
+
+
+@pytest.fixture(scope="module")
+def network() -> Network:
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return G
+
+
+def test_interrupted_checkpoint_resumes_to_same_dependencies(network, tmp_path):
+    csr = network.csr()
+    path = str(tmp_path / "dependencies.ckpt")
+    expected = mDepStar(network, storage="float64")
+
+    # a zero budget stops after the first block, leaving a partial checkpoint
+    with pytest.raises(TimeBudgetExceeded):
+        compute_dependencies(
+            csr, network.weighted, array("d", [0.0]) * csr.num_slots, Checkpoint(path, time_budget=0), block_slots=256
+        )
+
+    resumed = mDepStar(network, storage="float64", checkpoint=Checkpoint(path, resume=True))
+    assert list(resumed._dependency_matrix.values) == list(expected._dependency_matrix.values)
+    assert resumed.dependency_threshold == expected.dependency_threshold
+    assert resumed.get_complexes() == expected.get_complexes()
+
+
+def test_checkpoint_of_another_network_is_rejected(network, looped_network, tmp_path):
+    path = str(tmp_path / "dependencies.ckpt")
+    mDepStar(looped_network, checkpoint=Checkpoint(path))
+    with pytest.raises(Exception, match="different network"):
+        mDepStar(network, checkpoint=Checkpoint(path, resume=True))
@@ -0,0 +1,43 @@
+import bz2
+import gzip
+import lzma
+import pytest
+from mdepstar import Network, mDepStar
+from mdepstar.compression import open_text
+
+OPENERS = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def _edges(network: Network) -> dict[frozenset[str], float]:
+    return {frozenset(e): network.weight(*e) for e in network.edges()}
+
+
+@pytest.mark.parametrize("ext", OPENERS)
+def test_network_round_trip(looped_network, ext, tmp_path):
+    file_name = str(tmp_path / f"network.csv.{ext}")
+    looped_network.save_to_file(file_name)
+    with OPENERS[ext](file_name, "rt") as f:
+        assert len(f.readlines()) == len(looped_network.edges())
+
+    G = Network()
+    G.read_file(file_name, ";", True)
+    assert _edges(G) == _edges(looped_network)
+
+
+@pytest.mark.parametrize("ext", OPENERS)
+def test_output_round_trip(ext, tmp_path):
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    model = mDepStar(G)
+    complexes = model.get_complexes()
+
+    file_name = str(tmp_path / f"complexes.txt.{ext}")
+    mDepStar.export(complexes, file_name)
+    with OPENERS[ext](file_name, "rt") as f:
+        assert {frozenset(line.split()) for line in f} == set(complexes)
+
+    file_name = str(tmp_path / f"mdep.csv.{ext}")
+    model.export_mDep_network(file_name)
+    with open_text(file_name, "r") as f:
+        edges = {frozenset(line.rstrip("\n").split(";")[:2]) for line in f}
+    assert edges == {frozenset(e) for e in model.get_mDep_network().edges()}
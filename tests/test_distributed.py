@@ -0,0 +1,36 @@
+import pytest
+from mdepstar import Network, mDepStar
+from mdepstar.distributed import env_authkey, run_partitioned
+
+
+@pytest.fixture(scope="module", params=["KroganCoreCC", "CollinsCC"])
+def network(request) -> Network:
+    G = Network()
+    G.read_file(f"networks/{request.param}_Graph.csv", ";", True)
+    return G
+
+
+@pytest.mark.parametrize("method", ["hash", "bfs"])
+def test_partitioned_matches_single_process(network, method):
+    reference = mDepStar(network)
+    expected = set(reference.get_complexes())
+
+    dependency, complexes = run_partitioned(network, 3, method=method)
+
+    assert dependency == reference.dependency_threshold
+    assert complexes == expected
+
+
+def test_missing_authkey_is_reported(monkeypatch):
+    monkeypatch.delenv("MDEPSTAR_AUTHKEY", raising=False)
+    with pytest.raises(Exception, match="MDEPSTAR_AUTHKEY"):
+        env_authkey()
+
+
+def test_partitioned_self_loops(looped_network):
+    reference = mDepStar(looped_network)
+
+    dependency, complexes = run_partitioned(looped_network, 2)
+
+    assert dependency == reference.dependency_threshold
+    assert complexes == set(reference.get_complexes())
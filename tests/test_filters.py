@@ -0,0 +1,39 @@
+import pytest
+from mdepstar import Network
+from .conftest import LOOPED_EDGES
+
+# the looped network plus a separate component
+EDGES = LOOPED_EDGES + [("X", "Y", 0.5)]
+
+
+@pytest.fixture
+def edges_file(tmp_path) -> str:
+    file_name = tmp_path / "edges.csv"
+    file_name.write_text("".join(f"{a};{b};{w}\n" for a, b, w in EDGES))
+    return str(file_name)
+
+
+def _read(file_name: str, **kwargs) -> set[frozenset[str]]:
+    G = Network()
+    G.read_file(file_name, ";", True, **kwargs)
+    return {frozenset(e) for e in G.edges()}
+
+
+def _expected(keep) -> set[frozenset[str]]:
+    return {frozenset((a, b)) for a, b, w in EDGES if keep(a, b, w)}
+
+
+@pytest.mark.parametrize(
+    "kwargs,keep",
+    [
+        ({}, lambda a, b, w: True),
+        ({"min_weight": 0.6}, lambda a, b, w: w >= 0.6),
+        ({"allow": ["A", "B", "C"]}, lambda a, b, w: {a, b} <= {"A", "B", "C"}),
+        ({"deny": ["C", "X"]}, lambda a, b, w: not {a, b} & {"C", "X"}),
+        ({"self_loops": False}, lambda a, b, w: a != b),
+        ({"largest_component": True}, lambda a, b, w: "X" not in (a, b)),
+        ({"min_weight": 0.65, "largest_component": True}, lambda a, b, w: w >= 0.65 and {a, b} <= {"A", "B", "C"}),
+    ],
+)
+def test_read_file_filters(edges_file, kwargs, keep):
+    assert _read(edges_file, **kwargs) == _expected(keep)
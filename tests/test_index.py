@@ -0,0 +1,25 @@
+import pytest
+from mdepstar import Network, mDepStar
+
+
+@pytest.mark.parametrize("storage,typecode", [("dict", "d"), ("float32", "f"), ("float64", "d")])
+def test_index_keeps_storage_typecode_and_mdep_edges(storage, typecode):
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    model = mDepStar(G, storage=storage)
+    expected = {frozenset(e) for e in model.get_mDep_network().edges()}
+
+    index = model.dependency_index()
+    assert (index.forward.typecode, index.reverse.typecode, index.mutual.typecode) == (typecode,) * 3
+    assert list(index.mutual) == sorted(index.mutual)
+    assert {frozenset((a, b)) for a, b, _, _ in index.mdep_edges(model.dependency_threshold)} == expected
+
+
+def test_index_keeps_self_loops(looped_network):
+    model = mDepStar(looped_network)
+    expected = {frozenset(e) for e in model.get_mDep_network().edges()}
+    assert frozenset(("A",)) in expected
+
+    index = model.dependency_index()
+    assert len(index) == len(looped_network.edges())
+    assert {frozenset((a, b)) for a, b, _, _ in index.mdep_edges(model.dependency_threshold)} == expected
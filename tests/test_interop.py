@@ -0,0 +1,28 @@
+import pytest
+from mdepstar import Network, interop
+
+
+def _edges(graph) -> dict[frozenset[str], float]:
+    return {frozenset((a, b)): w for a, b, w in graph.edges(data="weight")}
+
+
+def _expected(network: Network, self_loops: bool = True) -> dict[frozenset[str], float]:
+    return {frozenset((a, b)): network.weight(a, b) for a, b in network.edges() if self_loops or a != b}
+
+
+@pytest.mark.parametrize("self_loops", [True, False])
+def test_to_networkx_self_loops(looped_network, self_loops):
+    graph = interop.to_networkx(looped_network.csr(), self_loops=self_loops)
+    assert _edges(graph) == _expected(looped_network, self_loops)
+
+
+@pytest.mark.parametrize("self_loops", [True, False])
+def test_scipy_round_trip(looped_network, self_loops):
+    pytest.importorskip("scipy")
+    csr = looped_network.csr()
+
+    restored = interop.from_scipy_sparse(looped_network.to_scipy_sparse(), csr.nodes, self_loops)
+    assert _edges(interop.to_networkx(restored)) == _expected(looped_network, self_loops)
+
+    network = Network.from_scipy_sparse(looped_network.to_scipy_sparse(), csr.nodes, self_loops=self_loops)
+    assert _edges(network.to_networkx()) == _expected(looped_network, self_loops)
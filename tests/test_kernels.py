@@ -0,0 +1,50 @@
+import pytest
+from array import array
+from mdepstar import Network, mDepStar, kernels
+
+NETWORKS = ["KroganCoreCC", "CollinsCC", "BiogridCC"]
+BACKENDS = [
+    "python",
+    pytest.param("numba", marks=pytest.mark.skipif(kernels.numba is None, reason="numba is not installed")),
+]
+
+
+@pytest.fixture(scope="module", params=NETWORKS)
+def reference(request) -> mDepStar:
+    """The dict path, computed once per network."""
+    G = Network()
+    G.read_file(f"networks/{request.param}_Graph.csv", ";", True)
+    res = mDepStar(G)
+    res.dependency_threshold
+    return res
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_kernels_match_dict_path(reference, backend):
+    G = reference._G
+    csr = G.csr()
+    tau = reference.dependency_threshold
+    matrix = reference._dependency_matrix
+
+    values = kernels.dependencies(csr, G.weighted, array("d", [0.0]) * csr.num_slots, backend=backend)
+    rev = kernels.reverse_slots(csr, backend=backend)
+    flags = kernels.mdep_flags(values, rev, tau, backend=backend)
+    star = kernels.star_flags(values, rev, flags, tau, backend=backend)
+
+    for i, a in enumerate(csr.nodes):
+        expected_star = reference._star(a) or set()
+        for p in csr.row(i):
+            b = csr.nodes[csr.indices[p]]
+            assert values[p] == pytest.approx(matrix[a][b], rel=1e-9, abs=1e-12)
+            assert values[rev[p]] == pytest.approx(matrix[b][a], rel=1e-9, abs=1e-12)
+            mutual = mDepStar._is_greater_or_equal(matrix[a][b], tau) and mDepStar._is_greater_or_equal(matrix[b][a], tau)
+            assert bool(flags[p]) == mutual
+            assert bool(star[p]) == (b in expected_star and b != a)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compact_complexes_match_dict_path(reference, backend, monkeypatch):
+    monkeypatch.setattr(kernels, "BACKEND", backend)
+    compact = mDepStar(reference._G, storage="float64")
+    compact.dependency_threshold = reference.dependency_threshold
+    assert set(compact.get_complexes()) == set(reference.get_complexes())
@@ -0,0 +1,20 @@
+import pytest
+from mdepstar import Network, mDepStar
+
+SEEDS = ["YAL001C", "YBR123C", "YDR362C", "YOR110W"]
+
+
+@pytest.fixture(scope="module")
+def network() -> Network:
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return G
+
+
+def test_lazy_seed_queries_match_eager(network):
+    eager = mDepStar(network)
+    lazy = mDepStar(network, eager.dependency_threshold, lazy=True)
+
+    for seed in SEEDS:
+        assert lazy.get_complexes(seed) == eager.get_complexes(seed)
+    assert lazy.get_complexes(SEEDS) == eager.get_complexes(SEEDS)
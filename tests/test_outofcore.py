@@ -0,0 +1,50 @@
+import warnings
+import pytest
+from mdepstar import Checkpoint, Network, mDepStar
+from mdepstar.outofcore import BYTES_PER_SLOT, memory_blocks
+
+
+@pytest.fixture(scope="module")
+def csr():
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return G.csr()
+
+
+def _cost(csr, i: int) -> int:
+    return csr.degree(i) + sum(csr.degree(csr.indices[p]) for p in csr.row(i))
+
+
+def test_blocks_cover_all_rows_within_budget(csr):
+    max_memory = 2**20
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        blocks = memory_blocks(csr, max_memory)
+
+    assert blocks[0][0] == 0 and blocks[-1][1] == csr.num_nodes
+    assert all(a[1] == b[0] for a, b in zip(blocks, blocks[1:]))
+    for lo, hi in blocks:
+        assert sum(_cost(csr, i) for i in range(lo, hi)) * BYTES_PER_SLOT <= max_memory
+
+
+def test_row_over_budget_warns(csr):
+    max_memory = max(_cost(csr, i) for i in range(csr.num_nodes)) * BYTES_PER_SLOT // 2
+    with pytest.warns(RuntimeWarning, match="exceed the budget"):
+        blocks = memory_blocks(csr, max_memory)
+    assert blocks[-1][1] == csr.num_nodes
+
+
+def test_self_loops_match_dict_threshold(looped_network):
+    reference = mDepStar(looped_network)
+    spilled = mDepStar(looped_network, max_memory=2**20)
+
+    assert spilled.dependency_threshold == reference.dependency_threshold
+    assert set(spilled.get_complexes()) == set(reference.get_complexes())
+
+
+@pytest.mark.parametrize("kwargs", [{"threads": 2}, {"checkpoint": "checkpoint"}])
+def test_max_memory_rejects_threads_and_checkpoint(looped_network, kwargs, tmp_path):
+    if "checkpoint" in kwargs:
+        kwargs = {"checkpoint": Checkpoint(str(tmp_path / "checkpoint.npz"))}
+    with pytest.raises(ValueError):
+        mDepStar(looped_network, max_memory=2**20, **kwargs)
@@ -0,0 +1,18 @@
+import pytest
+from mdepstar import Network, mDepStar
+
+
+@pytest.fixture(scope="module")
+def model() -> mDepStar:
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return mDepStar(G)
+
+
+def test_process_workers_match_serial(model):
+    assert model.get_complexes(workers=2) == model.get_complexes()
+
+
+@pytest.mark.filterwarnings("ignore:The GIL is enabled:RuntimeWarning")
+def test_thread_backend_matches_serial(model):
+    assert model.get_complexes(None, 2, backend="thread") == model.get_complexes()
@@ -0,0 +1,22 @@
+import pytest
+from mdepstar import Network, mDepStar
+from mdepstar.Mdepstar import PROFILE_COLUMNS
+
+
+@pytest.fixture(params=["krogan", "looped"])
+def network(request, looped_network) -> Network:
+    if request.param == "looped":
+        return looped_network
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return G
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"storage": "float32"}, {"max_memory": 2**20}])
+def test_profiles_match_node_deps(network, kwargs):
+    model = mDepStar(network, **kwargs)
+    profiles = model.node_dependency_profiles(block_slots=64)
+
+    assert sorted(profiles["node"]) == sorted(n for n in network.nodes() if network.neighbors(n))
+    for k, node in enumerate(profiles["node"]):
+        assert tuple(profiles[c][k] for c in PROFILE_COLUMNS) == model.get_node_deps(node)
@@ -0,0 +1,33 @@
+from collections import Counter
+import pytest
+from mdepstar import Network
+from mdepstar_analysis.references import ReferenceSet
+
+
+@pytest.mark.parametrize(
+    "network,references,bundled,settings",
+    [
+        ("BiogridCC", "SGD24_references.txt", "BiogridCC_SGD24_complexes.txt", {}),
+        ("CollinsCC", "CYC_complexes.txt", "CollinsCC_CYC_complexes.txt", {"min_fraction": 0.4, "dedup": False}),
+        ("KroganCoreCC", "CYC_complexes.txt", "KroganCoreCC_CYC_complexes.txt", {"min_fraction": 0.4, "dedup": False}),
+    ],
+)
+def test_filter_to_network_reproduces_bundled_references(network, references, bundled, settings):
+    G = Network()
+    G.read_file(f"networks/{network}_Graph.csv", ";", True)
+    filtered = ReferenceSet.read_file(f"references/{references}").filter_to_network(G, **settings)
+
+    with open(f"references/{bundled}") as f:
+        expected = [frozenset(l.split()) for l in f.read().splitlines() if l.strip()]
+
+    assert Counter(filtered) == Counter(expected)
+
+
+def test_filter_to_network_drops_complexes_identical_after_filtering():
+    G = Network()
+    for a, b in (("a", "b"), ("b", "c"), ("c", "d")):
+        G.add_edge(a, b, 1)
+    references = ReferenceSet([["a", "b", "c"], ["a", "b", "c", "x"], ["c", "d"], ["d", "c"]])
+
+    assert list(references.filter_to_network(G)) == [frozenset("abc"), frozenset("cd")]
+    assert len(references.filter_to_network(G, dedup=False)) == 4
@@ -0,0 +1,12 @@
+import pytest
+from mdepstar import mDepStar
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"storage": "float64"}, {"lazy": True}, {"max_memory": 2**20}])
+def test_threshold_is_read_from_the_sketch(looped_network, kwargs):
+    model = mDepStar(looped_network, **kwargs)
+    expected = round(model._estimate_dependency(looped_network.edges()), 3)
+
+    assert model.dependency_threshold == expected
+    assert model.dependency_sketch().suggested_threshold() == expected
+    assert model.dependency_sketch().edges == len(looped_network.edges())
@@ -0,0 +1,39 @@
+import pytest
+from mdepstar import Network, mDepStar
+
+NETWORK = "networks/KroganCoreCC_Graph.csv"
+
+
+def _network_with_self_loops(tmp_path) -> Network:
+    with open(NETWORK) as f:
+        lines = f.read().splitlines()
+    a = lines[0].split(";")[0]
+    b = lines[5].split(";")[1]
+    file_name = tmp_path / "loops.csv"
+    file_name.write_text("\n".join(lines + [f"{a};{a};1", f"{b};{b};1"]) + "\n")
+
+    G = Network()
+    G.read_file(str(file_name), ";", True)
+    return G
+
+
+def test_self_loop_is_one_slot(tmp_path):
+    G = _network_with_self_loops(tmp_path)
+    csr = G.csr()
+    for i in range(csr.num_nodes):
+        row = list(csr.indices[csr.indptr[i]:csr.indptr[i + 1]])
+        assert len(row) == len(set(row)) == G.degree(csr.nodes[i])
+
+
+@pytest.mark.parametrize("storage", ["float32", "float64"])
+def test_compact_matches_dict_with_self_loops(tmp_path, storage):
+    G = _network_with_self_loops(tmp_path)
+    reference = mDepStar(G)
+    compact = mDepStar(G, storage=storage)
+
+    for a, b in G.edges():
+        for x, y in ((a, b), (b, a)):
+            assert compact.get_dependency(x, y) == pytest.approx(reference.get_dependency(x, y), rel=1e-6)
+
+    assert compact.dependency_threshold == reference.dependency_threshold
+    assert set(compact.get_complexes()) == set(reference.get_complexes())
@@ -0,0 +1,34 @@
+import pytest
+from mdepstar import Network, mDepStar
+from mdepstar.table import read_dependency_table
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(params=["krogan", "looped"])
+def network(request, looped_network) -> Network:
+    if request.param == "looped":
+        return looped_network
+    G = Network()
+    G.read_file("networks/KroganCoreCC_Graph.csv", ";", True)
+    return G
+
+
+@pytest.mark.parametrize("extension", ["npz", "parquet", "arrow"])
+def test_table_round_trip(network, extension, tmp_path):
+    if extension != "npz":
+        pytest.importorskip("pyarrow")
+    model = mDepStar(network)
+    file_name = str(tmp_path / f"deps.{extension}")
+
+    rows = model.export_dependency_table(file_name, block_slots=64)
+    table = read_dependency_table(file_name)
+
+    assert rows == len(table["a"]) == len(network.edges())
+    mdep = {frozenset(e) for e in model.get_mDep_network().edges()}
+    for a, b, d_ab, d_ba, weight, flag in zip(*(table[c] for c in ("a", "b", "d_ab", "d_ba", "weight", "mdep"))):
+        a, b = str(a), str(b)
+        assert d_ab == model.get_dependency(a, b)
+        assert d_ba == model.get_dependency(b, a)
+        assert weight == network.weight(a, b)
+        assert flag == (frozenset((a, b)) in mdep)
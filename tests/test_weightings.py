@@ -0,0 +1,57 @@
+import pytest
+from mdepstar import Network, mDepStar
+from mdepstar.weightings import weighting_dependencies
+
+NETWORK = "networks/KroganCoreCC_Graph.csv"
+
+
+def _read(file_name: str, weighted: bool, **kwargs) -> Network:
+    G = Network()
+    G.read_file(file_name, ";", weighted, **kwargs)
+    return G
+
+
+def _slot_dependencies(network: Network, model: mDepStar) -> list[float]:
+    csr = network.csr()
+    return [
+        model.get_dependency(csr.nodes[i], csr.nodes[csr.indices[p]])
+        for i in range(csr.num_nodes)
+        for p in csr.row(i)
+    ]
+
+
+@pytest.fixture(scope="module")
+def columns_file(tmp_path_factory) -> str:
+    # the Krogan edges with a second weight in column 3
+    file_name = tmp_path_factory.mktemp("weightings") / "krogan.csv"
+    with open(NETWORK) as f, open(file_name, "w") as out:
+        for line in f:
+            a, b, w = line.rstrip("\n").split(";")
+            out.write(f"{a};{b};{w};{round(1 - float(w) / 2, 3)}\n")
+    return str(file_name)
+
+
+@pytest.mark.parametrize("name,weighted", [("unweighted", False), ("weight", True)])
+def test_weighting_matches_mdepstar(name, weighted):
+    network = _read(NETWORK, True)
+    values = weighting_dependencies(network, [name])[name]
+
+    reference = _read(NETWORK, weighted)
+    expected = _slot_dependencies(network, mDepStar(reference))
+    assert list(values) == pytest.approx(expected, abs=1e-12)
+
+
+def test_weight_column_matches_network_weighted_by_it(columns_file, tmp_path):
+    network = _read(columns_file, True, weight_columns={"second": 3})
+    values = weighting_dependencies(network, ["second"])["second"]
+
+    # the same edges read with column 3 as their weight
+    file_name = tmp_path / "second.csv"
+    with open(columns_file) as f, open(file_name, "w") as out:
+        for line in f:
+            a, b, _, w = line.rstrip("\n").split(";")
+            out.write(f"{a};{b};{w}\n")
+    reference = _read(str(file_name), True)
+
+    expected = _slot_dependencies(network, mDepStar(reference))
+    assert list(values) == pytest.approx(expected, abs=1e-12)